@@ -2,23 +2,24 @@
 # 1) Re-sample and align the frame annotation data
 # (20200310 created by Tong Xue)
 
-import json
+import argparse
 import numpy as np
 
+import ceap_io
+
+
 # Get video fps
 m_videoFpsList = []
-with open('../../1_Stimuli/VideoInfo.json', mode='r') as _videoInfoFile:
-    _videoInfoData = json.load(_videoInfoFile)
+_videoInfoData = ceap_io.load_json('../../1_Stimuli/VideoInfo.json')
 
 for i in range(1, len(_videoInfoData["VideoInfo"])):
     m_videoFpsList.append(_videoInfoData["VideoInfo"][i]["FrameRate"])
 
-# P1 - P32
-for _pid in range(1, 33):
 
-    with open('../../3_AnnotationData/Transformed/P%s_Annotation_TransData.json' % str(_pid), mode='r') as \
-            _annotationDataFile:
-        m_participantData = json.load(_annotationDataFile)
+# Re-sample and align the frame annotation data of a participant
+def Get_AnnotationFrameData(_pid, _format="json"):
+
+    m_participantData = ceap_io.load_output('../../3_AnnotationData/Transformed/P%s_Annotation_TransData.json' % str(_pid))
 
     m_continuousAnnotationStructure = {"ContinuousAnnotation_FrameData": []}
 
@@ -68,8 +69,15 @@ for _pid in range(1, 33):
         m_jsonParticipantSelfAnnotationDataStruct['Video_Annotation_FrameData'].append(m_selfAnnotationJsonData)
     m_continuousAnnotationStructure["ContinuousAnnotation_FrameData"].append(m_jsonParticipantSelfAnnotationDataStruct)
 
-    # save as json file
-    m_jsonStr = json.dumps(m_continuousAnnotationStructure, indent=4)
-    with open('../../3_AnnotationData/Frame/P%s_Annotation_FrameData.json' % str(_pid), 'w') as f:
-        f.write(m_jsonStr)
+    # save as json file, or in the binary format chosen with --format
+    ceap_io.write_data_file(m_continuousAnnotationStructure, '../../3_AnnotationData/Frame/P%s_Annotation_FrameData.json' % str(_pid), _format)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-sample and align the frame annotation data")
+    ceap_io.add_format_argument(parser)
+    args = parser.parse_args()
 
+    # P1 - P32
+    for _pid in range(1, 33):
+        Get_AnnotationFrameData(_pid, args.format)
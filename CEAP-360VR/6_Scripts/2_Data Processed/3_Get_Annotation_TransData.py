@@ -2,10 +2,12 @@
 # 1) Transform the raw annotation data
 # (20200310 created by Tong Xue)
 
-import json
+import argparse
 import numpy as np
 import math
 
+import ceap_io
+
 
 def Get_VA_Data(_valence, _arousal):
     if abs(_valence) >= abs(_arousal):
@@ -28,10 +30,34 @@ def Get_VA_Data(_valence, _arousal):
     return _newValence, _newArousal
 
 
-for _pid in range(1, 33):
+# Same mapping as Get_VA_Data, for the arrays of all the samples of a video
+def Get_VA_Data_Array(_valence, _arousal):
+    _valence = np.asarray(_valence, dtype=np.float64)
+    _arousal = np.asarray(_arousal, dtype=np.float64)
+    _radius = np.sqrt(_valence * _valence + _arousal * _arousal)
+
+    # the operations are in the same order as in Get_VA_Data, so the results are identical
+    _isValenceMax = np.abs(_valence) >= np.abs(_arousal)
+    _signMax = np.sign(np.where(_isValenceMax, _valence, _arousal))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        _newValence = np.where(_isValenceMax, _signMax * _radius, _signMax * _radius * _valence / _arousal)
+        _newArousal = np.where(_isValenceMax, _signMax * _radius * _arousal / _valence, _signMax * _radius)
+    _newArousal = np.where(_valence == 0, _arousal, _newArousal)
+
+    # math.modf(x)[1] is the integer part of x
+    _newValence = np.where(np.abs(_newValence) > 1, np.trunc(_newValence), _newValence)
+    _newArousal = np.where(np.abs(_newArousal) > 1, np.trunc(_newArousal), _newArousal)
+
+    _newValence = _newValence * 4 + 5
+    _newArousal = _newArousal * 4 + 5
+    return _newValence, _newArousal
 
-    with open('../../3_AnnotationData/Raw/P%s_Annotation_RawData.json' % str(_pid), mode='r') as _annotationDataFile:
-        m_annotationRawData = json.load(_annotationDataFile)
+
+# Transform the raw annotation data of a participant
+def Get_AnnotationTransData(_pid, _format="json"):
+
+    # samples are decoded as columns, e.g. _annotationData['X_Value'][i]
+    m_annotationRawData = ceap_io.load_json_streaming('../../3_AnnotationData/Raw/P%s_Annotation_RawData.json' % str(_pid))
     m_continuousAnnotationStructure = {"ContinuousAnnotation_TransData": []}
 
     m_jsonParticipantSelfAnnotationDataStruct = {
@@ -56,24 +82,30 @@ for _pid in range(1, 33):
                                         ],
                                     }
 
-        for i in range(0, len(_annotationData)):
-            _v = _annotationData[i]['X_Value']
-            _a = _annotationData[i]['Y_Value']
-            _timestamp = _annotationData[i]['TimeStamp']
-
-            _valence, _arousal = Get_VA_Data(_v, _a)
+        _valence, _arousal = Get_VA_Data_Array(_annotationData['X_Value'], _annotationData['Y_Value'])
+        _valence = np.round(_valence, 3).tolist()
+        _arousal = np.round(_arousal, 3).tolist()
 
+        for _timestamp, _v, _a in zip(_annotationData['TimeStamp'], _valence, _arousal):
             m_selfAVJsonData = {
                 "TimeStamp": _timestamp,
-                "Valence": round(_valence, 3),
-                "Arousal": round(_arousal, 3),
+                "Valence": _v,
+                "Arousal": _a,
             }
             m_selfAnnotationJsonData['TimeStamp_Valence_Arousal'].append(m_selfAVJsonData)
 
         m_jsonParticipantSelfAnnotationDataStruct['Video_Annotation_TransData'].append(m_selfAnnotationJsonData)
     m_continuousAnnotationStructure["ContinuousAnnotation_TransData"].append(m_jsonParticipantSelfAnnotationDataStruct)
 
-    # save as json file
-    m_jsonStr = json.dumps(m_continuousAnnotationStructure, indent=4)
-    with open('../../3_AnnotationData/Transformed/P%s_Annotation_TransData.json' % str(_pid), 'w') as f:
-        f.write(m_jsonStr)
+    # save as json file, or in the binary format chosen with --format
+    ceap_io.write_data_file(m_continuousAnnotationStructure, '../../3_AnnotationData/Transformed/P%s_Annotation_TransData.json' % str(_pid), _format)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Transform the raw annotation data")
+    ceap_io.add_format_argument(parser)
+    args = parser.parse_args()
+
+    # P1 - P32
+    for _pid in range(1, 33):
+        Get_AnnotationTransData(_pid, args.format)
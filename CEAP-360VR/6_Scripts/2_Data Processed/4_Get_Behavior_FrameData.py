@@ -2,20 +2,73 @@
 # 1) Re-sample and align the transformed behavior data
 # (20200310 created by Tong Xue)
 
-import json
+import argparse
 import numpy as np
 
+import ceap_io
+
 
 # Get video fps
 m_videoFpsList = []
-with open('../../1_Stimuli/VideoInfo.json', mode='r') as _videoInfoFile:
-    _videoInfoData = json.load(_videoInfoFile)
-
-    for i in range(1, len(_videoInfoData["VideoInfo"])):
-        m_videoFpsList.append(_videoInfoData["VideoInfo"][i]["FrameRate"])
-
-# P1 - P32
-for _pid in range(1, 33):
+_videoInfoData = ceap_io.load_json('../../1_Stimuli/VideoInfo.json')
+
+for i in range(1, len(_videoInfoData["VideoInfo"])):
+    m_videoFpsList.append(_videoInfoData["VideoInfo"][i]["FrameRate"])
+
+# Streams of (pitch, yaw) samples re-sampled to the video frames
+m_rotationStreamList = ["HM", "EM", "LEM", "REM"]
+
+
+# Get the index of the sample of each frame (zero-order hold), the timestamps must be sorted
+def Get_FrameSampleIndex(_timeStampList, _timeByFrameList):
+    # the frames in (t[i], t[i+1]] take the sample i, the frames before t[0] take the first sample,
+    # and the frames after t[n-2] take the last sample, as in the lock-step loop of the first version
+    _timeStampList = np.asarray(_timeStampList, dtype=np.float64)
+    if len(_timeStampList) == 0:
+        raise ValueError("a stream without samples cannot be re-sampled to the frames")
+    _lastIndex = len(_timeStampList) - 1
+    _index = np.searchsorted(_timeStampList[1:_lastIndex], _timeByFrameList, side="left")
+    _index[_index == _lastIndex - 1] = _lastIndex
+    return _index
+
+
+# Re-sample the (pitch, yaw) samples of many streams to the video frames, all the streams are gathered at once
+def Get_RotationFrameData(_dataList, _timeByFrameList):
+    _valueList = []
+    _indexList = []
+    _offset = 0
+    for _data in _dataList:
+        _valueList.append(np.array([(_sample["Pitch"], _sample["Yaw"]) for _sample in _data], dtype=np.float64).reshape(-1, 2))
+        _indexList.append(Get_FrameSampleIndex([_sample["TimeStamp"] for _sample in _data], _timeByFrameList) + _offset)
+        _offset += len(_data)
+
+    _frameValues = np.concatenate(_valueList)[np.concatenate(_indexList)]
+    _frameCount = len(_timeByFrameList)
+    return [(_frameValues[i * _frameCount:(i + 1) * _frameCount, 0].tolist(), _frameValues[i * _frameCount:(i + 1) * _frameCount, 1].tolist())
+            for i in range(0, len(_dataList))]
+
+
+# Re-sample the pupil diameter samples of a stream (LPD or RPD) to the video frames
+def Get_PupilFrameData(_data, _timeByFrameList):
+    _timeStampList = np.array([_sample["TimeStamp"] for _sample in _data], dtype=np.float64)
+    _pupilList = np.array([_sample["PD"] for _sample in _data], dtype=np.float64)
+
+    # the zero samples are blinks, they are interpolated from the samples around them
+    _isBlinkList = _pupilList == 0
+    if np.all(_isBlinkList):
+        _pupilFrameList = np.zeros(len(_timeByFrameList))
+        _blinkFrameList = np.full(len(_timeByFrameList), len(_pupilList) > 0)
+    else:
+        _pupilFrameList = np.interp(_timeByFrameList, _timeStampList[~_isBlinkList], _pupilList[~_isBlinkList])
+        # a frame is a blink if its nearest sample is a blink
+        _blinkFrameList = np.interp(_timeByFrameList, _timeStampList, _isBlinkList.astype(np.float64)) >= 0.5
+
+    return np.round(_pupilFrameList, 3).tolist(), _blinkFrameList.astype(int).tolist()
+
+
+# Re-sample and align the transformed behavior data of a participant
+# _blinkMask adds the channel "Blink" to LPD and RPD, 1 for the frames of a blink
+def Get_BehaviorFrameData(_pid, _format="json", _blinkMask=False):
 
     m_rawBehaviorFrameDataStructure = {"Behavior_FrameData": []}
 
@@ -24,9 +77,7 @@ for _pid in range(1, 33):
         "Video_Behavior_FrameData": []
     }
 
-    with open('../../4_BehaviorData/Transformed/P%s_Behavior_TransData.json' % str(_pid),
-              mode='r') as _participantDataFile:
-        m_participantData = json.load(_participantDataFile)
+    m_participantData = ceap_io.load_output('../../4_BehaviorData/Transformed/P%s_Behavior_TransData.json' % str(_pid))
 
     # V1 - V8
     for _vid in range(0, 8):
@@ -41,214 +92,44 @@ for _pid in range(1, 33):
             "RPD": []
         }
 
-        m_pitchFrameList = []
-        m_yawFrameList = []
         m_timeByFrameList = np.linspace(0, 60, 60 * m_videoFpsList[_vid])
 
-        m_pupilTimeList = []
-        m_pupilList = []
-        m_pupilFrameList = []
-
-        # HM data
-        _data = m_participantData['Behavior_TransData'][0]["Video_Behavior_TransData"][_vid]["HM"]
-        _index = 0
-
-        for i in range(0, len(_data)):
-
-            if i == len(_data) - 2:
-                m_pitchFrameList.append(_data[i + 1]["Pitch"])
-                m_yawFrameList.append(_data[i + 1]["Yaw"])
-                _index += 1
-                break
-
-            if _index == 0:
-                while m_timeByFrameList[_index] < _data[i]["TimeStamp"]:
-                    m_pitchFrameList.append(_data[i]["Pitch"])
-                    m_yawFrameList.append(_data[i]["Yaw"])
-                    _index += 1
-
-            while _data[i]["TimeStamp"] <= m_timeByFrameList[_index] <= _data[i + 1]["TimeStamp"]:
-                m_pitchFrameList.append(_data[i]["Pitch"])
-                m_yawFrameList.append(_data[i]["Yaw"])
-                _index += 1
-
-        if _index != len(m_timeByFrameList):
-            while _index <= len(m_timeByFrameList) - 1:
-                m_pitchFrameList.append(_data[len(_data) - 1]["Pitch"])
-                m_yawFrameList.append(_data[len(_data) - 1]["Yaw"])
-                _index += 1
-
-        for i in range(0, len(m_pitchFrameList)):
-            m_headRotData = {
-                "TimeStamp": round(m_timeByFrameList[i], 3),
-                "Pitch": m_pitchFrameList[i],
-                "Yaw": m_yawFrameList[i]
-            }
-            m_rawBehaviorFrameDataVideoJsonStruct['HM'].append(m_headRotData)
-
-        m_pitchFrameList.clear()
-        m_yawFrameList.clear()
-
-        # EM data
-        _data = m_participantData['Behavior_TransData'][0]["Video_Behavior_TransData"][_vid]["EM"]
-        _index = 0
-
-        for i in range(0, len(_data)):
-
-            if i == len(_data) - 2:
-                m_pitchFrameList.append(_data[i + 1]["Pitch"])
-                m_yawFrameList.append(_data[i + 1]["Yaw"])
-                _index += 1
-                break
-
-            if _index == 0:
-                while m_timeByFrameList[_index] < _data[i]["TimeStamp"]:
-                    m_pitchFrameList.append(_data[i]["Pitch"])
-                    m_yawFrameList.append(_data[i]["Yaw"])
-                    _index += 1
-
-            while _data[i]["TimeStamp"] <= m_timeByFrameList[_index] <= _data[i + 1]["TimeStamp"]:
-                m_pitchFrameList.append(_data[i]["Pitch"])
-                m_yawFrameList.append(_data[i]["Yaw"])
-                _index += 1
-
-        if _index != len(m_timeByFrameList):
-            while _index <= len(m_timeByFrameList) - 1:
-                m_pitchFrameList.append(_data[len(_data) - 1]["Pitch"])
-                m_yawFrameList.append(_data[len(_data) - 1]["Yaw"])
-                _index += 1
-
-        for i in range(0, len(m_pitchFrameList)):
-            m_headRotData = {
-                "TimeStamp": round(m_timeByFrameList[i], 3),
-                "Pitch": m_pitchFrameList[i],
-                "Yaw": m_yawFrameList[i]
-            }
-            m_rawBehaviorFrameDataVideoJsonStruct['EM'].append(m_headRotData)
-
-        m_pitchFrameList.clear()
-        m_yawFrameList.clear()
-
-        # LEM data
-        _data = m_participantData['Behavior_TransData'][0]["Video_Behavior_TransData"][_vid]["LEM"]
-        _index = 0
-
-        for i in range(0, len(_data)):
-
-            if i == len(_data) - 2:
-                m_pitchFrameList.append(_data[i + 1]["Pitch"])
-                m_yawFrameList.append(_data[i + 1]["Yaw"])
-                _index += 1
-                break
-
-            if _index == 0:
-                while m_timeByFrameList[_index] < _data[i]["TimeStamp"]:
-                    m_pitchFrameList.append(_data[i]["Pitch"])
-                    m_yawFrameList.append(_data[i]["Yaw"])
-                    _index += 1
-
-            while _data[i]["TimeStamp"] <= m_timeByFrameList[_index] <= _data[i + 1]["TimeStamp"]:
-                m_pitchFrameList.append(_data[i]["Pitch"])
-                m_yawFrameList.append(_data[i]["Yaw"])
-                _index += 1
-
-        if _index != len(m_timeByFrameList):
-            while _index <= len(m_timeByFrameList) - 1:
-                m_pitchFrameList.append(_data[len(_data) - 1]["Pitch"])
-                m_yawFrameList.append(_data[len(_data) - 1]["Yaw"])
-                _index += 1
-
-        for i in range(0, len(m_pitchFrameList)):
-            m_headRotData = {
-                "TimeStamp": round(m_timeByFrameList[i], 3),
-                "Pitch": m_pitchFrameList[i],
-                "Yaw": m_yawFrameList[i]
-            }
-            m_rawBehaviorFrameDataVideoJsonStruct['LEM'].append(m_headRotData)
-
-        m_pitchFrameList.clear()
-        m_yawFrameList.clear()
-
-        # REM data
-        _data = m_participantData['Behavior_TransData'][0]["Video_Behavior_TransData"][_vid]["REM"]
-        _index = 0
-
-        for i in range(0, len(_data)):
-
-            if i == len(_data) - 2:
-                m_pitchFrameList.append(_data[i + 1]["Pitch"])
-                m_yawFrameList.append(_data[i + 1]["Yaw"])
-                _index += 1
-                break
-
-            if _index == 0:
-                while m_timeByFrameList[_index] < _data[i]["TimeStamp"]:
-                    m_pitchFrameList.append(_data[i]["Pitch"])
-                    m_yawFrameList.append(_data[i]["Yaw"])
-                    _index += 1
-
-            while _data[i]["TimeStamp"] <= m_timeByFrameList[_index] <= _data[i + 1]["TimeStamp"]:
-                m_pitchFrameList.append(_data[i]["Pitch"])
-                m_yawFrameList.append(_data[i]["Yaw"])
-                _index += 1
-
-        if _index != len(m_timeByFrameList):
-            while _index <= len(m_timeByFrameList) - 1:
-                m_pitchFrameList.append(_data[len(_data) - 1]["Pitch"])
-                m_yawFrameList.append(_data[len(_data) - 1]["Yaw"])
-                _index += 1
-
-        for i in range(0, len(m_pitchFrameList)):
-            m_headRotData = {
-                "TimeStamp": round(m_timeByFrameList[i], 3),
-                "Pitch": m_pitchFrameList[i],
-                "Yaw": m_yawFrameList[i]
-            }
-            m_rawBehaviorFrameDataVideoJsonStruct['REM'].append(m_headRotData)
-
-        m_pitchFrameList.clear()
-        m_yawFrameList.clear()
-
-        # LPD data
-        _data = m_participantData['Behavior_TransData'][0]["Video_Behavior_TransData"][_vid]["LPD"]
-
-        for i in range(0, len(_data)):
-            _leftPupil = _data[i]["PD"]
-            if _leftPupil != 0:
-                m_pupilTimeList.append(_data[i]["TimeStamp"])
-                m_pupilList.append(_data[i]["PD"])
-
-        m_pupilFrameList = np.interp(m_timeByFrameList, m_pupilTimeList, m_pupilList)
-
-        for i in range(0, len(m_pupilFrameList)):
-            m_headRotData = {
-                "TimeStamp": round(m_timeByFrameList[i], 3),
-                "PD": round(m_pupilFrameList[i], 3),
-            }
-            m_rawBehaviorFrameDataVideoJsonStruct['LPD'].append(m_headRotData)
-
-        # RPD data
-        _data = m_participantData['Behavior_TransData'][0]["Video_Behavior_TransData"][_vid]["RPD"]
-
-        for i in range(0, len(_data)):
-            _leftPupil = _data[i]["PD"]
-            if _leftPupil != 0:
-                m_pupilTimeList.append(_data[i]["TimeStamp"])
-                m_pupilList.append(_data[i]["PD"])
-
-        m_pupilFrameList = np.interp(m_timeByFrameList, m_pupilTimeList, m_pupilList)
-        for i in range(0, len(m_pupilFrameList)):
-            m_headRotData = {
-                "TimeStamp": round(m_timeByFrameList[i], 3),
-                "PD": round(m_pupilFrameList[i], 3),
-            }
-            m_rawBehaviorFrameDataVideoJsonStruct['RPD'].append(m_headRotData)
+        # HM, EM, LEM and REM data
+        _videoData = m_participantData['Behavior_TransData'][0]["Video_Behavior_TransData"][_vid]
+        for _stream in m_rotationStreamList:
+            if len(_videoData[_stream]) == 0:
+                raise ValueError("P%s V%s: the stream %s has no samples" % (str(_pid), str(_vid + 1), _stream))
+        _frameTimeStampList = np.round(m_timeByFrameList, 3).tolist()
+        _rotationFrameData = Get_RotationFrameData([_videoData[_stream] for _stream in m_rotationStreamList], m_timeByFrameList)
+
+        for _stream, (_pitchFrameList, _yawFrameList) in zip(m_rotationStreamList, _rotationFrameData):
+            m_rawBehaviorFrameDataVideoJsonStruct[_stream] = [{"TimeStamp": _t, "Pitch": _p, "Yaw": _y}
+                                                              for _t, _p, _y in zip(_frameTimeStampList, _pitchFrameList, _yawFrameList)]
+
+        # LPD and RPD data
+        for _stream in ["LPD", "RPD"]:
+            _pupilFrameList, _blinkFrameList = Get_PupilFrameData(_videoData[_stream], m_timeByFrameList)
+            if _blinkMask:
+                m_rawBehaviorFrameDataVideoJsonStruct[_stream] = [{"TimeStamp": _t, "PD": _pd, "Blink": _b}
+                                                                  for _t, _pd, _b in zip(_frameTimeStampList, _pupilFrameList, _blinkFrameList)]
+            else:
+                m_rawBehaviorFrameDataVideoJsonStruct[_stream] = [{"TimeStamp": _t, "PD": _pd}
+                                                                  for _t, _pd in zip(_frameTimeStampList, _pupilFrameList)]
 
         m_rawBehaviorDataParticipantFrameJsonStruct['Video_Behavior_FrameData'].append(
             m_rawBehaviorFrameDataVideoJsonStruct)
 
     m_rawBehaviorFrameDataStructure['Behavior_FrameData'].append(m_rawBehaviorDataParticipantFrameJsonStruct)
 
-    m_jsonStr = json.dumps(m_rawBehaviorFrameDataStructure, indent=4)
-    with open('../../4_BehaviorData/Frame/P%s_Behavior_FrameData.json' % str(_pid), 'w') as f:
-        f.write(m_jsonStr)
+    ceap_io.write_data_file(m_rawBehaviorFrameDataStructure, '../../4_BehaviorData/Frame/P%s_Behavior_FrameData.json' % str(_pid), _format)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-sample and align the transformed behavior data")
+    parser.add_argument("--blink-mask", action="store_true", help="Add the channel Blink to LPD and RPD, 1 for the frames of a blink")
+    ceap_io.add_format_argument(parser)
+    args = parser.parse_args()
+
+    # P1 - P32
+    for _pid in range(1, 33):
+        Get_BehaviorFrameData(_pid, args.format, args.blink_mask)
@@ -3,157 +3,145 @@
 # (20200310 created by Tong Xue)
 
 
-import json
-import math
+import argparse
 import numpy as np
 
+import ceap_io
+import ceap_spherical
+
 # Get video fps
 m_videoFpsList = []
-with open('../../1_Stimuli/VideoInfo.json', mode='r') as _videoInfoFile:
-    _videoInfoData = json.load(_videoInfoFile)
+_videoInfoData = ceap_io.load_json('../../1_Stimuli/VideoInfo.json')
 for i in range(1, len(_videoInfoData["VideoInfo"])):
     m_videoFpsList.append(_videoInfoData["VideoInfo"][i]["FrameRate"])
 
 
-# Calculate Angle Dis
-def Get_AngleDistance(_longitude1, _latitude1, _longitude2, _latitude2):
-    _radLong1 = math.radians(_longitude1)
-    _radLat1 = math.radians(_latitude1)
-    _radLong2 = math.radians(_longitude2)
-    _radLat2 = math.radians(_latitude2)
-
-    _longDis = _radLong2 - _radLong1
-    _latDis = _radLat2 - _radLat1
-    _radDis = 2 * math.asin(math.sqrt(math.pow(math.sin(_latDis / 2), 2) +
-                                      math.cos(_radLat1) * math.cos(_radLat2) * math.pow(math.sin(_longDis / 2), 2)))
-    _angleDis = math.degrees(_radDis)
-    return _angleDis
-
-
-# Get the centroid coordinate
-def Get_CentroidPoint(_yawList, _pitchList):
-    if max(_yawList) - min(_yawList) > 200:
-        for _sample in range(len(_yawList)):
-            if _yawList[_sample] < 0:
-                _yawList[_sample] = 360 + _yawList[_sample]
-
-    x = np.mean(_yawList)
-    y = np.mean(_pitchList)
+# Calculate the velocity and acceleration of the frames 1 to N-1, from the previous frame
+def Get_VelocityData(_yawArray, _pitchArray, _fps):
+    assert np.all(np.abs(_pitchArray) <= 90) or len(_pitchArray) < 2, "invalid latitude"
+    assert np.all(np.abs(_yawArray) <= 180) or len(_yawArray) < 2, "invalid longtigude"
 
-    if x > 180:
-        x = x - 360
+    # the velocity before the frame 1 is 0
+    return ceap_spherical.angular_velocity(_yawArray, _pitchArray, _fps)
 
-    return [x, y]
 
+# Get the fixations (I-VT) from the velocity and acceleration of Get_VelocityData, the thresholds can change without recomputing them
+# Returns the arrays StartFrame, EndFrame, Pitch, Yaw of the fixations
+def Get_FixationArrays(_yawArray, _pitchArray, _velocity, _acceleration, _fps,
+                       _velocityThreshold=75, _accelerationThreshold=200, _durationThreshold=0.2):
+    _isFixation = ~((np.abs(_velocity) > _velocityThreshold) | (np.abs(_acceleration) > _accelerationThreshold))
 
-# Get the fixations
-def Get_FixationData():
-    m_fixationCount = [[0 for i in range(8)] for i in range(32)]
-    # P1 - P32
-    for _pid in range(1, 33):
+    # runs of fixation frames, the frame i + 1 is _isFixation[i]
+    _edges = np.diff(np.concatenate([[0], _isFixation.astype(np.int8), [0]]))
+    _startFrame = np.flatnonzero(_edges == 1) + 1
+    _endFrame = np.flatnonzero(_edges == -1)
+    _keep = (_endFrame - _startFrame + 1) / _fps >= _durationThreshold
+    _startFrame = _startFrame[_keep]
+    _endFrame = _endFrame[_keep]
 
-        with open('../../4_BehaviorData/Frame/P%s_Behavior_FrameData.json' % str(_pid),
-                  mode='r') as _participantDataFile:
-            m_participantData = json.load(_participantDataFile)
+    # centroids of the fixations, the yaw around +-180 is moved to [0, 360] as in ceap_spherical.centroid
+    _yaw, _pitch = ceap_spherical.segment_centroids(_yawArray, _pitchArray, _startFrame, _endFrame)
 
-        m_processedBehaviorFrameDataStructure = {"Behavior_FixationData": []}
+    # the first fixation of a video, from the frame 1, is saved from the frame 0
+    _isFirst = _startFrame == 1
+    _startFrame = np.where(_isFirst, 0, _startFrame)
+    _endFrame = np.where(_isFirst, _endFrame - 1, _endFrame)
+    return _startFrame, _endFrame, _pitch, _yaw
 
-        m_processedBehaviorDataParticipantJsonStruct = {
-            "ParticipantID": 'P%s' % str(_pid),
-            "Video_Behavior_FixationData": []
-        }
-        # V1 - V8
-        for _vid in range(0, 8):
-
-            m_processedBehaviorVideoStructure = {
-                "VideoID": "V%s" % str(_vid + 1),
-                "Fixation": []
-            }
 
-            _frameData = m_participantData['Behavior_FrameData'][0]["Video_Behavior_FrameData"][_vid]["EM"]
+# Get the path of the fixation data of a set of thresholds, the default thresholds keep the path of the dataset
+def Get_FixationPath(_pid, _velocityThreshold=75, _accelerationThreshold=200, _durationThreshold=0.2):
+    if _velocityThreshold == 75 and _accelerationThreshold == 200 and np.isclose(_durationThreshold, 0.2):
+        return '../../4_BehaviorData/EM_Fixation/P%s_Behavior_FixationData.json' % str(_pid)
+    return '../../4_BehaviorData/EM_Fixation/P%s_Behavior_FixationData_v%g_a%g_d%dms.json' % (
+        str(_pid), _velocityThreshold, _accelerationThreshold, round(_durationThreshold * 1000))
 
-            _startFrame = 0
-            _endFrame = 0
-            _velocity = 0
-            _velocityPre = 0
-            _count = 0
 
-            _yawList = []
-            _pitchList = []
+# Get the eye rotations of the videos of a participant, and their velocity and acceleration
+# Returns a list of (yaw, pitch, velocity, acceleration) arrays, one per video
+def Get_EyeMovementData(_pid):
+    m_participantData = ceap_io.load_output('../../4_BehaviorData/Frame/P%s_Behavior_FrameData.json' % str(_pid))
 
-            # Calculate Velocity and acceleration
-            for _sample in range(1, len(_frameData)):
-                _longitude1 = _frameData[_sample - 1]["Yaw"]
-                _longitude2 = _frameData[_sample]["Yaw"]
+    m_eyeMovementList = []
+    # V1 - V8
+    for _vid in range(0, 8):
+        _frameData = m_participantData['Behavior_FrameData'][0]["Video_Behavior_FrameData"][_vid]["EM"]
 
-                _latitude1 = _frameData[_sample - 1]["Pitch"]
-                _latitude2 = _frameData[_sample]["Pitch"]
+        _yawArray = np.array([_frame["Yaw"] for _frame in _frameData], dtype=np.float64)
+        _pitchArray = np.array([_frame["Pitch"] for _frame in _frameData], dtype=np.float64)
 
-                assert abs(_latitude1) <= 90 and abs(_latitude2) <= 90, "invalid latitude"
-                assert abs(_longitude1) <= 180 and abs(_longitude2) <= 180, "invalid longtigude"
+        # Calculate Velocity and acceleration
+        _velocity, _acceleration = Get_VelocityData(_yawArray, _pitchArray, m_videoFpsList[_vid])
+        m_eyeMovementList.append((_yawArray, _pitchArray, _velocity, _acceleration))
+    return m_eyeMovementList
 
-                _angle = Get_AngleDistance(_longitude1, _latitude1, _longitude2, _latitude2)
 
-                _velocity = _angle * m_videoFpsList[_vid]
-                _acceleration = (_velocity - _velocityPre) * m_videoFpsList[_vid]
-                _velocityPre = _velocity
+# Get the fixations of a participant for many sets of thresholds, without writing files
+# _thresholdList is a list of (velocity, acceleration, duration) thresholds, the velocities are computed once
+# Returns a dictionary {thresholds: list of the arrays of Get_FixationArrays, one per video}
+def Get_FixationSweep(_pid, _thresholdList):
+    m_eyeMovementList = Get_EyeMovementData(_pid)
 
-                if abs(_velocity) > 75 or abs(_acceleration) > 200:
+    m_fixationSweep = {}
+    for _thresholds in _thresholdList:
+        m_fixationSweep[tuple(_thresholds)] = [Get_FixationArrays(_yawArray, _pitchArray, _velocity, _acceleration, m_videoFpsList[_vid], *_thresholds)
+                                               for _vid, (_yawArray, _pitchArray, _velocity, _acceleration) in enumerate(m_eyeMovementList)]
+    return m_fixationSweep
 
-                    _timeDur = _endFrame - _startFrame
 
-                    if _timeDur / m_videoFpsList[_vid] >= 0.2:
-                        _fixation = Get_CentroidPoint(_yawList, _pitchList)
+# Get the fixations of a participant, the thresholds other than the default ones are saved with them in the file name
+def Get_FixationData(_pid, _format="json", _velocityThreshold=75, _accelerationThreshold=200, _durationThreshold=0.2):
+    # Number of fixations per video
+    m_fixationCount = [0 for i in range(8)]
 
-                        m_HE_FixationData = {
-                            "StartFrame": _startFrame,
-                            "EndFrame": _endFrame - 1,
-                            "Pitch": round(_fixation[1], 3),
-                            "Yaw": round(_fixation[0], 3)
-                        }
+    m_eyeMovementList = Get_EyeMovementData(_pid)
 
-                        m_processedBehaviorVideoStructure['Fixation'].append(m_HE_FixationData)
-                        m_fixationCount[_pid - 1][_vid] += 1
+    m_processedBehaviorFrameDataStructure = {"Behavior_FixationData": []}
 
-                        _yawList.clear()
+    m_processedBehaviorDataParticipantJsonStruct = {
+        "ParticipantID": 'P%s' % str(_pid),
+        "Video_Behavior_FixationData": []
+    }
+    # V1 - V8
+    for _vid in range(0, 8):
 
-                    _startFrame = _sample + 1
-                    _endFrame = _sample + 1
-
-                    _yawList.clear()
-                    _pitchList.clear()
-
-                    continue
-
-                _endFrame += 1
-
-                _yawList.append(_longitude2)
-                _pitchList.append(_latitude2)
-
-                if _sample == len(_frameData) - 1:
-                    _timeDur = _endFrame - _startFrame
+        m_processedBehaviorVideoStructure = {
+            "VideoID": "V%s" % str(_vid + 1),
+            "Fixation": []
+        }
 
-                    if _timeDur / m_videoFpsList[_vid] >= 0.2:
-                        _fixation = Get_CentroidPoint(_yawList, _pitchList)
+        _yawArray, _pitchArray, _velocity, _acceleration = m_eyeMovementList[_vid]
+        _startFrame, _endFrame, _pitch, _yaw = Get_FixationArrays(_yawArray, _pitchArray, _velocity, _acceleration, m_videoFpsList[_vid],
+                                                                  _velocityThreshold, _accelerationThreshold, _durationThreshold)
+        for _start, _end, _p, _y in zip(_startFrame.tolist(), _endFrame.tolist(), np.round(_pitch, 3).tolist(), np.round(_yaw, 3).tolist()):
+            m_HE_FixationData = {
+                "StartFrame": _start,
+                "EndFrame": _end,
+                "Pitch": _p,
+                "Yaw": _y
+            }
+            m_processedBehaviorVideoStructure['Fixation'].append(m_HE_FixationData)
+        m_fixationCount[_vid] = len(_startFrame)
 
-                        m_HE_FixationData = {
-                            "StartFrame": _startFrame,
-                            "EndFrame": _endFrame - 1,
-                            "Pitch": round(_fixation[1], 3),
-                            "Yaw": round(_fixation[0], 3)
-                        }
-                        m_processedBehaviorVideoStructure['Fixation'].append(m_HE_FixationData)
-                        m_fixationCount[_pid - 1][_vid] += 1
+        m_processedBehaviorDataParticipantJsonStruct['Video_Behavior_FixationData'].append(
+            m_processedBehaviorVideoStructure)
+    m_processedBehaviorFrameDataStructure['Behavior_FixationData'].append(
+        m_processedBehaviorDataParticipantJsonStruct)
 
-            m_processedBehaviorDataParticipantJsonStruct['Video_Behavior_FixationData'].append(
-                m_processedBehaviorVideoStructure)
-        m_processedBehaviorFrameDataStructure['Behavior_FixationData'].append(
-            m_processedBehaviorDataParticipantJsonStruct)
+    # save as json file, or in the binary format chosen with --format
+    ceap_io.write_data_file(m_processedBehaviorFrameDataStructure,
+                            Get_FixationPath(_pid, _velocityThreshold, _accelerationThreshold, _durationThreshold), _format)
+    return m_fixationCount
 
-        # save as json file
-        m_jsonStr = json.dumps(m_processedBehaviorFrameDataStructure, indent=4)
-        with open('../../4_BehaviorData/EM_Fixation/P%s_Behavior_FixationData.json' % str(_pid), 'w') as f:
-            f.write(m_jsonStr)
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Get eye gaze fixation data. The thresholds other than the default ones are saved with them in the file name")
+    parser.add_argument("--velocity", type=float, default=75, help="Velocity threshold of the saccades in degrees per second")
+    parser.add_argument("--acceleration", type=float, default=200, help="Acceleration threshold of the saccades in degrees per second^2")
+    parser.add_argument("--duration", type=float, default=0.2, help="Minimum duration of the fixations in seconds")
+    ceap_io.add_format_argument(parser)
+    args = parser.parse_args()
 
-Get_FixationData()
+    # P1 - P32
+    for _pid in range(1, 33):
+        Get_FixationData(_pid, args.format, args.velocity, args.acceleration, args.duration)
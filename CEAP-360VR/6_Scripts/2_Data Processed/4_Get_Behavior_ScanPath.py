@@ -2,58 +2,66 @@
 # 1) Get head scan path points
 # (20200310 created by Tong Xue)
 
-import json
-import math
+import argparse
 import numpy as np
 
+import ceap_io
+import ceap_spherical
+
 # Get video fps
 m_videoFpsList = []
-with open('../../1_Stimuli/VideoInfo.json', mode='r') as _videoInfoFile:
-    _videoInfoData = json.load(_videoInfoFile)
+_videoInfoData = ceap_io.load_json('../../1_Stimuli/VideoInfo.json')
 for i in range(1, len(_videoInfoData["VideoInfo"])):
     m_videoFpsList.append(_videoInfoData["VideoInfo"][i]["FrameRate"])
 
 
-# Calculate Angle Distance
-def Get_AngleDistance(_longitude1, _latitude1, _longitude2, _latitude2):
-    _radLong1 = math.radians(_longitude1)
-    _radLat1 = math.radians(_latitude1)
-    _radLong2 = math.radians(_longitude2)
-    _radLat2 = math.radians(_latitude2)
+# Get the window of each frame: the window k (from 1) has the frames with _windowLength * (k - 1) < TimeStamp <= _windowLength * k
+# the limits are the same products as the comparisons of the first version of the script, so the frames on a limit stay in the same window
+def Get_WindowID(_timeStamp, _windowLength):
+    _windowLimit = _windowLength * np.arange(1, int(np.ceil(np.max(_timeStamp, initial=0) / _windowLength)) + 2)
+    return np.searchsorted(_windowLimit, _timeStamp, side="left") + 1
 
-    _longDis = _radLong2 - _radLong1
-    _latDis = _radLat2 - _radLat1
-    _radDis = 2 * math.asin(math.sqrt(math.pow(math.sin(_latDis / 2), 2) +
-                                      math.cos(_radLat1) * math.cos(_radLat2) * math.pow(math.sin(_longDis / 2), 2)))
-    _angleDis = math.degrees(_radDis)
-    return _angleDis
 
+# Get the scan path points of the frames 1 to N-1, the centroid of the head positions of each window
+# the last window is dropped as in the first version of the script, unless _includePartial
+# Returns the arrays ID, Pitch, Yaw of the windows
+def Get_ScanPathArrays(_timeStamp, _yawArray, _pitchArray, _windowLength=0.2, _includePartial=False):
+    _windowID = Get_WindowID(_timeStamp[1:], _windowLength)
+    if len(_windowID) == 0:
+        return np.zeros(0, dtype=int), np.zeros(0), np.zeros(0)
 
-# Get the centroid coordinate
-def Get_CentroidPoint(_yawList, _pitchList):
-    if max(_yawList) - min(_yawList) > 200:
+    # runs of frames in the same window, the frame i + 1 is _windowID[i]
+    _startFrame = np.flatnonzero(np.diff(_windowID, prepend=-1) != 0) + 1
+    _endFrame = np.append(_startFrame[1:] - 1, len(_timeStamp) - 1)
+    if not _includePartial:
+        _startFrame = _startFrame[:-1]
+        _endFrame = _endFrame[:-1]
 
-        for _sample in range(len(_yawList)):
-            if _yawList[_sample] < 0:
-                _yawList[_sample] = 360 + _yawList[_sample]
+    _yawCentroid, _pitchCentroid = ceap_spherical.segment_centroids(_yawArray, _pitchArray, _startFrame, _endFrame)
+    return _windowID[_startFrame - 1], _pitchCentroid, _yawCentroid
 
-    x = np.mean(_yawList)
-    y = np.mean(_pitchList)
 
-    if x > 180:
-        x = x - 360
+# Get the path of the scan path data of a window length, the 200ms windows keep the path of the dataset
+def Get_ScanPathPath(_pid, _windowLength):
+    if np.isclose(_windowLength, 0.2):
+        return '../../4_BehaviorData/HM_ScanPath/P%s_Behavior_HeadScanPathData.json' % str(_pid)
+    return '../../4_BehaviorData/HM_ScanPath/P%s_Behavior_HeadScanPathData_%dms.json' % (str(_pid), round(_windowLength * 1000))
 
-    return [x, y]
 
+# Get the scan path points of a participant, for each window length in seconds
+def Get_HM_ScanPathData(_pid, _format="json", _windowLengthList=(0.2,), _includePartial=False):
 
-# Get the scan path points
-def Get_HM_ScanPathData():
-    # P1 - P32
-    for _pid in range(1, 33):
+    m_participantData = ceap_io.load_output('../../4_BehaviorData/Frame/P%s_Behavior_FrameData.json' % str(_pid))
 
-        with open('../../4_BehaviorData/Frame/P%s_Behavior_FrameData.json' % str(_pid),
-                  mode='r') as _participantDataFile:
-            m_participantData = json.load(_participantDataFile)
+    # head positions of the videos, read once for all the window lengths
+    m_videoDataList = []
+    for _vid in range(0, 8):
+        _frameData = m_participantData['Behavior_FrameData'][0]["Video_Behavior_FrameData"][_vid]["HM"]
+        m_videoDataList.append((np.array([_frame["TimeStamp"] for _frame in _frameData], dtype=np.float64),
+                                np.array([_frame["Yaw"] for _frame in _frameData], dtype=np.float64),
+                                np.array([_frame["Pitch"] for _frame in _frameData], dtype=np.float64)))
+
+    for _windowLength in _windowLengthList:
 
         m_processedBehaviorFrameDataStructure = {"Behavior_HeadScanPath_Data": []}
 
@@ -69,51 +77,31 @@ def Get_HM_ScanPathData():
                 "ID_Pitch_Yaw": []
             }
 
-            _frameData = m_participantData['Behavior_FrameData'][0]["Video_Behavior_FrameData"][_vid]["HM"]
-
-            _velocityPre = 0
-
-            m_pitchList = []
-            m_yawList = []
-            _windowCount = 1
-
-            for i in range(1, len(_frameData)):
-
-                _time = _frameData[i]["TimeStamp"]
-
-                # each 200ms window
-                if _time > 0.2 * _windowCount:
-                    _centroid = Get_CentroidPoint(m_yawList, m_pitchList)
+            _timeStamp, _yawArray, _pitchArray = m_videoDataList[_vid]
+            _windowID, _pitch, _yaw = Get_ScanPathArrays(_timeStamp, _yawArray, _pitchArray, _windowLength, _includePartial)
 
-                    m_scanPath_Data = {
-                        "ID": _windowCount,
-                        "Pitch": round(_centroid[1], 3),
-                        "Yaw": round(_centroid[0], 3),
-                    }
-                    m_processedBehaviorVideoStructure['ID_Pitch_Yaw'].append(m_scanPath_Data)
-
-                    _windowCount += 1
-
-                    m_pitchList.clear()
-                    m_yawList.clear()
-
-                    m_pitchList.append(_frameData[i]["Pitch"])
-                    m_yawList.append(_frameData[i]["Yaw"])
-
-                    continue
-
-                m_pitchList.append(_frameData[i]["Pitch"])
-                m_yawList.append(_frameData[i]["Yaw"])
+            m_processedBehaviorVideoStructure['ID_Pitch_Yaw'] = [
+                {"ID": _id, "Pitch": _p, "Yaw": _y}
+                for _id, _p, _y in zip(_windowID.tolist(), np.round(_pitch, 3).tolist(), np.round(_yaw, 3).tolist())
+            ]
 
             m_processedBehaviorDataParticipantJsonStruct['Video_Behavior_ScanPath_Data'].append(
                 m_processedBehaviorVideoStructure)
         m_processedBehaviorFrameDataStructure['Behavior_HeadScanPath_Data'].append(
             m_processedBehaviorDataParticipantJsonStruct)
 
-        # save as json file
-        m_jsonStr = json.dumps(m_processedBehaviorFrameDataStructure, indent=4)
-        with open('../../4_BehaviorData/HM_ScanPath/P%s_Behavior_HeadScanPathData.json' % str(_pid), 'w') as f:
-            f.write(m_jsonStr)
+        # save as json file, or in the binary format chosen with --format
+        ceap_io.write_data_file(m_processedBehaviorFrameDataStructure, Get_ScanPathPath(_pid, _windowLength), _format)
+
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Get head scan path points")
+    parser.add_argument("--window", type=float, nargs="+", default=[0.2],
+                        help="Window lengths in seconds, e.g., 0.1 0.2 0.5. The windows other than 0.2 are saved with their length in ms in the file name")
+    parser.add_argument("--include-partial", action="store_true", help="Keep the last window of each video, dropped by default")
+    ceap_io.add_format_argument(parser)
+    args = parser.parse_args()
 
-Get_HM_ScanPathData()
+    # P1 - P32
+    for _pid in range(1, 33):
+        Get_HM_ScanPathData(_pid, args.format, args.window, args.include_partial)
@@ -2,10 +2,13 @@
 # 1) Transform the raw behavior data
 # (20200310 created by Tong)
 
-import json
+import argparse
 import numpy as np
 import math
 
+import ceap_io
+
+
 # Convert eye gaze direction vector to Euler angles (yaw, pitch)
 def Get_EyeRotData(_eyeRot):
     # yaw = longitude;  pitch = latitude
@@ -26,11 +29,39 @@ def Get_EyeRotData(_eyeRot):
     return _eyeRotData
 
 
-# P1 - P32
-for _pid in range(1, 33):
+# Convert an (N, 3) array of eye gaze direction vectors to an (N, 2) array of Euler angles (yaw, pitch)
+def Get_EyeRotData_Array(_eyeRot):
+    _eyeRot = np.asarray(_eyeRot, dtype=np.float64).reshape(-1, 3)
+    _x, _y, _z = _eyeRot[:, 0], _eyeRot[:, 1], _eyeRot[:, 2]
+
+    # arctan2 has the same quadrants as the +-180 fix-ups of Get_EyeRotData
+    _yaw = np.arctan2(_x, _z)
+    # except x = 0 and z < 0, which Get_EyeRotData leaves at atan(0 / z) = -0
+    _yaw = np.where((_x == 0) & (_z < 0), _x / np.where(_z < 0, _z, -1), _yaw)
+    # the sign of the latitude is the sign of y
+    with np.errstate(divide='ignore', invalid='ignore'):
+        _pitch = np.arcsin(_y / np.sqrt(_x * _x + _y * _y + _z * _z))
+
+    _eyeRotData = np.degrees(np.stack([_yaw, _pitch], axis=1))
+    return _eyeRotData
+
+
+# Convert head rotation angles in range of [0, 360] to [-180, 180]
+def Get_HeadRotData_Array(_headRot):
+    _headRot = np.asarray(_headRot)
+    return np.where(_headRot > 180, _headRot - 360, _headRot)
+
 
-    with open('../../4_BehaviorData/Raw/P%s_Behavior_RawData.json' % str(_pid), mode='r') as _behaviorDataFile:
-        m_behaviorRawData = json.load(_behaviorDataFile)
+# Round the values of an array as round(_value, 3) on each sample
+def Get_RoundedList(_values):
+    return [round(_value, 3) for _value in np.asarray(_values).tolist()]
+
+
+# Transform the raw behavior data of a participant
+def Get_BehaviorTransData(_pid, _format="json"):
+
+    # samples are decoded as columns, e.g. _rawData['HM']['Y'][i]
+    m_behaviorRawData = ceap_io.load_json_streaming('../../4_BehaviorData/Raw/P%s_Behavior_RawData.json' % str(_pid))
 
     m_transBehaviorDataStructure = {"Behavior_TransData": []}
     m_transBehaviorDataParticipantJsonStruct = {
@@ -48,79 +79,46 @@ for _pid in range(1, 33):
             "EM": [],
             "LEM": [],
             "REM": [],
-            "LPD": _rawData['LPD'],
-            "RPD": _rawData['RPD']
+            "LPD": ceap_io.columns_to_samples(_rawData['LPD']),
+            "RPD": ceap_io.columns_to_samples(_rawData['RPD'])
         }
 
         # Convert raw head rotation to (yaw, pitch) in range of [-180, 180], [-90, 90]
-        for i in range(0, len(_rawData['HM'])):
-            if _rawData['HM'][i]['Y'] > 180:
-                _headYaw = _rawData['HM'][i]['Y'] - 360
-            else:
-                _headYaw = _rawData['HM'][i]['Y']
-
-            if _rawData['HM'][i]['X'] > 180:
-                _headPitch = _rawData['HM'][i]['X'] - 360
-            else:
-                _headPitch = _rawData['HM'][i]['X']
-
-            if _rawData['HM'][i]['Z'] > 180:
-                _headRoll = _rawData['HM'][i]['Z'] - 360
-            else:
-                _headRoll = _rawData['HM'][i]['Z']
-
-            m_headRotData = {
-                "TimeStamp": round(_rawData['HM'][i]['TimeStamp'], 3),
-                "Pitch": round(_headPitch, 3),
-                "Yaw": round(_headYaw, 3),
-            }
-            m_transBehaviorDataVideoJsonStruct['HM'].append(m_headRotData)
-
-        # Convert raw EM to (yaw, pitch) in range of [-180, 180], [-90, 90]
-        for i in range(0, len(_rawData['EM'])):
-            _eyeRotData = Get_EyeRotData([_rawData['EM'][i]['X'], _rawData['EM'][i]['Y'], _rawData['EM'][i]['Z']])
-
-            m_eyeRotData = {
-                "TimeStamp": round(_rawData['EM'][i]['TimeStamp'], 3),
-                "Pitch": round(_eyeRotData[1], 3),
-                "Yaw": round(_eyeRotData[0], 3),
-            }
-            m_transBehaviorDataVideoJsonStruct['EM'].append(m_eyeRotData)
-
-        # Convert raw LEM to (yaw, pitch) in range of [-180, 180], [-90, 90]
-        for i in range(0, len(_rawData['LEM'])):
-            _eyeRotData = Get_EyeRotData([_rawData['LEM'][i]['X'], _rawData['LEM'][i]['Y'], _rawData['LEM'][i]['Z']])
-
-            m_eyeRotData = {
-                "TimeStamp": round(_rawData['LEM'][i]['TimeStamp'], 3),
-                "Pitch": round(_eyeRotData[1], 3),
-                "Yaw": round(_eyeRotData[0], 3),
-            }
-            m_transBehaviorDataVideoJsonStruct['LEM'].append(m_eyeRotData)
-
-        # Convert raw REM to (yaw, pitch) in range of [-180, 180], [-90, 90]
-        for i in range(0, len(_rawData['REM'])):
-            _eyeRotData = Get_EyeRotData([_rawData['REM'][i]['X'], _rawData['REM'][i]['Y'], _rawData['REM'][i]['Z']])
-
-            m_eyeRotData = {
-                "TimeStamp": round(_rawData['REM'][i]['TimeStamp'], 3),
-                "Pitch": round(_eyeRotData[1], 3),
-                "Yaw": round(_eyeRotData[0], 3),
-            }
-            m_transBehaviorDataVideoJsonStruct['REM'].append(m_eyeRotData)
+        _headTimeStamp = Get_RoundedList(_rawData['HM']['TimeStamp'])
+        _headPitch = Get_RoundedList(Get_HeadRotData_Array(_rawData['HM']['X']))
+        _headYaw = Get_RoundedList(Get_HeadRotData_Array(_rawData['HM']['Y']))
+        m_transBehaviorDataVideoJsonStruct['HM'] = [{"TimeStamp": _t, "Pitch": _p, "Yaw": _y}
+                                                    for _t, _p, _y in zip(_headTimeStamp, _headPitch, _headYaw)]
+
+        # Convert raw EM, LEM and REM to (yaw, pitch) in range of [-180, 180], [-90, 90]
+        # the three streams are converted together, then split again
+        _eyeStreams = ['EM', 'LEM', 'REM']
+        _eyeRot = np.concatenate([np.stack([np.asarray(_rawData[_stream][_axis], dtype=np.float64) for _axis in ['X', 'Y', 'Z']], axis=1)
+                                  for _stream in _eyeStreams])
+        _eyeRotData = Get_EyeRotData_Array(_eyeRot)
+        _eyeYaw = Get_RoundedList(_eyeRotData[:, 0])
+        _eyePitch = Get_RoundedList(_eyeRotData[:, 1])
+
+        _start = 0
+        for _stream in _eyeStreams:
+            _end = _start + len(_rawData[_stream]['TimeStamp'])
+            _eyeTimeStamp = Get_RoundedList(_rawData[_stream]['TimeStamp'])
+            m_transBehaviorDataVideoJsonStruct[_stream] = [{"TimeStamp": _t, "Pitch": _p, "Yaw": _y}
+                                                           for _t, _p, _y in zip(_eyeTimeStamp, _eyePitch[_start:_end], _eyeYaw[_start:_end])]
+            _start = _end
 
         m_transBehaviorDataParticipantJsonStruct['Video_Behavior_TransData'].append(m_transBehaviorDataVideoJsonStruct)
     m_transBehaviorDataStructure['Behavior_TransData'].append(m_transBehaviorDataParticipantJsonStruct)
 
-    # save as json file
-    m_jsonStr = json.dumps(m_transBehaviorDataStructure, indent=4)
-    with open('../../4_BehaviorData/Transformed/P%s_Behavior_TransData.json' % str(_pid), 'w') as f:
-        f.write(m_jsonStr)
-
-
-
-
-
+    # save as json file, or in the binary format chosen with --format
+    ceap_io.write_data_file(m_transBehaviorDataStructure, '../../4_BehaviorData/Transformed/P%s_Behavior_TransData.json' % str(_pid), _format)
 
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Transform the raw behavior data")
+    ceap_io.add_format_argument(parser)
+    args = parser.parse_args()
 
+    # P1 - P32
+    for _pid in range(1, 33):
+        Get_BehaviorTransData(_pid, args.format)
@@ -0,0 +1,96 @@
+# this script is used to
+# 1) Compare the streaming physio filter (ceap_physio.StreamingPhysioFilter) with the offline filter of 5_Get_Physio_TransData
+#    on the recorded raw physiological data (EDA, BVP, SKT), fed in chunks as they arrive from the E4
+
+import argparse
+import numpy as np
+import pandas as pd
+import scipy.signal as signal
+
+import ceap_io
+import ceap_physio
+
+
+m_physioChannelList = ["EDA", "BVP", "SKT"]
+m_filterOrder = 3
+m_filterCutoff = 0.5
+
+
+# Filter a signal in chunks of _chunkSize samples
+def Get_StreamingData(_signal, _streamingFilter, _chunkSize):
+    _streamingFilter.reset()
+    return np.concatenate([_streamingFilter.process(_signal[i:i + _chunkSize]) for i in range(0, len(_signal), _chunkSize)])
+
+
+# Delay in samples of _streamingData with respect to _offlineData, by cross-correlation
+def Get_Lag(_streamingData, _offlineData, _maxLag):
+    _corrList = [np.corrcoef(_streamingData[_lag:], _offlineData[:len(_offlineData) - _lag])[0, 1] for _lag in range(0, _maxLag + 1)]
+    _lag = int(np.nanargmax(_corrList))
+    return _lag, _corrList[_lag]
+
+
+# Compare the streaming and offline filters for a channel of a video
+def Compare_Filters(_signal, _channel, _chunkSeconds, _normalization, _warmupSeconds):
+    _sampleRate = ceap_physio.SAMPLE_RATES[_channel]
+    _chunkSize = max(1, int(round(_chunkSeconds * _sampleRate)))
+    _warmup = int(_warmupSeconds * _sampleRate)
+
+    # only the filters, without normalization
+    _streamingFilter = ceap_physio.StreamingPhysioFilter(1, _sampleRate, m_filterOrder, m_filterCutoff, normalization="none")
+    _streamingData = Get_StreamingData(_signal, _streamingFilter, _chunkSize)
+    _offlineData = signal.sosfiltfilt(ceap_physio.get_lowpass_sos(m_filterOrder, m_filterCutoff), _signal, padlen=3 * (m_filterOrder + 1))
+    _lag, _corr = Get_Lag(_streamingData, _offlineData, int(np.ceil(4 * _streamingFilter.latency_samples)))
+
+    # the output does not depend on the size of the chunks
+    _chunkDiff = np.max(np.abs(_streamingData - Get_StreamingData(_signal, _streamingFilter, len(_signal))))
+
+    # filters and normalization, after the warm-up of the running statistics
+    _streamingFilter = ceap_physio.StreamingPhysioFilter(1, _sampleRate, m_filterOrder, m_filterCutoff, normalization=_normalization)
+    _streamingNormData = Get_StreamingData(_signal, _streamingFilter, _chunkSize)
+    if _normalization == "minmax":
+        _offlineNormData = ceap_physio.lowpass_normalize(_signal, m_filterOrder, m_filterCutoff)
+    elif _normalization == "ewma":
+        _offlineNormData = (_offlineData - np.mean(_offlineData)) / np.std(_offlineData)
+    else:
+        _offlineNormData = _offlineData
+    _normError = np.mean(np.abs(_streamingNormData[_warmup:] - _offlineNormData[_warmup:]))
+
+    return {
+        "latency_s": _streamingFilter.latency,
+        "lag_s": _lag / _sampleRate,
+        "lag_corr": _corr,
+        "chunk_diff": _chunkDiff,
+        "norm_mae": _normError,
+    }
+
+
+# Compare the filters on the raw data of the participants
+def Compare_StreamingFilter(_participantList, _chunkSeconds, _normalization, _warmupSeconds):
+    m_resultList = []
+    for _pid in _participantList:
+        m_participantData = ceap_io.load_json_streaming('../../5_PhysioData/Raw/P%s_Physio_RawData.json' % str(_pid))
+
+        for _vid in range(0, 8):
+            _data = m_participantData['Physio_RawData'][0]['Video_Physio_RawData'][_vid]
+
+            for _channel in m_physioChannelList:
+                _signal = np.asarray(_data[_channel + "_RawData"][_channel], dtype=np.float64)
+                m_result = {"ParticipantID": _pid, "VideoID": _vid + 1, "Channel": _channel}
+                m_result.update(Compare_Filters(_signal, _channel, _chunkSeconds, _normalization, _warmupSeconds))
+                m_resultList.append(m_result)
+        print("P%s done" % str(_pid))
+
+    m_results = pd.DataFrame(m_resultList)
+    print(m_results.groupby("Channel")[["latency_s", "lag_s", "lag_corr", "chunk_diff", "norm_mae"]].mean().to_string(float_format="{:.4g}".format))
+    return m_results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the streaming physio filter with the offline filter on the raw data")
+    parser.add_argument("-p", "--participants", type=int, nargs="+", default=list(range(1, 33)), help="Participant IDs, by default all of them")
+    parser.add_argument("--chunk", type=float, default=1.0, help="Duration of the chunks in seconds")
+    parser.add_argument("--normalization", type=str, default="minmax", choices=ceap_physio.StreamingPhysioFilter.LIST_NORMALIZATIONS)
+    parser.add_argument("--warmup", type=float, default=10.0, help="Seconds of each video ignored to compare the normalized outputs")
+    args = parser.parse_args()
+
+    Compare_StreamingFilter(args.participants, args.chunk, args.normalization, args.warmup)
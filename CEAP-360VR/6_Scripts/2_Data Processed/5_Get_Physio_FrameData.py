@@ -2,19 +2,22 @@
 # 1) Re-sample and align the transformed physio data except IBI
 # (20200310 created by Tong Xue)
 
-import json
+import argparse
 import numpy as np
 
+import ceap_io
+
 
 # video fps
 m_videoFpsList = []
-with open('../../1_Stimuli/VideoInfo.json', mode='r') as _videoInfoFile:
-    _videoInfoData = json.load(_videoInfoFile)
+_videoInfoData = ceap_io.load_json('../../1_Stimuli/VideoInfo.json')
 
 for i in range(1, len(_videoInfoData["VideoInfo"])):
     m_videoFpsList.append(_videoInfoData["VideoInfo"][i]["FrameRate"])
 
-for _pid in range(1, 33):
+
+# Re-sample and align the transformed physio data of a participant
+def Get_PhysioFrameData(_pid, _format="json"):
 
     m_rawPhysioDataStructure = {"Physio_FrameData": []}
     # participant PhysioDataStructure
@@ -26,11 +29,10 @@ for _pid in range(1, 33):
             ]
     }
 
-    for _vid in range(0, 8):
+    # the Transformed file is read once for all the videos
+    m_participantData = ceap_io.load_output('../../5_PhysioData/Transformed/P%s_Physio_TransData.json' % str(_pid))
 
-        with open('../../5_PhysioData/Transformed/P%s_Physio_TransData.json' % str(_pid),
-                  mode='r') as _participantDataFile:
-            m_participantData = json.load(_participantDataFile)
+    for _vid in range(0, 8):
 
         _data = m_participantData['Physio_TransData'][0]['Video_Physio_TransData'][_vid]
 
@@ -163,6 +165,14 @@ for _pid in range(1, 33):
 
     m_rawPhysioDataStructure['Physio_FrameData'].append(m_jsonParticipantPhysioDataStruct)
 
-    m_jsonStr = json.dumps(m_rawPhysioDataStructure, indent=4)
-    with open('../../5_PhysioData/Frame/P%s_Physio_FrameData.json' % str(_pid), 'w') as f:
-        f.write(m_jsonStr)
+    ceap_io.write_data_file(m_rawPhysioDataStructure, '../../5_PhysioData/Frame/P%s_Physio_FrameData.json' % str(_pid), _format)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-sample and align the transformed physio data except IBI")
+    ceap_io.add_format_argument(parser)
+    args = parser.parse_args()
+
+    # P1 - P32
+    for _pid in range(1, 33):
+        Get_PhysioFrameData(_pid, args.format)
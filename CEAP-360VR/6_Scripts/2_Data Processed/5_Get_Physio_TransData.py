@@ -2,26 +2,27 @@
 # 1) Transform the raw physiological data (EDA, BVP, SKT) by a lwo-pass filter and normalization
 # (20200310 created by Tong Xue)
 
-import json
-import scipy.signal as signal
+import argparse
 import numpy as np
 
-m_secList = []
-m_sigList = []
+import ceap_io
+import ceap_physio
 
 
-# low-pass filter and normalization
-def SignalTrans(_signalList, order, cutoff):
-    wn = 2 * cutoff / 4
-    b, a = signal.butter(order, wn, 'lowpass')
-    filterY = signal.filtfilt(b, a, _signalList)
+# Channels filtered by a low-pass filter of (order, cutoff)
+m_physioChannelList = ["EDA", "BVP", "SKT"]
+m_filterOrder = 3
+m_filterCutoff = 0.5
 
-    _range = np.max(filterY) - np.min(filterY)
-    filterY1 = (filterY - np.min(filterY)) / _range
-    return filterY1
 
+# low-pass filter and normalization of each row of a (channels, samples) array, or of a single signal
+# the streaming counterpart is ceap_physio.StreamingPhysioFilter
+def SignalTransArray(_signalArray, order, cutoff, fs=4):
+    return ceap_physio.lowpass_normalize(_signalArray, order, cutoff, fs)
 
-for _pid in range(1, 33):
+
+# Transform the raw physiological data of a participant
+def Get_PhysioTransData(_pid, _format="json"):
 
     m_rawPhysioDataStructure = {"Physio_TransData": []}
     m_jsonParticipantPhysioDataStruct = {
@@ -32,79 +33,48 @@ for _pid in range(1, 33):
             ]
     }
 
-    for _vid in range(0, 8):
+    # samples are decoded as columns, e.g. _data['EDA'][_sample]
+    m_participantData = ceap_io.load_json_streaming('../../5_PhysioData/Raw/P%s_Physio_RawData.json' % str(_pid))
 
-        with open('../../5_PhysioData/Raw/P%s_Physio_RawData.json' % str(_pid), mode='r') as _participantDataFile:
-            m_participantData = json.load(_participantDataFile)
+    for _vid in range(0, 8):
 
         _data = m_participantData['Physio_RawData'][0]['Video_Physio_RawData'][_vid]
 
         m_jsonPhysioDataStruct = {
             "VideoID": 'V%s' % str(_vid + 1),
-            "ACC_RawData": _data['ACC_RawData'],
+            "ACC_RawData": ceap_io.columns_to_samples(_data['ACC_RawData']),
             "SKT_TransData": [],
             "EDA_TransData": [],
             "BVP_TransData": [],
-            "HR_TransData": _data['HR_RawData'],
-            "IBI_TransData": _data['IBI_RawData']
+            "HR_TransData": ceap_io.columns_to_samples(_data['HR_RawData']),
+            "IBI_TransData": ceap_io.columns_to_samples(_data['IBI_RawData'])
         }
 
-        # EDA
-        m_secList.clear()
-        m_sigList.clear()
-        _data = m_participantData['Physio_RawData'][0]['Video_Physio_RawData'][_vid]["EDA_RawData"]
-
-        for _sample in range(len(_data)):
-            m_secList.append(_data[_sample]['TimeStamp'])
-            m_sigList.append(_data[_sample]['EDA'])
-
-        m_transData = SignalTrans(m_sigList, 3, 0.5)
-        for i in range(0, len(m_transData)):
-            m_participantPhysioEDAStruct = {
-                "TimeStamp": m_secList[i],
-                "EDA": m_transData[i],
-            }
-            m_jsonPhysioDataStruct['EDA_TransData'].append(m_participantPhysioEDAStruct)
-
-        # BVP
-        m_secList.clear()
-        m_sigList.clear()
-        _data = m_participantData['Physio_RawData'][0]['Video_Physio_RawData'][_vid]["BVP_RawData"]
-
-        for _sample in range(len(_data)):
-            m_secList.append(_data[_sample]['TimeStamp'])
-            m_sigList.append(_data[_sample]['BVP'])
-
-        m_transData = SignalTrans(m_sigList, 3, 0.5)
-
-        for i in range(0, len(m_transData)):
-            m_participantPhysioEDAStruct = {
-                "TimeStamp": m_secList[i],
-                "BVP": m_transData[i],
-            }
-            m_jsonPhysioDataStruct['BVP_TransData'].append(m_participantPhysioEDAStruct)
-
-        # trans SKT
-        m_secList.clear()
-        m_sigList.clear()
-        _data = m_participantData['Physio_RawData'][0]['Video_Physio_RawData'][_vid]["SKT_RawData"]
-
-        for _sample in range(len(_data)):
-            m_secList.append(_data[_sample]['TimeStamp'])
-            m_sigList.append(_data[_sample]['SKT'])
-
-        m_transData = SignalTrans(m_sigList, 3, 0.5)
-        for i in range(0, len(m_transData)):
-            m_participantPhysioEDAStruct = {
-                "TimeStamp": m_secList[i],
-                "SKT": m_transData[i],
-            }
-            m_jsonPhysioDataStruct['SKT_TransData'].append(m_participantPhysioEDAStruct)
+        # EDA, BVP and SKT, the channels with the same number of samples are filtered together
+        _channelGroups = {}
+        for _channel in m_physioChannelList:
+            _channelGroups.setdefault(len(_data[_channel + "_RawData"]['TimeStamp']), []).append(_channel)
+
+        for _channelGroup in _channelGroups.values():
+            _signalArray = np.array([_data[_channel + "_RawData"][_channel] for _channel in _channelGroup], dtype=np.float64)
+            m_transData = SignalTransArray(_signalArray, m_filterOrder, m_filterCutoff)
+
+            for _channel, _transData in zip(_channelGroup, m_transData.tolist()):
+                m_jsonPhysioDataStruct[_channel + '_TransData'] = [{"TimeStamp": _t, _channel: _value}
+                                                                   for _t, _value in zip(_data[_channel + "_RawData"]['TimeStamp'], _transData)]
 
         m_jsonParticipantPhysioDataStruct['Video_Physio_TransData'].append(m_jsonPhysioDataStruct)
 
     m_rawPhysioDataStructure['Physio_TransData'].append(m_jsonParticipantPhysioDataStruct)
 
-    m_jsonStr = json.dumps(m_rawPhysioDataStructure, indent=4)
-    with open('../../5_PhysioData/Transformed/P%s_Physio_TransData.json' % str(_pid), 'w') as f:
-        f.write(m_jsonStr)
+    ceap_io.write_data_file(m_rawPhysioDataStructure, '../../5_PhysioData/Transformed/P%s_Physio_TransData.json' % str(_pid), _format)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Transform the raw physiological data (EDA, BVP, SKT)")
+    ceap_io.add_format_argument(parser)
+    args = parser.parse_args()
+
+    # P1 - P32
+    for _pid in range(1, 33):
+        Get_PhysioTransData(_pid, args.format)
@@ -0,0 +1,704 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# =============================================================================
+# Created Date: 2026/10
+# =============================================================================
+"""
+Functions to read and write the data files of the dataset CEAP-360VR,
+in JSON or in the binary formats `npz` and `parquet`.
+Shared by the processing scripts in this folder and `ceap_loader.py`.
+
+"""
+# =============================================================================
+# Imports
+# =============================================================================
+
+import os, re, json, argparse
+from array import array
+
+import numpy as np
+
+# Optional faster JSON encoder/decoder
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional parquet writer/reader
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# =============================================================================
+# JSON backend
+# =============================================================================
+
+# Environment variable to choose the backend: "orjson" or "json"
+JSON_BACKEND_ENV = "CEAP_JSON_BACKEND"
+LIST_JSON_BACKENDS = ["orjson", "json"]
+
+_json_backend = None
+
+def set_json_backend(backend = None):
+    """
+    Selects the library used by `load_json()`, `loads()`, `dumps()` and `dump_json()`.
+
+    :param backend: "orjson" or "json". By default, the value of the environment variable
+                    `CEAP_JSON_BACKEND`, or "orjson" if it is installed.
+    :type backend: str
+    :return: Name of the selected backend
+    :rtype: str
+    """
+    global _json_backend
+    if (backend is None):
+        backend = os.environ.get(JSON_BACKEND_ENV, "orjson" if orjson is not None else "json")
+    if (backend not in LIST_JSON_BACKENDS):
+        raise ValueError(f"The JSON backend should be one of {LIST_JSON_BACKENDS}")
+    if (backend == "orjson" and orjson is None):
+        raise ValueError("The JSON backend orjson is not installed")
+    _json_backend = backend
+    return _json_backend
+
+def get_json_backend():
+    """
+    Returns the name of the selected JSON backend, see `set_json_backend()`
+    """
+    return _json_backend if (_json_backend is not None) else set_json_backend()
+
+# Floats that orjson writes differently than `repr()`: exponents (1e-7 instead of 
+# 1e-07, 1e16 instead of 1e+16) and small numbers in decimal notation (0.00001 instead of 1e-05).
+# The patterns start with a literal to be fast, the surrounding characters are checked afterwards.
+_ORJSON_EXPONENT = re.compile(rb'e(-?)(\d+)')
+_ORJSON_SMALL_FLOAT = re.compile(rb'0\.0000\d+')
+
+def _is_indented_value_end(match):
+    # Values are followed by a line break when indented. Strings cannot contain it.
+    following = match.string[match.end():match.end()+2]
+    return (following in (b"", b",\n") or following[:1] == b"\n")
+
+def _orjson_exponent_to_repr(match):
+    if (match.start() == 0 or match.string[match.start()-1] not in b"0123456789" or not _is_indented_value_end(match)):
+        return match.group()
+    return b"e" + (match.group(1) or b"+") + match.group(2).rjust(2, b"0")
+
+def _orjson_small_float_to_repr(match):
+    if ((match.start() > 0 and match.string[match.start()-1] in b".0123456789") or not _is_indented_value_end(match)):
+        return match.group()
+    return repr(float(match.group())).encode()
+
+def _orjson_indent(json_bytes, indent):
+    """
+    Converts the indentation of 2 spaces of orjson to `indent` spaces.
+    Lines are replaced from the deepest level with a placeholder, that is
+    not present in the output of orjson because control characters are escaped.
+    """
+    depth = 1
+    while ((b"\n" + b"  "*depth) in json_bytes):
+        depth += 1
+    for level in range(depth-1, 0, -1):
+        json_bytes = json_bytes.replace(b"\n" + b"  "*level, b"\n" + b"\x00"*level)
+    return json_bytes.replace(b"\x00", b" "*indent)
+
+def _orjson_default(value):
+    # numpy scalars and arrays not handled by OPT_SERIALIZE_NUMPY
+    if (hasattr(value, "tolist")):
+        return value.tolist()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def loads(json_data):
+    """
+    Parses a JSON document from a string or bytes
+    """
+    if (get_json_backend() == "orjson"):
+        try:
+            return orjson.loads(json_data)
+        except orjson.JSONDecodeError:
+            # E.g., NaN is written by the stdlib but it is not valid JSON
+            pass
+    return json.loads(json_data)
+
+def dumps(json_data, indent = None):
+    """
+    Serializes an object to a JSON string. The output of both backends is
+    the same as `json.dumps(json_data, indent=indent)`: orjson only indents 
+    with 2 spaces, so the indentation of each line is converted, and the
+    floats that orjson formats differently are written with `repr()`.
+
+    :param json_data: Object to serialize
+    :param indent: Number of spaces per level. orjson is used only for multiples of 2
+    :type indent: int
+    :return: JSON document
+    :rtype: str
+    """
+    if (get_json_backend() == "orjson" and indent is not None and indent % 2 == 0):
+        try:
+            json_bytes = orjson.dumps(json_data, default=_orjson_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2)
+        except orjson.JSONEncodeError:
+            # E.g., keys that are not strings
+            json_bytes = b"null"
+        # NaN and infinity are written as null, and non-ASCII characters are not escaped by orjson
+        if (b"null" not in json_bytes and json_bytes.isascii()):
+            if (indent != 2):
+                json_bytes = _orjson_indent(json_bytes, indent)
+            json_bytes = _ORJSON_EXPONENT.sub(_orjson_exponent_to_repr, json_bytes)
+            json_bytes = _ORJSON_SMALL_FLOAT.sub(_orjson_small_float_to_repr, json_bytes)
+            return json_bytes.decode()
+    if (indent is None):
+        return json.dumps(json_data)
+    return json.dumps(json_data, indent=indent)
+
+def load_json(json_path):
+    """
+    Loads a JSON file with the selected backend
+
+    :param json_path: Path of the JSON file
+    :type json_path: str
+    :return: Loaded JSON file
+    :rtype: dict
+    """
+    with open(json_path, "rb") as json_file:
+        return loads(json_file.read())
+
+def dump_json(json_data, json_path, indent = None):
+    """
+    Writes an object in a JSON file with the selected backend, see `dumps()`
+    """
+    with open(json_path, "w") as json_file:
+        json_file.write(dumps(json_data, indent))
+
+# =============================================================================
+# Streaming decoder
+# =============================================================================
+
+# Size of the blocks read from disk by the streaming decoder
+JSON_CHUNK_SIZE = 1<<20
+# Samples longer than this are tokenized instead of matched as a whole
+_MAX_SAMPLE_SIZE = 1<<12
+
+_NUMBER = rb'-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?'
+# One token per match: punctuation | string | number | literal
+_JSON_TOKEN = re.compile(rb'\s*(?:([{}\[\]:,])|("(?:[^"\\]|\\.)*")|(' + _NUMBER + rb')|(true|false|null|NaN|Infinity|-Infinity))')
+_JSON_WHITESPACE = re.compile(rb'\s*')
+_JSON_LITERALS = { b"true": True, b"false": False, b"null": None,
+                    b"NaN": float("nan"), b"Infinity": float("inf"), b"-Infinity": float("-inf") }
+_PUNCTUATION, _STRING, _NUMBER_TOKEN, _LITERAL = 1, 2, 3, 4
+
+class _ColumnBuilder():
+    """
+    Growing column of a feature group. Values are stored in a typed array,
+    of integers or of floats. Columns with both integers and floats, or with
+    other values (strings, booleans, null), are stored as lists, so that
+    the values are written back as they were in the file.
+    """
+    def __init__(self):
+        self.values = array("q")
+
+    def append(self, value):
+        if (isinstance(self.values, array)):
+            if (type(value) is int and self.values.typecode == "q"):
+                try:
+                    self.values.append(value)
+                    return
+                except OverflowError:
+                    pass
+            elif (type(value) is float):
+                if (len(self.values) == 0):
+                    self.values = array("d")
+                if (self.values.typecode == "d"):
+                    self.values.append(value)
+                    return
+            self.values = self.values.tolist()
+        self.values.append(value)
+
+class _JsonTokenizer():
+    """
+    Reads the tokens of a JSON file by blocks of `chunk_size` bytes.
+    """
+    def __init__(self, json_file, chunk_size = JSON_CHUNK_SIZE):
+        self.json_file = json_file
+        self.chunk_size = chunk_size
+        self.buffer = b""
+        self.pos = 0
+        self.offset = 0     # Position of the buffer in the file
+        self.eof = False
+        self.strings = {}   # Keys and IDs are repeated in every sample
+        self.sample_patterns = {}
+
+    def _fill(self):
+        chunk = self.json_file.read(self.chunk_size)
+        if (not chunk):
+            self.eof = True
+            return
+        self.offset += self.pos
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+
+    def next(self):
+        """
+        Returns the next token as a tuple (kind, value)
+        """
+        while True:
+            match = _JSON_TOKEN.match(self.buffer, self.pos)
+            # Tokens at the end of the buffer might continue in the next block
+            if (match is None or match.end() == len(self.buffer)) and not self.eof:
+                self._fill()
+                continue
+            if (match is None):
+                if (_JSON_WHITESPACE.match(self.buffer, self.pos).end() == len(self.buffer)):
+                    return None, None
+                raise ValueError(f"Invalid JSON at byte {self.offset+self.pos}")
+            self.pos = match.end()
+            kind = match.lastindex
+            token = match.group(kind)
+            if (kind == _PUNCTUATION):
+                return kind, token
+            elif (kind == _STRING):
+                value = self.strings.get(token)
+                if (value is None):
+                    value = json.loads(token)
+                    if (len(self.strings) < 10000):
+                        self.strings[token] = value
+                return kind, value
+            elif (kind == _NUMBER_TOKEN):
+                return kind, (int(token) if token.isdigit() or token[1:].isdigit() else float(token))
+            return kind, _JSON_LITERALS[token]
+
+    def expect(self, punctuation):
+        kind, token = self.next()
+        if (kind != _PUNCTUATION or token != punctuation):
+            raise ValueError(f"Expected {punctuation.decode()} at byte {self.offset+self.pos}")
+
+    def match_sample(self, keys):
+        """
+        Matches `, {"key1": number, "key2": number, ...}` at the current
+        position without tokenizing it. Returns the numbers as strings
+        or None if the next sample has a different structure.
+        """
+        pattern = self.sample_patterns.get(keys)
+        if (pattern is None):
+            fields = rb'\s*,\s*'.join( re.escape(json.dumps(key).encode()) + rb'\s*:\s*(' + _NUMBER + rb')' for key in keys )
+            pattern = re.compile(rb'\s*,\s*\{\s*' + fields + rb'\s*\}')
+            self.sample_patterns[keys] = pattern
+
+        while (len(self.buffer) - self.pos < _MAX_SAMPLE_SIZE and not self.eof):
+            self._fill()
+        match = pattern.match(self.buffer, self.pos)
+        if (match is None):
+            return None
+        self.pos = match.end()
+        return match.groups()
+
+    def parse_value(self, kind = None, token = None):
+        """
+        Parses the next value. Arrays of flat objects are returned as
+        dictionaries {key: column}, see `load_json_streaming()`.
+        """
+        if (kind is None):
+            kind, token = self.next()
+        if (kind != _PUNCTUATION):
+            return token
+        if (token == b"{"):
+            return self._parse_object()
+        if (token == b"["):
+            return self._parse_array()
+        raise ValueError(f"Unexpected {token.decode()} at byte {self.offset+self.pos}")
+
+    def _parse_object(self):
+        data_object = {}
+        kind, token = self.next()
+        if (token == b"}"):
+            return data_object
+        while True:
+            if (kind != _STRING):
+                raise ValueError(f"Expected a key at byte {self.offset+self.pos}")
+            self.expect(b":")
+            data_object[token] = self.parse_value()
+            kind, token = self.next()
+            if (token == b"}"):
+                return data_object
+            if (token != b","):
+                raise ValueError(f"Expected , or }} at byte {self.offset+self.pos}")
+            kind, token = self.next()
+
+    def _parse_array(self):
+        kind, token = self.next()
+        if (token == b"]"):
+            return []
+        first_value = self.parse_value(kind, token)
+        if (isinstance(first_value, dict) and len(first_value) > 0 and
+                not any(isinstance(value, (dict, list)) for value in first_value.values())):
+            return self._parse_samples(first_value)
+
+        data_array = [first_value]
+        while True:
+            kind, token = self.next()
+            if (token == b"]"):
+                return data_array
+            if (token != b","):
+                raise ValueError(f"Expected , or ] at byte {self.offset+self.pos}")
+            data_array.append(self.parse_value())
+
+    def _parse_samples(self, first_sample):
+        keys = tuple(first_sample.keys())
+        columns = [ _ColumnBuilder() for _ in keys ]
+        for column, value in zip(columns, first_sample.values()):
+            column.append(value)
+
+        while True:
+            numbers = self.match_sample(keys)
+            if (numbers is not None):
+                for column, number in zip(columns, numbers):
+                    column.append(int(number) if number.isdigit() or number[1:].isdigit() else float(number))
+                continue
+
+            # Samples that are not only numbers are tokenized
+            kind, token = self.next()
+            if (token == b"]"):
+                break
+            if (token != b","):
+                raise ValueError(f"Expected , or ] at byte {self.offset+self.pos}")
+            sample = self.parse_value()
+            if (not isinstance(sample, dict) or tuple(sample.keys()) != keys):
+                raise ValueError(f"The samples before byte {self.offset+self.pos} do not have the keys {keys}")
+            for column, value in zip(columns, sample.values()):
+                column.append(value)
+
+        return { key: column.values for key, column in zip(keys, columns) }
+
+def load_json_streaming(json_path, chunk_size = JSON_CHUNK_SIZE):
+    """
+    Loads a JSON file of the dataset reading it by blocks. Arrays of
+    samples (objects with numbers, e.g., `[{"TimeStamp": 0.1, "X": 5}, ...]`)
+    are decoded as a dictionary of columns `{"TimeStamp": array, "X": array}`
+    without creating a Python object per sample. The rest of the file
+    keeps the structure of `json.load()`.
+
+    Numeric columns are `array.array` of type `q` (int64) or `d` (float64).
+    Columns with both integers and floats, or with other values, are lists. The peak memory is around the size of the
+    decoded numbers plus `chunk_size`, instead of ~10x the size of the file.
+
+    :param json_path: Path of the JSON file
+    :type json_path: str
+    :param chunk_size: Number of bytes read from disk at a time
+    :type chunk_size: int
+    :return: Loaded JSON file with columns instead of arrays of samples
+    :rtype: dict
+    """
+    with open(json_path, "rb") as json_file:
+        tokenizer = _JsonTokenizer(json_file, chunk_size)
+        json_data = tokenizer.parse_value()
+        if (tokenizer.next()[0] is not None):
+            raise ValueError(f"Extra data at byte {tokenizer.offset+tokenizer.pos}")
+        return json_data
+
+def columns_to_samples(columns):
+    """
+    Converts a dictionary of columns from `load_json_streaming()` back to
+    the list of samples in the JSON file, e.g., to write it again.
+
+    :param columns: Dictionary {key: column}
+    :type columns: dict
+    :return: List of dictionaries, one per sample
+    :rtype: list
+    """
+    if (isinstance(columns, list)):
+        # Empty arrays and arrays of other values are not converted
+        return columns
+    keys = list(columns.keys())
+    return [ dict(zip(keys, values)) for values in zip(*columns.values()) ]
+
+# =============================================================================
+# Binary formats
+# =============================================================================
+
+# Output formats of the processing scripts. JSON is the format of the published dataset
+LIST_OUTPUT_FORMATS = ["json", "npz", "parquet"]
+# Extensions of the data files, in order of preference when a file is available in many formats
+DATA_FILE_EXTENSIONS = [".npz", ".parquet", ".json"]
+
+K_PARTICIPANT = "ParticipantID"
+K_VIDEO = "VideoID"
+K_TIMESTAMP = "TimeStamp"
+
+# Key of the npz file and of the parquet metadata with the structure of the JSON file
+SCHEMA_KEY = "__schema__"
+# Columns of the parquet files, one row per value of a sample
+PARQUET_COLUMNS = [K_PARTICIPANT, K_VIDEO, "FeatureGroup", "Sample", K_TIMESTAMP, "Channel", "Value"]
+
+def _output_format_argument(output_format):
+    # Fails before processing any file if the format cannot be written
+    if (output_format == "parquet" and pyarrow is None):
+        raise argparse.ArgumentTypeError("the format parquet requires the package pyarrow")
+    return output_format
+
+def add_format_argument(parser):
+    """
+    Adds the option `--format {json,npz,parquet}` to the argument parser of a processing script
+    """
+    parser.add_argument("--format", type=_output_format_argument, default="json", choices=LIST_OUTPUT_FORMATS,
+                        help="Format of the output files. JSON is the format of the published dataset")
+    return parser
+
+def _samples_to_columns(samples):
+    """
+    Converts a list of samples `[{"TimeStamp": 0.1, "X": 5}, ...]` or the
+    columns from `load_json_streaming()` into a dictionary of numpy arrays.
+    """
+    if (isinstance(samples, dict)):
+        return { key: np.asarray(values) for key, values in samples.items() }
+    if (len(samples) == 0):
+        return {}
+    keys = list(samples[0].keys())
+    return { key: np.array([ sample[key] for sample in samples ]) for key in keys }
+
+def split_json_data(json_data):
+    """
+    Splits a document with the structure of the data files 
+    `{key: [{"ParticipantID", key_videos: [{"VideoID", feature group: [samples]}, ...]}]}` 
+    into a schema with the keys and a flat dictionary of numpy columns.
+
+    :param json_data: Document as written in the JSON files
+    :type json_data: dict
+    :return: Tuple (schema, {"V1/feature group/column": array})
+    :rtype: tuple
+    """
+    root_key = next(iter(json_data.keys()))
+    data_participant = json_data[root_key][0]
+    videos_key = [ key for key in data_participant.keys() if key != K_PARTICIPANT ]
+    if (len(json_data) != 1 or len(json_data[root_key]) != 1 or len(videos_key) != 1):
+        raise ValueError("The document does not have the structure of the data files of the dataset")
+    videos_key = videos_key[0]
+
+    schema = { "root_key": root_key, 
+                "participant_id": data_participant[K_PARTICIPANT], 
+                "videos_key": videos_key, 
+                "videos": [] }
+    columns = {}
+    for data_video in data_participant[videos_key]:
+        video_id = data_video[K_VIDEO]
+        video_schema = { "video_id": video_id, "feature_groups": [] }
+        for ft_group_name, data_feature_group in data_video.items():
+            if (ft_group_name == K_VIDEO):
+                continue
+            columns_group = _samples_to_columns(data_feature_group)
+            for colname, values in columns_group.items():
+                if (values.dtype.kind not in "iuf"):
+                    raise ValueError(f"The column {ft_group_name}/{colname} of {video_id} is not numeric")
+                columns[f"{video_id}/{ft_group_name}/{colname}"] = values
+            video_schema["feature_groups"].append({ "name": ft_group_name,
+                                                    "columns": list(columns_group.keys()),
+                                                    "dtypes": [ str(values.dtype) for values in columns_group.values() ] })
+        schema["videos"].append(video_schema)
+    return schema, columns
+
+def join_json_data(schema, columns):
+    """
+    Inverse of `split_json_data()`. The feature groups are returned as columns, 
+    with the same structure as `load_json_streaming()`
+    """
+    data_videos = []
+    for video_schema in schema["videos"]:
+        data_video = { K_VIDEO: video_schema["video_id"] }
+        for group_schema in video_schema["feature_groups"]:
+            ft_group_name = group_schema["name"]
+            if (len(group_schema["columns"]) == 0):
+                data_video[ft_group_name] = []
+                continue
+            data_video[ft_group_name] = { colname: columns[f"{video_schema['video_id']}/{ft_group_name}/{colname}"] 
+                                            for colname in group_schema["columns"] }
+        data_videos.append(data_video)
+    return { schema["root_key"]: [ { K_PARTICIPANT: schema["participant_id"], schema["videos_key"]: data_videos } ] }
+
+def _filter_schema_videos(schema, videos):
+    if (videos is not None):
+        schema["videos"] = [ video_schema for video_schema in schema["videos"] if video_schema["video_id"] in videos ]
+    return schema
+
+def write_npz(json_data, npz_path):
+    """
+    Writes a document with the structure of the data files in a npz file,
+    one array per column with the name "VideoID/feature group/column"
+    """
+    schema, columns = split_json_data(json_data)
+    columns[SCHEMA_KEY] = np.array(json.dumps(schema))
+    np.savez(npz_path, **columns)
+
+def load_npz(npz_path, videos = None):
+    """
+    Loads a npz file written with `write_npz()`. Only the arrays of the
+    videos in the list `videos` (e.g., ["V1", "V3"]) are read if given.
+    """
+    with np.load(npz_path) as npz_file:
+        schema = _filter_schema_videos(json.loads(npz_file[SCHEMA_KEY].item()), videos)
+        columns = { name: npz_file[name] for name in npz_file.files 
+                        if name != SCHEMA_KEY and name.split("/")[0] in { video["video_id"] for video in schema["videos"] } }
+    return join_json_data(schema, columns)
+
+def _parquet_channels(group_schema):
+    # The timestamps are stored in their own column of each row
+    channels = [ colname for colname in group_schema["columns"] if colname != K_TIMESTAMP ]
+    return channels if (len(channels) > 0) else group_schema["columns"]
+
+def write_parquet(json_data, parquet_path):
+    """
+    Writes a document with the structure of the data files in a parquet file
+    in long format, one row per value: `PARQUET_COLUMNS`. The schema of the 
+    document is stored in the metadata of the file to read it back.
+    """
+    if (pyarrow is None):
+        raise ValueError("The format parquet requires the package pyarrow")
+    schema, columns = split_json_data(json_data)
+
+    table_columns = { colname: [] for colname in PARQUET_COLUMNS }
+    for video_schema in schema["videos"]:
+        for group_schema in video_schema["feature_groups"]:
+            prefix = f"{video_schema['video_id']}/{group_schema['name']}/"
+            timestamps = columns.get(prefix + K_TIMESTAMP)
+            for colname in _parquet_channels(group_schema):
+                values = columns[prefix + colname]
+                table_columns[K_VIDEO].append(np.full(values.size, video_schema["video_id"], dtype=object))
+                table_columns["FeatureGroup"].append(np.full(values.size, group_schema["name"], dtype=object))
+                table_columns["Sample"].append(np.arange(values.size, dtype=np.int64))
+                table_columns[K_TIMESTAMP].append(timestamps.astype(np.float64) if (timestamps is not None) else np.full(values.size, np.nan))
+                table_columns["Channel"].append(np.full(values.size, colname, dtype=object))
+                table_columns["Value"].append(values.astype(np.float64))
+    num_rows = sum(values.size for values in table_columns["Value"])
+    table_columns[K_PARTICIPANT] = [ np.full(num_rows, schema["participant_id"], dtype=object) ]
+
+    arrays = []
+    for colname in PARQUET_COLUMNS:
+        values = np.concatenate(table_columns[colname]) if (num_rows > 0) else np.array([], dtype=object if colname in (K_PARTICIPANT, K_VIDEO, "FeatureGroup", "Channel") else np.float64)
+        array_column = pyarrow.array(values)
+        arrays.append(array_column.dictionary_encode() if (values.dtype == object) else array_column)
+    table = pyarrow.Table.from_arrays(arrays, names=PARQUET_COLUMNS)
+    table = table.replace_schema_metadata({ SCHEMA_KEY: json.dumps(schema) })
+    pyarrow.parquet.write_table(table, parquet_path)
+
+def load_parquet(parquet_path, videos = None):
+    """
+    Loads a parquet file written with `write_parquet()`. Only the rows of the
+    videos in the list `videos` (e.g., ["V1", "V3"]) are read if given.
+    """
+    if (pyarrow is None):
+        raise ValueError("The format parquet requires the package pyarrow")
+    filters = [(K_VIDEO, "in", list(videos))] if (videos is not None) else None
+    table = pyarrow.parquet.read_table(parquet_path, filters=filters)
+    schema = _filter_schema_videos(json.loads(table.schema.metadata[SCHEMA_KEY.encode()]), videos)
+
+    # Rows are written in blocks per video, feature group and channel, the
+    # column `Sample` restarts from 0 in each block
+    samples = table.column("Sample").to_numpy()
+    block_starts = np.flatnonzero(samples == 0)
+    block_ends = np.append(block_starts[1:], samples.size)
+    block_keys = table.select([K_VIDEO, "FeatureGroup", "Channel"]).take(pyarrow.array(block_starts)).to_pylist()
+    block_ranges = { "/".join(block_key.values()): (start, end) for block_key, start, end in zip(block_keys, block_starts, block_ends) }
+    timestamps = table.column(K_TIMESTAMP).to_numpy()
+    values = table.column("Value").to_numpy()
+
+    columns = {}
+    for video_schema in schema["videos"]:
+        for group_schema in video_schema["feature_groups"]:
+            prefix = f"{video_schema['video_id']}/{group_schema['name']}/"
+            dtypes = dict(zip(group_schema["columns"], group_schema["dtypes"]))
+            for colname in _parquet_channels(group_schema):
+                start, end = block_ranges[prefix + colname]
+                columns[prefix + colname] = values[start:end].astype(dtypes[colname])
+                if (K_TIMESTAMP in dtypes and colname != K_TIMESTAMP):
+                    columns[prefix + K_TIMESTAMP] = timestamps[start:end].astype(dtypes[K_TIMESTAMP])
+    return join_json_data(schema, columns)
+
+def write_data_file(json_data, json_path, output_format = "json"):
+    """
+    Writes the output of a processing script in the chosen format. The
+    extension of `json_path` is replaced for the binary formats.
+
+    :param json_data: Document with the structure of the data files
+    :type json_data: dict
+    :param json_path: Path of the JSON file, as published in the dataset
+    :type json_path: str
+    :param output_format: One of `LIST_OUTPUT_FORMATS`
+    :type output_format: str
+    :return: Path of the written file
+    :rtype: str
+    """
+    if (output_format not in LIST_OUTPUT_FORMATS):
+        raise ValueError(f"The output format should be one of {LIST_OUTPUT_FORMATS}")
+    data_path = os.path.splitext(json_path)[0] + "." + output_format
+    if (output_format == "json"):
+        # Same layout as the published dataset
+        with open(data_path, "w") as f:
+            f.write(dumps(json_data, indent=4))
+    elif (output_format == "npz"):
+        write_npz(json_data, data_path)
+    else:
+        write_parquet(json_data, data_path)
+    return data_path
+
+def select_data_file(data_paths):
+    """
+    Selects the file to read when the same data is available in many formats.
+    The most recent file is selected, binary formats are preferred if they
+    were modified at the same time.
+
+    :param data_paths: List of paths to the same data in different formats
+    :type data_paths: list
+    :return: Path of the selected file
+    :rtype: str
+    """
+    return max(data_paths, key=lambda data_path: (os.path.getmtime(data_path), 
+                                                -DATA_FILE_EXTENSIONS.index(os.path.splitext(data_path)[1])))
+
+def find_data_file(json_path):
+    """
+    Returns the path of the file with the data of `json_path` in any
+    of the formats in `DATA_FILE_EXTENSIONS`, see `select_data_file()`
+    """
+    data_paths = [ os.path.splitext(json_path)[0] + extension for extension in DATA_FILE_EXTENSIONS ]
+    data_paths = [ data_path for data_path in data_paths if os.path.isfile(data_path) ]
+    if (len(data_paths) == 0):
+        raise FileNotFoundError(f"There is no data file for {json_path}")
+    return select_data_file(data_paths)
+
+def load_data_file(data_path, videos = None):
+    """
+    Loads a data file in any format. The arrays of samples are returned
+    as columns, with the same structure as `load_json_streaming()`.
+
+    :param data_path: Path of the file in JSON, npz or parquet
+    :type data_path: str
+    :param videos: List of VideoIDs to load (only for the binary formats). By default, all of them.
+    :type videos: list
+    :return: Loaded file with columns instead of arrays of samples
+    :rtype: dict
+    """
+    extension = os.path.splitext(data_path)[1]
+    if (extension == ".npz"):
+        return load_npz(data_path, videos)
+    elif (extension == ".parquet"):
+        return load_parquet(data_path, videos)
+    return load_json_streaming(data_path)
+
+def load_output(json_path):
+    """
+    Loads the output of a previous processing script in whichever format it
+    was written, see `find_data_file()`. The structure is the same as 
+    `load_json()`, with lists of samples.
+
+    :param json_path: Path of the JSON file, as published in the dataset
+    :type json_path: str
+    :return: Loaded file
+    :rtype: dict
+    """
+    data_path = find_data_file(json_path)
+    if (data_path.endswith(".json")):
+        return load_json(data_path)
+
+    json_data = load_data_file(data_path)
+    for data_participant in next(iter(json_data.values())):
+        for data_video in data_participant[[ key for key in data_participant.keys() if key != K_PARTICIPANT ][0]]:
+            for ft_group_name, data_feature_group in data_video.items():
+                if (isinstance(data_feature_group, dict)):
+                    data_video[ft_group_name] = columns_to_samples({ key: values.tolist() for key, values in data_feature_group.items() })
+    return json_data
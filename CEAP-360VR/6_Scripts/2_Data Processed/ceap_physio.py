@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# =============================================================================
+# Created Date: 2026/10
+# =============================================================================
+"""
+Low-pass filter and normalization of the physiological signals of the
+Empatica E4 (EDA, BVP, SKT). The offline version is the zero-phase filter
+of `5_Get_Physio_TransData.py` with min-max normalization over the whole
+video. The streaming version filters chunks of samples as they arrive,
+for online monitoring during a session.
+
+Usage:
+    physio_filter = StreamingPhysioFilter(n_channels=1, sample_rate=4)
+    for chunk in chunks:
+        filtered_chunk = physio_filter.process(chunk)
+    print(physio_filter.latency)    # Seconds
+
+"""
+# =============================================================================
+# Imports
+# =============================================================================
+
+import functools
+
+import numpy as np
+import scipy.signal as signal
+
+# =============================================================================
+# Offline filter
+# =============================================================================
+
+# Sampling rates of the E4 channels, in Hz
+SAMPLE_RATES = { "EDA": 4, "BVP": 64, "SKT": 4 }
+
+@functools.lru_cache(maxsize=None)
+def get_lowpass_sos(order, cutoff, fs = 4):
+    """
+    Designs a Butterworth low-pass filter in second-order sections, once
+    per (order, cutoff, fs).
+
+    :param order: Order of the filter
+    :param cutoff: Cutoff frequency in Hz
+    :param fs: Sampling rate in Hz used for the design. The processing scripts
+               use 4 for all the channels (wn = 2 * cutoff / 4).
+    :return: Array of second-order sections
+    :rtype: np.ndarray
+    """
+    wn = 2 * cutoff / fs
+    return signal.butter(order, wn, "lowpass", output="sos")
+
+def lowpass_normalize(signals, order, cutoff, fs = 4):
+    """
+    Zero-phase low-pass filter and min-max normalization of each row of
+    a (channels, samples) array, or of a single signal.
+
+    :return: Filtered signals in [0, 1], same shape as `signals`
+    :rtype: np.ndarray
+    """
+    sos = get_lowpass_sos(order, cutoff, fs)
+    # Same padding as filtfilt with the (b, a) form: 3 * (order + 1) samples
+    filtered = signal.sosfiltfilt(sos, signals, axis=-1, padlen=3 * (order + 1))
+
+    filtered_min = np.min(filtered, axis=-1, keepdims=True)
+    filtered_range = np.max(filtered, axis=-1, keepdims=True) - filtered_min
+    return (filtered - filtered_min) / filtered_range
+
+# =============================================================================
+# Streaming filter
+# =============================================================================
+
+class StreamingPhysioFilter():
+    """
+    Causal counterpart of `lowpass_normalize()` for chunks of samples. The
+    state of the filter (`sosfilt`) and of the normalization is kept between
+    chunks, so the output does not depend on how the samples are split.
+
+    The output of a chunk is returned as soon as it is processed, the only
+    latency is the group delay of the causal filter (`latency`). The
+    normalization is either the running min-max since the first sample
+    ("minmax", in [0, 1] as the offline version), or a z-score with an
+    exponentially weighted mean and variance ("ewma"), which follows the
+    slow drifts of long sessions.
+    """
+    LIST_NORMALIZATIONS = ["minmax", "ewma", "none"]
+
+    def __init__(self, n_channels = 1, sample_rate = 4, order = 3, cutoff = 0.5, fs = 4,
+                 normalization = "minmax", halflife = 60):
+        """
+        :param n_channels: Number of channels of the chunks, filtered independently
+        :param sample_rate: Sampling rate of the chunks in Hz, e.g., `SAMPLE_RATES["BVP"]`.
+                            Only used to give the latency in seconds.
+        :param order: Order of the filter
+        :param cutoff: Cutoff frequency in Hz
+        :param fs: Sampling rate in Hz used for the design, see `get_lowpass_sos()`
+        :param normalization: "minmax", "ewma" or "none"
+        :param halflife: Half-life of the weights of the "ewma" normalization, in seconds
+        """
+        if (normalization not in self.LIST_NORMALIZATIONS):
+            raise ValueError(f"The normalization should be one of {self.LIST_NORMALIZATIONS}")
+        self.n_channels = n_channels
+        self.sample_rate = sample_rate
+        self.sos = get_lowpass_sos(order, cutoff, fs)
+        self.normalization = normalization
+        self.ewma_alpha = 1 - 0.5 ** (1 / (halflife * sample_rate))
+
+        # Group delay of the filter in samples, the largest one in the pass band
+        b, a = signal.sos2tf(self.sos)
+        frequencies = np.linspace(0, 2 * cutoff / fs * np.pi, 64)
+        self.latency_samples = float(np.max(signal.group_delay((b, a), w=frequencies)[1]))
+        self.reset()
+
+    @property
+    def latency(self):
+        """
+        Delay in seconds of the filtered output for the frequencies up to the cutoff
+        """
+        return self.latency_samples / self.sample_rate
+
+    def reset(self):
+        """
+        Forgets the previous chunks, e.g., at the start of a new video
+        """
+        self.zi = None
+        self.running_min = None
+        self.running_max = None
+        self.ewma_mean = None
+        self.ewma_square = None
+
+    def process(self, chunk):
+        """
+        Filters and normalizes the next chunk of samples.
+
+        :param chunk: Array of shape (samples,) for a single channel, or (channels, samples)
+        :return: Array of the same shape
+        :rtype: np.ndarray
+        """
+        chunk = np.asarray(chunk, dtype=np.float64)
+        samples = chunk.reshape(self.n_channels, -1)
+        if (samples.shape[1] == 0):
+            return chunk.copy()
+
+        if (self.zi is None):
+            # Steady state for the first sample, as filtfilt, to avoid the step response
+            self.zi = signal.sosfilt_zi(self.sos)[:, np.newaxis, :] * samples[np.newaxis, :, :1]
+        filtered, self.zi = signal.sosfilt(self.sos, samples, axis=-1, zi=self.zi)
+
+        if (self.normalization == "minmax"):
+            filtered = self._normalize_minmax(filtered)
+        elif (self.normalization == "ewma"):
+            filtered = self._normalize_ewma(filtered)
+        return filtered.reshape(chunk.shape)
+
+    def _normalize_minmax(self, filtered):
+        if (self.running_min is None):
+            self.running_min = filtered[:, 0].copy()
+            self.running_max = filtered[:, 0].copy()
+        running_min = np.minimum.accumulate(np.minimum(filtered, self.running_min[:, np.newaxis]), axis=1)
+        running_max = np.maximum.accumulate(np.maximum(filtered, self.running_max[:, np.newaxis]), axis=1)
+        self.running_min = running_min[:, -1]
+        self.running_max = running_max[:, -1]
+
+        running_range = running_max - running_min
+        # Ranges of the order of the rounding errors are constant signals
+        is_constant = running_range <= 16 * np.finfo(np.float64).eps * np.maximum(np.abs(running_min), np.abs(running_max))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(is_constant, 0.0, (filtered - running_min) / running_range)
+
+    def _normalize_ewma(self, filtered):
+        if (self.ewma_mean is None):
+            self.ewma_mean = filtered[:, 0].copy()
+            self.ewma_square = filtered[:, 0] ** 2
+        # The exponentially weighted averages are first-order IIR filters
+        b, a = [self.ewma_alpha], [1, self.ewma_alpha - 1]
+        mean, _ = signal.lfilter(b, a, filtered, axis=1, zi=(1 - self.ewma_alpha) * self.ewma_mean[:, np.newaxis])
+        square, _ = signal.lfilter(b, a, filtered ** 2, axis=1, zi=(1 - self.ewma_alpha) * self.ewma_square[:, np.newaxis])
+        self.ewma_mean = mean[:, -1]
+        self.ewma_square = square[:, -1]
+
+        std = np.sqrt(np.maximum(square - mean ** 2, 0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(std > 0, (filtered - mean) / std, 0.0)
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# =============================================================================
+# Created Date: 2026/10
+# =============================================================================
+"""
+Incremental driver of the processing scripts of this folder. The scripts are
+modelled as a graph of stages per participant:
+
+    Raw > Transformed (3_/4_/5_Get_*_TransData) > Frame (*_FrameData) > EM_Fixation / HM_ScanPath
+
+A node (stage, participant) is rebuilt only if its output is missing or was
+modified, or if the content of one of its inputs changed since it was built:
+the input files, the outputs of the previous stages, `VideoInfo.json`, the
+script itself and the modules shared by the scripts (`SHARED_INPUTS`). The
+content is compared by SHA1, which is only calculated again when the
+modification time or the size of a file changed. The state of the nodes is
+stored in `ceap_pipeline_state.json` at the root of the dataset.
+
+The stages run in waves (Transformed, Frame, derived), and the outdated nodes
+of a wave run in a pool of processes, see `ceap_runner.py`.
+
+Usage:
+    python ceap_pipeline.py                                 # Update all the stages of all participants
+    python ceap_pipeline.py --dry-run                       # List the outdated nodes
+    python ceap_pipeline.py --participants 7 4_Get_Behavior_GazeFixation   # Update a stage and its inputs
+
+"""
+# =============================================================================
+# Imports
+# =============================================================================
+
+import os, sys, time, hashlib, argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import ceap_io
+import ceap_runner
+
+# =============================================================================
+# Stages
+# =============================================================================
+
+VIDEO_INFO_PATH = '../../1_Stimuli/VideoInfo.json'
+STATE_PATH = '../../ceap_pipeline_state.json'
+STATE_VERSION = 1
+
+# Modules imported by the scripts, inputs of every stage: they change the outputs
+# (e.g., the JSON backend and the binary writers of ceap_io)
+SHARED_INPUTS = ['ceap_io.py', 'ceap_physio.py', 'ceap_spherical.py']
+
+# Inputs and output of each script, `%s` is replaced by the participant ID.
+# The outputs are JSON paths, the file may have been written in another format with --format.
+STAGES = {
+    "3_Get_Annotation_TransData": {
+        "inputs": ['../../3_AnnotationData/Raw/P%s_Annotation_RawData.json'],
+        "output": '../../3_AnnotationData/Transformed/P%s_Annotation_TransData.json',
+    },
+    "3_Get_Annotation_FrameData": {
+        "inputs": [VIDEO_INFO_PATH, '../../3_AnnotationData/Transformed/P%s_Annotation_TransData.json'],
+        "output": '../../3_AnnotationData/Frame/P%s_Annotation_FrameData.json',
+    },
+    "4_Get_Behavior_TransData": {
+        "inputs": ['../../4_BehaviorData/Raw/P%s_Behavior_RawData.json'],
+        "output": '../../4_BehaviorData/Transformed/P%s_Behavior_TransData.json',
+    },
+    "4_Get_Behavior_FrameData": {
+        "inputs": [VIDEO_INFO_PATH, '../../4_BehaviorData/Transformed/P%s_Behavior_TransData.json'],
+        "output": '../../4_BehaviorData/Frame/P%s_Behavior_FrameData.json',
+    },
+    "4_Get_Behavior_GazeFixation": {
+        "inputs": [VIDEO_INFO_PATH, '../../4_BehaviorData/Frame/P%s_Behavior_FrameData.json'],
+        "output": '../../4_BehaviorData/EM_Fixation/P%s_Behavior_FixationData.json',
+    },
+    "4_Get_Behavior_ScanPath": {
+        "inputs": [VIDEO_INFO_PATH, '../../4_BehaviorData/Frame/P%s_Behavior_FrameData.json'],
+        "output": '../../4_BehaviorData/HM_ScanPath/P%s_Behavior_HeadScanPathData.json',
+    },
+    "5_Get_Physio_TransData": {
+        "inputs": ['../../5_PhysioData/Raw/P%s_Physio_RawData.json'],
+        "output": '../../5_PhysioData/Transformed/P%s_Physio_TransData.json',
+    },
+    "5_Get_Physio_FrameData": {
+        "inputs": [VIDEO_INFO_PATH, '../../5_PhysioData/Transformed/P%s_Physio_TransData.json'],
+        "output": '../../5_PhysioData/Frame/P%s_Physio_FrameData.json',
+    },
+}
+
+# A stage depends on the stages whose output is one of its inputs
+DEPENDENCIES = { stage: [ other for other in STAGES.keys() if STAGES[other]["output"] in STAGES[stage]["inputs"] ] for stage in STAGES.keys() }
+
+def get_stage_depth(stage):
+    """
+    Returns the wave of a stage: 0 for the stages that read the Raw data
+    """
+    return 0 if (len(DEPENDENCIES[stage]) == 0) else 1 + max(get_stage_depth(other) for other in DEPENDENCIES[stage])
+
+def get_stages_with_dependencies(stages):
+    """
+    Returns the stages and all the stages they depend on, in the order of `STAGES`
+    """
+    selected = set()
+    pending = list(stages)
+    while (len(pending) > 0):
+        stage = pending.pop()
+        if (stage not in selected):
+            selected.add(stage)
+            pending.extend(DEPENDENCIES[stage])
+    return [ stage for stage in STAGES.keys() if stage in selected ]
+
+# =============================================================================
+# State
+# =============================================================================
+
+def load_state(state_path = STATE_PATH):
+    """
+    Loads the state of the nodes, or an empty state if it does not exist
+    """
+    try:
+        state = ceap_io.load_json(state_path)
+        if (state.get("version") == STATE_VERSION):
+            return state
+    except (OSError, ValueError):
+        pass
+    return { "version": STATE_VERSION, "files": {}, "nodes": {} }
+
+def save_state(state, state_path = STATE_PATH):
+    # Write in a temporary file first, so that an interrupted run does not corrupt the state
+    ceap_io.dump_json(state, state_path + ".tmp", indent=4)
+    os.replace(state_path + ".tmp", state_path)
+    return
+
+def get_file_hash(file_path, state):
+    """
+    Returns the SHA1 of a file. The hash stored in the state is reused if the
+    modification time and the size of the file did not change.
+    Returns None if the file does not exist.
+    """
+    try:
+        file_stat = os.stat(file_path)
+    except OSError:
+        return None
+    cached = state["files"].get(file_path)
+    if (cached is not None and cached["mtime_ns"] == file_stat.st_mtime_ns and cached["size"] == file_stat.st_size):
+        return cached["sha1"]
+
+    sha1 = hashlib.sha1()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha1.update(chunk)
+    state["files"][file_path] = { "mtime_ns": file_stat.st_mtime_ns, "size": file_stat.st_size, "sha1": sha1.hexdigest() }
+    return state["files"][file_path]["sha1"]
+
+def get_node_key(stage, participant_id):
+    return f"{stage}/P{participant_id}"
+
+def get_input_paths(stage, participant_id):
+    """
+    Returns the files read by a node: the script, the shared modules and
+    the inputs of the stage. The outputs of other stages are searched in
+    all the formats, see `ceap_io.find_data_file()`.
+    Returns None if an input does not exist.
+    """
+    input_paths = [ stage + ".py" ] + SHARED_INPUTS
+    for input_path in STAGES[stage]["inputs"]:
+        input_path = input_path % str(participant_id) if ("%s" in input_path) else input_path
+        if (any(STAGES[other]["output"] % str(participant_id) == input_path for other in DEPENDENCIES[stage])):
+            try:
+                input_path = ceap_io.find_data_file(input_path)
+            except FileNotFoundError:
+                return None
+        elif (not os.path.isfile(input_path)):
+            return None
+        input_paths.append(input_path)
+    return input_paths
+
+def get_inputs_signature(stage, participant_id, state):
+    """
+    Returns the dictionary {input path: SHA1} of a node, None if an input is missing
+    """
+    input_paths = get_input_paths(stage, participant_id)
+    if (input_paths is None):
+        return None
+    return { input_path: get_file_hash(input_path, state) for input_path in input_paths }
+
+def is_node_outdated(stage, participant_id, inputs_signature, output_format, state):
+    """
+    Checks whether a node must be built again, and returns the reason, or None if it is up to date
+    """
+    node = state["nodes"].get(get_node_key(stage, participant_id))
+    if (node is None):
+        return "never built"
+    output_path = os.path.splitext(STAGES[stage]["output"] % str(participant_id))[0] + "." + output_format
+    if (node["output"] != output_path):
+        return "different format"
+    if (get_file_hash(output_path, state) != node["output_sha1"]):
+        return "output missing or modified"
+    if (node["inputs"] != inputs_signature):
+        changed_inputs = sorted(set(node["inputs"].items()) ^ set(inputs_signature.items()))
+        return "changed " + ", ".join(sorted({ os.path.basename(input_path) for input_path, _ in changed_inputs }))
+    return None
+
+# =============================================================================
+# Pipeline
+# =============================================================================
+
+def _build_node(stage, participant_id, output_format):
+    """
+    Runs a script for a single participant, in a worker process
+    """
+    return ceap_runner.run_participant([stage], participant_id, output_format)[stage]
+
+def run_pipeline(stages = None, participants = None, workers = None, output_format = "json", force = False, dry_run = False):
+    """
+    Builds the outdated nodes of the stages, wave by wave. The nodes of a
+    participant are not built if a node they depend on failed.
+
+    :param stages: List of stages to update, together with the stages they depend on. By default, all of them.
+    :param participants: List of participant IDs. By default, from 1 to 32.
+    :param workers: Number of processes. By default, the number of CPUs. Use 1 to run in the current process.
+    :param output_format: Format of the output files: ["json", "npz", "parquet"]
+    :param force: Builds all the nodes, even if they are up to date
+    :param dry_run: Only prints the outdated nodes. The nodes after an outdated node are listed as "after <stage>".
+    :return: Dictionary {node: exception} with the nodes that failed
+    :rtype: dict
+    """
+    # The paths of the stages and of the state are relative to the folder of the scripts
+    with ceap_runner.scripts_folder():
+        return _run_pipeline(stages, participants, workers, output_format, force, dry_run)
+
+def _run_pipeline(stages, participants, workers, output_format, force, dry_run):
+    stages = get_stages_with_dependencies(STAGES.keys() if (stages is None) else stages)
+    participants = ceap_runner.LIST_PARTICIPANTS if (participants is None) else participants
+    workers = os.cpu_count() if (workers is None) else workers
+    state = load_state()
+
+    waves = {}
+    for stage in stages:
+        waves.setdefault(get_stage_depth(stage), []).append(stage)
+
+    errors = {}
+    blocked = {}    # Nodes not built because of a failed node or, in a dry run, an outdated node
+    executor = ProcessPoolExecutor(max_workers=workers) if (workers > 1 and not dry_run) else None
+    try:
+        for depth in sorted(waves.keys()):
+            # Find the outdated nodes of the wave
+            outdated_nodes = []
+            for stage in waves[depth]:
+                for participant_id in participants:
+                    upstream = [ other for other in DEPENDENCIES[stage] if get_node_key(other, participant_id) in blocked ]
+                    if (len(upstream) > 0):
+                        blocked[get_node_key(stage, participant_id)] = blocked[get_node_key(upstream[0], participant_id)]
+                        print(f"{get_node_key(stage, participant_id):40} \t {'' if (dry_run) else 'SKIPPED: '}{blocked[get_node_key(stage, participant_id)]}")
+                        continue
+                    inputs_signature = get_inputs_signature(stage, participant_id, state)
+                    if (inputs_signature is None):
+                        print(f"{get_node_key(stage, participant_id):40} \t SKIPPED: missing input")
+                        blocked[get_node_key(stage, participant_id)] = "missing input"
+                        continue
+                    reason = "forced" if (force) else is_node_outdated(stage, participant_id, inputs_signature, output_format, state)
+                    if (reason is not None):
+                        outdated_nodes.append((stage, participant_id, inputs_signature, reason))
+
+            if (dry_run):
+                for stage, participant_id, _, reason in outdated_nodes:
+                    print(f"{get_node_key(stage, participant_id):40} \t {reason}")
+                    blocked[get_node_key(stage, participant_id)] = f"after {get_node_key(stage, participant_id)}"
+                continue
+
+            # Build them, in parallel if there is a pool of processes
+            if (executor is None):
+                results = []
+                for node in outdated_nodes:
+                    try:
+                        results.append((node, _build_node(node[0], node[1], output_format), None))
+                    except Exception as error:
+                        results.append((node, None, error))
+            else:
+                futures = { executor.submit(_build_node, node[0], node[1], output_format):node for node in outdated_nodes }
+                results = []
+                for future in as_completed(futures):
+                    try:
+                        results.append((futures[future], future.result(), None))
+                    except Exception as error:
+                        results.append((futures[future], None, error))
+
+            for (stage, participant_id, inputs_signature, reason), timing, error in results:
+                node_key = get_node_key(stage, participant_id)
+                if (error is not None):
+                    print(f"{node_key:40} \t FAILED: {error!r}")
+                    errors[node_key] = error
+                    blocked[node_key] = f"{node_key} failed"
+                    state["nodes"].pop(node_key, None)
+                    continue
+                output_path = os.path.splitext(STAGES[stage]["output"] % str(participant_id))[0] + "." + output_format
+                state["nodes"][node_key] = { "inputs": inputs_signature, "output": output_path, "output_sha1": get_file_hash(output_path, state) }
+                print(f"{node_key:40} \t built in {timing:.1f}s ({reason})")
+            # Keep the progress if a later wave is interrupted
+            save_state(state)
+    finally:
+        if (executor is not None):
+            executor.shutdown()
+
+    if (not dry_run):
+        save_state(state)
+    return errors
+
+############################
+#### ENTRY POINT
+############################
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the outdated outputs of the processing scripts")
+    parser.add_argument("stages", type=ceap_runner.script_argument, nargs="*", help=f"Stages to update, with the stages they depend on. By default, all of them: {list(STAGES.keys())}")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Number of processes. By default, the number of CPUs")
+    parser.add_argument("-p", "--participants", type=ceap_runner.participants_argument, default=None, help="Participant IDs and ranges, e.g., 1,2,10-15. By default, all of them")
+    parser.add_argument("-f", "--force", action="store_true", help="Rebuild the nodes even if they are up to date")
+    parser.add_argument("-n", "--dry-run", action="store_true", help="Only list the outdated nodes")
+    ceap_io.add_format_argument(parser)
+    args = parser.parse_args()
+
+    t_start = time.perf_counter()
+    errors = run_pipeline(args.stages if (len(args.stages) > 0) else None, args.participants, args.workers, args.format, args.force, args.dry_run)
+    print(f"Finished in {time.perf_counter() - t_start:.1f}s")
+    if (len(errors) > 0):
+        print(f"Failed nodes: {sorted(errors.keys())}")
+        sys.exit(1)
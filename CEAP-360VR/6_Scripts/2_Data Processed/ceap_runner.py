@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# =============================================================================
+# Created Date: 2026/10
+# =============================================================================
+"""
+Runs the per-participant processing scripts of this folder in a pool of
+processes. Each participant is a task that runs the selected scripts in
+order, so the outputs of a script are ready for the next one (e.g.,
+`Transformed` before `Frame`). The outputs are the same as running the
+scripts one by one.
+
+Usage:
+    python ceap_runner.py                                   # All the scripts, all the participants
+    python ceap_runner.py --workers 4 --participants 1,2,10-15 4_Get_Behavior_FrameData 4_Get_Behavior_GazeFixation
+    python ceap_runner.py --format npz 5_Get_Physio_TransData 5_Get_Physio_FrameData
+
+"""
+# =============================================================================
+# Imports
+# =============================================================================
+
+import os, sys, time, argparse, contextlib
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import ceap_io
+
+# =============================================================================
+# Scripts
+# =============================================================================
+
+# Function of each script that processes a participant, in the order they must run
+SCRIPTS = {
+    "3_Get_Annotation_TransData": "Get_AnnotationTransData",
+    "3_Get_Annotation_FrameData": "Get_AnnotationFrameData",
+    "4_Get_Behavior_TransData": "Get_BehaviorTransData",
+    "4_Get_Behavior_FrameData": "Get_BehaviorFrameData",
+    "4_Get_Behavior_GazeFixation": "Get_FixationData",
+    "4_Get_Behavior_ScanPath": "Get_HM_ScanPathData",
+    "5_Get_Physio_TransData": "Get_PhysioTransData",
+    "5_Get_Physio_FrameData": "Get_PhysioFrameData",
+}
+LIST_PARTICIPANTS = list(range(1, 33))
+
+# The scripts read and write their files relative to this folder
+SCRIPTS_FOLDER = os.path.dirname(os.path.abspath(__file__))
+
+# Scripts already imported in this process
+_loaded_scripts = {}
+
+@contextlib.contextmanager
+def scripts_folder():
+    """
+    Changes the working directory to `SCRIPTS_FOLDER` and restores it at
+    the end, so that the scripts can be used from any folder. The paths of
+    the scripts are read when they are imported and when they run.
+    """
+    cwd = os.getcwd()
+    os.chdir(SCRIPTS_FOLDER)
+    try:
+        yield
+    finally:
+        os.chdir(cwd)
+
+def load_script(script_name):
+    """
+    Imports a processing script as a module. The names of the scripts
+    start with a digit, so they cannot be imported with `import`.
+
+    :param script_name: Name of the script without extension, e.g., "4_Get_Behavior_FrameData"
+    :return: Function of the script that processes a participant
+    """
+    if (script_name not in SCRIPTS):
+        raise ValueError(f"Unknown script {script_name}. The options are: {list(SCRIPTS.keys())}")
+    if (script_name not in _loaded_scripts):
+        spec = importlib.util.spec_from_file_location(f"ceap_script_{script_name}", os.path.join(SCRIPTS_FOLDER, script_name + ".py"))
+        module = importlib.util.module_from_spec(spec)
+        with scripts_folder():
+            spec.loader.exec_module(module)
+        _loaded_scripts[script_name] = module
+    return getattr(_loaded_scripts[script_name], SCRIPTS[script_name])
+
+def run_participant(script_names, participant_id, output_format = "json"):
+    """
+    Runs the scripts in order for a single participant.
+
+    :return: Time in seconds per script
+    :rtype: dict
+    """
+    timings = {}
+    for script_name in script_names:
+        t_start = time.perf_counter()
+        with scripts_folder():
+            load_script(script_name)(participant_id, output_format)
+        timings[script_name] = time.perf_counter() - t_start
+    return timings
+
+def run_scripts(script_names, participants = None, workers = None, output_format = "json"):
+    """
+    Runs the scripts for many participants in a pool of processes.
+
+    :param script_names: List of scripts, they run in the order of `SCRIPTS`
+    :param participants: List of participant IDs. By default, from 1 to 32.
+    :param workers: Number of processes. By default, the number of CPUs. Use 1 to run in the current process.
+    :param output_format: Format of the output files: ["json", "npz", "parquet"]
+    :return: Dictionary {participant ID: exception} with the participants that failed
+    :rtype: dict
+    """
+    script_names = [ script_name for script_name in SCRIPTS.keys() if script_name in script_names ]
+    participants = LIST_PARTICIPANTS if (participants is None) else participants
+    workers = os.cpu_count() if (workers is None) else workers
+
+    errors = {}
+    if (workers <= 1 or len(participants) <= 1):
+        for participant_id in participants:
+            try:
+                timings = run_participant(script_names, participant_id, output_format)
+                print(f"P{participant_id} \t {sum(timings.values()):.1f}s")
+            except Exception as error:
+                errors[participant_id] = error
+                print(f"P{participant_id} \t FAILED: {error!r}")
+        return errors
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(participants))) as executor:
+        futures = { executor.submit(run_participant, script_names, participant_id, output_format):participant_id for participant_id in participants }
+        for future in as_completed(futures):
+            participant_id = futures[future]
+            try:
+                timings = future.result()
+                print(f"P{participant_id} \t {sum(timings.values()):.1f}s")
+            except Exception as error:
+                errors[participant_id] = error
+                print(f"P{participant_id} \t FAILED: {error!r}")
+    return errors
+
+############################
+#### ENTRY POINT
+############################
+
+def participants_argument(value):
+    """
+    Parses a list of participant IDs and ranges of IDs, e.g., "1,2,10-15"
+    """
+    participants = set()
+    try:
+        for item in value.split(","):
+            if ("-" in item):
+                first, last = item.split("-")
+                participants.update(range(int(first), int(last) + 1))
+            else:
+                participants.add(int(item))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid participants {value}, use IDs (7) and ranges (1-8) separated by commas")
+    return sorted(participants)
+
+def script_argument(value):
+    script_name = os.path.splitext(os.path.basename(value))[0]
+    if (script_name not in SCRIPTS):
+        raise argparse.ArgumentTypeError(f"Unknown script {value}. The options are: {list(SCRIPTS.keys())}")
+    return script_name
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the per-participant processing scripts in a pool of processes")
+    parser.add_argument("scripts", type=script_argument, nargs="*", help=f"Scripts to run. By default, all of them: {list(SCRIPTS.keys())}")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Number of processes. By default, the number of CPUs")
+    parser.add_argument("-p", "--participants", type=participants_argument, default=None, help="Participant IDs and ranges, e.g., 1,2,10-15. By default, all of them")
+    ceap_io.add_format_argument(parser)
+    args = parser.parse_args()
+
+    script_names = args.scripts if (len(args.scripts) > 0) else list(SCRIPTS.keys())
+
+    t_start = time.perf_counter()
+    errors = run_scripts(script_names, args.participants, args.workers, args.format)
+    print(f"Finished {len(script_names)} scripts in {time.perf_counter() - t_start:.1f}s")
+    if (len(errors) > 0):
+        print(f"Failed participants: {sorted(errors.keys())}")
+        sys.exit(1)
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# =============================================================================
+# Created Date: 2026/10
+# =============================================================================
+"""
+Array functions on the sphere for the head and eye movements of the dataset
+CEAP-360VR, in degrees: yaw (longitude) in [-180, 180] and pitch (latitude)
+in [-90, 90]. Shared by the processing scripts in this folder and the
+scripts of `3_CEAP-360VR_Baseline`.
+
+The great-circle distances run with Numba if it is installed, see
+`set_backend()`.
+
+Usage:
+    velocity, acceleration = angular_velocity(yaw, pitch, fps)
+    xyz = pitch_yaw_to_xyz(pitch, yaw)
+    yaw_centroid, pitch_centroid = centroid(yaw, pitch)
+
+"""
+# =============================================================================
+# Imports
+# =============================================================================
+
+import os, math
+
+import numpy as np
+
+# Optional compiler of the distance loop
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# =============================================================================
+# Backend
+# =============================================================================
+
+# Environment variable to choose the backend: "numba" or "numpy"
+BACKEND_ENV = "CEAP_SPHERICAL_BACKEND"
+LIST_BACKENDS = ["numba", "numpy"]
+
+_backend = None
+
+def set_backend(backend = None):
+    """
+    Selects how `angle_distance()` is computed.
+
+    :param backend: "numba" or "numpy". By default, the value of the environment variable
+                    `CEAP_SPHERICAL_BACKEND`, or "numba" if it is installed.
+    :type backend: str
+    :return: Name of the selected backend
+    :rtype: str
+    """
+    global _backend
+    if (backend is None):
+        backend = os.environ.get(BACKEND_ENV, "numba" if numba is not None else "numpy")
+    if (backend not in LIST_BACKENDS):
+        raise ValueError(f"The backend should be one of {LIST_BACKENDS}")
+    if (backend == "numba" and numba is None):
+        raise ValueError("The backend numba is not installed")
+    _backend = backend
+    return _backend
+
+def get_backend():
+    """
+    :return: Name of the backend used by `angle_distance()`
+    :rtype: str
+    """
+    if (_backend is None):
+        set_backend()
+    return _backend
+
+# =============================================================================
+# Distances
+# =============================================================================
+
+def _angle_distance_loop(longitude1, latitude1, longitude2, latitude2, distance):
+    # Same operations as the scalar haversine of the first version of the scripts
+    for i in range(distance.shape[0]):
+        rad_lat1 = math.radians(latitude1[i])
+        rad_lat2 = math.radians(latitude2[i])
+        long_dis = math.radians(longitude2[i]) - math.radians(longitude1[i])
+        lat_dis = rad_lat2 - rad_lat1
+        distance[i] = math.degrees(2 * math.asin(math.sqrt(math.pow(math.sin(lat_dis / 2), 2) +
+                                                           math.cos(rad_lat1) * math.cos(rad_lat2) * math.pow(math.sin(long_dis / 2), 2))))
+
+_angle_distance_numba = numba.njit(cache=True)(_angle_distance_loop) if (numba is not None) else None
+
+def angle_distance(longitude1, latitude1, longitude2, latitude2):
+    """
+    Great-circle distance between points (haversine formula).
+
+    :param longitude1: Yaw of the first points in degrees, array or scalar
+    :param latitude1: Pitch of the first points in degrees
+    :param longitude2: Yaw of the second points in degrees
+    :param latitude2: Pitch of the second points in degrees
+    :return: Distance in degrees, with the broadcast shape of the inputs
+    :rtype: np.ndarray
+    """
+    longitude1, latitude1, longitude2, latitude2 = np.broadcast_arrays(*[ np.asarray(values, dtype=np.float64)
+                                                                          for values in [longitude1, latitude1, longitude2, latitude2] ])
+    if (get_backend() == "numba"):
+        distance = np.empty(longitude1.size, dtype=np.float64)
+        _angle_distance_numba(*[ np.ascontiguousarray(values).ravel() for values in [longitude1, latitude1, longitude2, latitude2] ], distance)
+        return distance.reshape(longitude1.shape)
+
+    rad_lat1 = np.radians(latitude1)
+    rad_lat2 = np.radians(latitude2)
+    long_dis = np.radians(longitude2) - np.radians(longitude1)
+    lat_dis = rad_lat2 - rad_lat1
+    return np.degrees(2 * np.arcsin(np.sqrt(np.square(np.sin(lat_dis / 2)) +
+                                            np.cos(rad_lat1) * np.cos(rad_lat2) * np.square(np.sin(long_dis / 2)))))
+
+def consecutive_distance(yaw, pitch):
+    """
+    Great-circle distance between consecutive samples.
+
+    :return: Array of N-1 distances in degrees, from sample i-1 to sample i
+    :rtype: np.ndarray
+    """
+    yaw = np.asarray(yaw, dtype=np.float64)
+    pitch = np.asarray(pitch, dtype=np.float64)
+    return angle_distance(yaw[:-1], pitch[:-1], yaw[1:], pitch[1:])
+
+def angular_velocity(yaw, pitch, fps):
+    """
+    Angular velocity and acceleration of the samples 1 to N-1, from the
+    previous sample. The velocity before sample 1 is 0, as in the fixation
+    detection of the scripts.
+
+    :param fps: Sampling rate in Hz, e.g., the frame rate of the video
+    :return: Velocity in degrees/s and acceleration in degrees/s^2, arrays of N-1 values
+    :rtype: tuple
+    """
+    velocity = consecutive_distance(yaw, pitch) * fps
+    acceleration = np.diff(velocity, prepend=0) * fps
+    return velocity, acceleration
+
+# =============================================================================
+# Coordinates
+# =============================================================================
+
+def pitch_yaw_to_xyz(pitch, yaw):
+    """
+    Unit vectors of the directions (pitch, yaw). The y axis is the
+    direction (0, 0), the x axis is yaw 90 and the z axis is pitch 90.
+
+    :param pitch: Pitch in degrees
+    :param yaw: Yaw in degrees
+    :return: Array of shape (..., 3)
+    :rtype: np.ndarray
+    """
+    rad_pitch = np.radians(pitch)
+    rad_yaw = np.radians(yaw)
+    return np.stack([ np.cos(rad_pitch) * np.sin(rad_yaw), np.cos(rad_pitch) * np.cos(rad_yaw), np.sin(rad_pitch) ], axis=-1)
+
+def xyz_to_pitch_yaw(xyz):
+    """
+    Directions of vectors in the axes of `pitch_yaw_to_xyz()`, the vectors
+    do not need to be unit vectors.
+
+    :param xyz: Array of shape (..., 3)
+    :return: Pitch and yaw in degrees
+    :rtype: tuple
+    """
+    xyz = np.asarray(xyz, dtype=np.float64)
+    x, y, z = xyz[..., 0], xyz[..., 1], xyz[..., 2]
+    pitch = np.degrees(np.arctan2(z, np.hypot(x, y)))
+    yaw = np.degrees(np.arctan2(x, y))
+    return pitch, yaw
+
+# =============================================================================
+# Centroids
+# =============================================================================
+
+def circular_mean_yaw(yaw, axis = None):
+    """
+    Circular mean of yaw angles, the direction of the mean unit vector.
+
+    :param yaw: Yaw in degrees
+    :return: Mean yaw in [-180, 180]
+    """
+    rad_yaw = np.radians(yaw)
+    return np.degrees(np.arctan2(np.mean(np.sin(rad_yaw), axis=axis), np.mean(np.cos(rad_yaw), axis=axis)))
+
+def centroid(yaw, pitch):
+    """
+    Centroid of gaze or head points as computed by the processing scripts:
+    the mean yaw and pitch. If the yaw spans more than 200 degrees, the
+    points are around +-180 and the negative yaws are moved to [180, 360]
+    before the mean.
+
+    :return: Yaw and pitch of the centroid in degrees
+    :rtype: tuple
+    """
+    yaw = np.asarray(yaw, dtype=np.float64)
+    if (np.max(yaw) - np.min(yaw) > 200):
+        yaw = np.where(yaw < 0, 360 + yaw, yaw)
+
+    yaw_centroid = np.mean(yaw)
+    if (yaw_centroid > 180):
+        yaw_centroid = yaw_centroid - 360
+    return yaw_centroid, np.mean(pitch)
+
+def segment_centroids(yaw, pitch, starts, ends):
+    """
+    `centroid()` of the segments [start, end] of the samples, e.g., of
+    the fixations.
+
+    :param starts: Array of indices of the first sample of each segment
+    :param ends: Array of indices of the last sample of each segment
+    :return: Arrays of yaw and pitch of the centroids in degrees
+    :rtype: tuple
+    """
+    yaw = np.asarray(yaw, dtype=np.float64)
+    pitch = np.asarray(pitch, dtype=np.float64)
+    if (len(starts) == 0):
+        return np.zeros(0), np.zeros(0)
+
+    # Yaw span of all the segments at once
+    index = np.stack([ starts, np.asarray(ends) + 1 ], axis=1).ravel()
+    yaw_padded = np.append(yaw, 0)
+    is_around_180 = np.maximum.reduceat(yaw_padded, index)[::2] - np.minimum.reduceat(yaw_padded, index)[::2] > 200
+    yaw_around_180 = np.where(yaw < 0, 360 + yaw, yaw)
+
+    # np.mean of each segment: the sums of np.add.reduceat are in another order, and
+    # change the last rounded digit of some centroids
+    yaw_centroids = np.array([ np.mean((yaw_around_180 if around_180 else yaw)[start:end + 1])
+                               for start, end, around_180 in zip(starts, ends, is_around_180) ])
+    yaw_centroids = np.where(yaw_centroids > 180, yaw_centroids - 360, yaw_centroids)
+    pitch_centroids = np.array([ np.mean(pitch[start:end + 1]) for start, end in zip(starts, ends) ])
+    return yaw_centroids, pitch_centroids
@@ -0,0 +1,35 @@
+# this script is used to
+# 1) Check that the streaming JSON decoder of ceap_io gives back the samples of json.load
+# run with: python -m pytest "test_ceap_io.py"
+
+import json
+
+import ceap_io
+
+
+# Write _data in a JSON file and read it with json.load and with the streaming decoder
+def Load_Both(_tmpPath, _data, _chunkSize=ceap_io.JSON_CHUNK_SIZE):
+    _jsonPath = str(_tmpPath / "data.json")
+    with open(_jsonPath, "w") as f:
+        f.write(json.dumps(_data, indent=4))
+    with open(_jsonPath) as f:
+        return json.load(f), ceap_io.load_json_streaming(_jsonPath, _chunkSize)
+
+
+def test_mixed_int_float_column(tmp_path):
+    _samples = [{"TimeStamp": 0, "HR": 70}, {"TimeStamp": 0.25, "HR": 71.5}, {"TimeStamp": 0.5, "HR": 72}]
+    _jsonData, _streamingData = Load_Both(tmp_path, {"HR_RawData": _samples})
+
+    _roundTrip = ceap_io.columns_to_samples(_streamingData["HR_RawData"])
+    assert _roundTrip == _jsonData["HR_RawData"]
+    assert [type(_v) for _s in _roundTrip for _v in _s.values()] == [int, int, float, float, float, int]
+    assert json.dumps(_roundTrip) == json.dumps(_samples)
+
+
+def test_numeric_columns_are_typed(tmp_path):
+    _samples = [{"TimeStamp": 0.25 * i, "ACC_X": i - 3} for i in range(6)]
+    _jsonData, _streamingData = Load_Both(tmp_path, {"ACC_RawData": _samples}, _chunkSize=64)
+
+    assert _streamingData["ACC_RawData"]["TimeStamp"].typecode == "d"
+    assert _streamingData["ACC_RawData"]["ACC_X"].typecode == "q"
+    assert ceap_io.columns_to_samples(_streamingData["ACC_RawData"]) == _jsonData["ACC_RawData"]
@@ -2,12 +2,17 @@
 # 1) generate processed behavioral and physiological data with V-A labels for deep learning (DL) experiments.
 # (20210301 1created by Tong Xue)
 
+import os
+import sys
 import json
 import pandas as pd
-import math
 from sklearn.decomposition import PCA
 import numpy as np
 
+# Import the functions on the sphere shared with the processing scripts
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "2_Data Processed"))
+import ceap_spherical
+
 
 def Normalization(_signalList):
     _range = np.max(_signalList) - np.min(_signalList)
@@ -29,11 +34,9 @@ with open('../CEAP-360VR/1_Stimuli/VideoInfo.json', mode='r') as _videoInfoFile:
         m_videoFpsList.append(_videoInfoData["VideoInfo"][i]["FrameRate"])
 
 
+# Unit vectors of arrays of (pitch, yaw) in degrees, rounded to 5 decimals
 def PYtoXYZ(pitch, yaw):
-    x = math.cos(pitch) * math.sin(yaw)
-    y = math.cos(pitch) * math.cos(yaw)
-    z = math.sin(pitch)
-    return round(x, 5), round(y, 5), round(z, 5)
+    return np.round(ceap_spherical.pitch_yaw_to_xyz(pitch, yaw), 5)
 
 
 for _pid in range(1, 33):
@@ -119,12 +122,6 @@ for _pid in range(1, 33):
         _dataLPD = m_participantData['Behavior_FrameData'][0]['Video_Behavior_FrameData'][_vid]['LPD']
         _dataRPD = m_participantData['Behavior_FrameData'][0]['Video_Behavior_FrameData'][_vid]['RPD']
 
-        _hmRXList = []
-        _hmRYList = []
-        _hmRZList = []
-        _emRXList = []
-        _emRYList = []
-        _emRZList = []
         _pdList = []
         _pdEmotionList = []
 
@@ -145,27 +142,11 @@ for _pid in range(1, 33):
             _valenceList.append(_dataVA[_sample]['Valence'])
             _arousalList.append(_dataVA[_sample]['Arousal'])
 
-            _hmPitch = math.radians(_dataHM[_sample]['Pitch'])
-            _hmYaw = math.radians(_dataHM[_sample]['Yaw'])
-            _hmX, _hmY, _hmZ = PYtoXYZ(_hmPitch, _hmYaw)
-
-            _empitch = math.radians(_dataEM[_sample]['Pitch'])
-            _emyaw = math.radians(_dataEM[_sample]['Yaw'])
-            _emX, _emY, _emZ = PYtoXYZ(_empitch, _emyaw)
-
             _edaList.append(_dataEDA[_sample]['EDA'])
             _bvpList.append(_dataBVP[_sample]['BVP'])
             _hrList.append(_dataHR[_sample]['HR'])
             _sktList.append(_dataSKT[_sample]['SKT'])
 
-            _hmRXList.append(_hmX)
-            _hmRYList.append(_hmY)
-            _hmRZList.append(_hmZ)
-
-            _emRXList.append(_emX)
-            _emRYList.append(_emY)
-            _emRZList.append(_emZ)
-
             _hmPitchList.append(_dataHM[_sample]['Pitch'])
             _hmYawList.append(_dataHM[_sample]['Yaw'])
             _emPitchList.append(_dataEM[_sample]['Pitch'])
@@ -174,14 +155,14 @@ for _pid in range(1, 33):
 
         _pdList = _pd
         _pdEmotionList = _pdEmotion
-        _hmRList = list(zip(_hmRXList, _hmRYList, _hmRZList))
+        _hmRList = PYtoXYZ(_hmPitchList, _hmYawList)
         pca = PCA(1)
         pca.fit(_hmRList)
         _hmListTemp = np.reshape(pca.transform(_hmRList), -1)
         _hmList = _hmListTemp.tolist()
         _hmNewList = np.interp(_newSecList, _oldSecList, _hmList)
 
-        _emRList = list(zip(_emRXList, _emRYList, _emRZList))
+        _emRList = PYtoXYZ(_emPitchList, _emYawList)
         pca = PCA(1)
         pca.fit(_emRList)
         _emListTemp = np.reshape(pca.transform(_emRList), -1)
@@ -3,41 +3,42 @@
 # (20210301 1created by Tong Xue)
 
 
+import os
+import sys
 import pandas as pd
 import numpy as np
-import math
+
+# Import the functions on the sphere shared with the processing scripts
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "2_Data Processed"))
+import ceap_spherical
+
+
+# Calculate the velocity and acceleration of the samples (50Hz) 1 to N-1, from the previous sample
+def Get_VelocityData(_pitchList, _yawList):
+    assert np.all(np.abs(_pitchList) <= 90) or len(_pitchList) < 2, "invalid latitude"
+    assert np.all(np.abs(_yawList) <= 180) or len(_yawList) < 2, "invalid longtigude"
+
+    # the velocity before the sample 1 is 0
+    return ceap_spherical.angular_velocity(_yawList, _pitchList, 50)
 
 
 # Get the Saccades
 def Get_SaccadeData(_pitchList, _yawList):
     _startFrame = 0
     _endFrame = 0
-    _velocity = 0
-    _velocityPre = 0
     _count = 0
     _fixationDurList = []
 
     _saccadeDurList = []
     _saccStartTime = 0
-    _saccVelList = []
     _saccAmplitudeList = []
 
-    for _sample in range(1, len(_pitchList)):
-        _longitude1 = _yawList[_sample - 1]
-        _longitude2 = _yawList[_sample]
+    _velocityList, _accelerationList = Get_VelocityData(_pitchList, _yawList)
+    _saccVelList = _velocityList.tolist()
 
-        _latitude1 = _pitchList[_sample - 1]
-        _latitude2 = _pitchList[_sample]
-
-        assert abs(_latitude1) <= 90 and abs(_latitude2) <= 90, "invalid latitude"
-        assert abs(_longitude1) <= 180 and abs(_longitude2) <= 180, "invalid longtigude"
-
-        _angle = Get_AngleDistance(_longitude1, _latitude1, _longitude2, _latitude2)
-
-        _velocity = _angle * 50
-        _saccVelList.append(_velocity)
-        _acceleration = (_velocity - _velocityPre) * 50
-        _velocityPre = _velocity
+    for _sample in range(1, len(_pitchList)):
+        _velocity = _velocityList[_sample - 1]
+        _acceleration = _accelerationList[_sample - 1]
 
         if abs(_velocity) > 75 and abs(_acceleration) > 200:
             _timeDur = _endFrame - _startFrame
@@ -77,26 +78,14 @@ def Get_SaccadeData(_pitchList, _yawList):
 def Get_FixationData(_pitchList, _yawList):
     _startFrame = 0
     _endFrame = 0
-    _velocity = 0
-    _velocityPre = 0
     _count = 0
     _fixationDurList = []
 
-    for _sample in range(1, len(_pitchList)):
-        _longitude1 = _yawList[_sample - 1]
-        _longitude2 = _yawList[_sample]
-
-        _latitude1 = _pitchList[_sample - 1]
-        _latitude2 = _pitchList[_sample]
-
-        assert abs(_latitude1) <= 90 and abs(_latitude2) <= 90, "invalid latitude"
-        assert abs(_longitude1) <= 180 and abs(_longitude2) <= 180, "invalid longtigude"
-
-        _angle = Get_AngleDistance(_longitude1, _latitude1, _longitude2, _latitude2)
+    _velocityList, _accelerationList = Get_VelocityData(_pitchList, _yawList)
 
-        _velocity = _angle * 50
-        _acceleration = (_velocity - _velocityPre) * 50
-        _velocityPre = _velocity
+    for _sample in range(1, len(_pitchList)):
+        _velocity = _velocityList[_sample - 1]
+        _acceleration = _accelerationList[_sample - 1]
 
         if abs(_velocity) > 75 and abs(_acceleration) > 200:
             _timeDur = _endFrame - _startFrame
@@ -120,21 +109,6 @@ def Get_FixationData(_pitchList, _yawList):
     return _fixationDurList
 
 
-# Calculate Angle Dis
-def Get_AngleDistance(_longitude1, _latitude1, _longitude2, _latitude2):
-    _radLong1 = math.radians(_longitude1)
-    _radLat1 = math.radians(_latitude1)
-    _radLong2 = math.radians(_longitude2)
-    _radLat2 = math.radians(_latitude2)
-
-    _longDis = _radLong2 - _radLong1
-    _latDis = _radLat2 - _radLat1
-    _radDis = 2 * math.asin(math.sqrt(math.pow(math.sin(_latDis / 2), 2) +
-                                      math.cos(_radLat1) * math.cos(_radLat2) * math.pow(math.sin(_longDis / 2), 2)))
-    _angleDis = math.degrees(_radDis)
-    return _angleDis
-
-
 def CalculateVA(m_valNewList, m_aroNewList):
     m_valBinList = []
     m_aroBinList = []
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# =============================================================================
+# Created Date: 2026/10
+# =============================================================================
+"""
+Timing of the loading functions of `ceap_loader.py` on the files of a local
+copy of the dataset CEAP-360VR.
+
+Usage:
+    python ceap_benchmark.py -p <dataset root> extraction
+    python ceap_benchmark.py -p <dataset root> alignment
+    python ceap_benchmark.py -p <dataset root> json_backend
+
+"""
+# =============================================================================
+# Imports
+# =============================================================================
+
+import time
+import argparse
+
+import pandas as pd
+
+import ceap_loader
+
+# =============================================================================
+# Benchmarks
+# =============================================================================
+
+def benchmark_extraction(dataset:ceap_loader.DatasetCEAP, repetitions = 1):
+    """
+    Compares the per-sample extraction of columns against the vectorized
+    extraction in `DatasetCEAP._load_json_data_from_filepath()` for every
+    file in the index of the dataset. Both versions must return the same
+    DataFrame. The time includes parsing the JSON file.
+
+    :return: DataFrame with the time in seconds per file and version
+    :rtype: pd.DataFrame
+    """
+    results = { "data_type":[], "processing_level":[], "participant":[], "per_sample":[], "vectorized":[] }
+
+    for data_type in dataset.LIST_DATA_TYPES:
+        for processing_level in dataset.LIST_PROCESSING_LEVELS:
+            for participant_id, filepath in dataset.index["data"][data_type][processing_level].items():
+                timings = {}
+                for version, vectorized in [("per_sample", False), ("vectorized", True)]:
+                    t_start = time.perf_counter()
+                    for _ in range(repetitions):
+                        df_data = dataset._load_json_data_from_filepath(filepath, vectorized=vectorized)
+                    timings[version] = (time.perf_counter() - t_start) / repetitions
+                    timings[version+"_df"] = df_data
+
+                pd.testing.assert_frame_equal(timings["per_sample_df"], timings["vectorized_df"])
+
+                results["data_type"].append(data_type)
+                results["processing_level"].append(processing_level)
+                results["participant"].append(int(participant_id))
+                results["per_sample"].append(timings["per_sample"])
+                results["vectorized"].append(timings["vectorized"])
+                print(f"{data_type:12} {processing_level:12} P{participant_id:3} \t per_sample={timings['per_sample']:.3f}s \t vectorized={timings['vectorized']:.3f}s")
+
+    results = pd.DataFrame(results)
+    summary = results.groupby(["data_type", "processing_level"])[["per_sample", "vectorized"]].sum()
+    summary.loc[("All", ""), :] = summary.sum()
+    summary["speedup"] = summary["per_sample"] / summary["vectorized"]
+    print(summary.to_string(float_format="{:.2f}".format))
+    return results
+
+def benchmark_alignment(dataset:ceap_loader.DatasetCEAP, repetitions = 3):
+    """
+    Compares the chained outer merges against the timestamp union in
+    `DatasetCEAP._align_feature_groups()` for the files with many feature 
+    groups per video (Behavior and Physio). The JSON files are parsed once,
+    only the time to align the feature groups of all the videos is measured.
+
+    :return: DataFrame with the time in seconds per file and version
+    :rtype: pd.DataFrame
+    """
+    results = { "data_type":[], "processing_level":[], "participant":[], "merge":[], "union":[] }
+
+    for data_type in ["Behavior", "Physio"]:
+        for processing_level in dataset.LIST_PROCESSING_LEVELS:
+            for participant_id, filepath in dataset.index["data"][data_type][processing_level].items():
+                data_participant_dict = next(iter(ceap_loader.load_json(filepath).values()))[0]
+                data_participant_dict.pop(dataset.K_PARTICIPANT)
+                data_all_videos = next(iter(data_participant_dict.values()))
+                features_all_videos = [ dataset._video_to_feature_groups(data_video)[1] for data_video in data_all_videos ]
+
+                timings = {}
+                for version, align_function in [("merge", dataset._align_feature_groups_with_merge), ("union", dataset._align_feature_groups)]:
+                    t_start = time.perf_counter()
+                    for _ in range(repetitions):
+                        df_videos = [ align_function(features_video) for features_video in features_all_videos ]
+                    timings[version] = (time.perf_counter() - t_start) / repetitions
+                    timings[version+"_df"] = df_videos
+
+                for df_merge, df_union in zip(timings["merge_df"], timings["union_df"]):
+                    pd.testing.assert_frame_equal(df_merge, df_union)
+
+                results["data_type"].append(data_type)
+                results["processing_level"].append(processing_level)
+                results["participant"].append(int(participant_id))
+                results["merge"].append(timings["merge"])
+                results["union"].append(timings["union"])
+
+    results = pd.DataFrame(results)
+    summary = results.groupby(["data_type", "processing_level"])[["merge", "union"]].sum()
+    summary.loc[("All", ""), :] = summary.sum()
+    summary["speedup"] = summary["merge"] / summary["union"]
+    print(summary.to_string(float_format="{:.2f}".format))
+    return results
+
+def benchmark_json_backend(dataset:ceap_loader.DatasetCEAP, repetitions = 3):
+    """
+    Compares the parse and serialize throughput of the JSON backends in
+    `ceap_io` (stdlib `json` and `orjson`, if installed) on all the files
+    of `3_AnnotationData` in the index. The serialized files use `indent=4`,
+    as the processing scripts.
+
+    :return: DataFrame with the throughput in MB/s per backend
+    :rtype: pd.DataFrame
+    """
+    filepaths = [ filepath for processing_level in dataset.LIST_PROCESSING_LEVELS
+                    for filepath in dataset.index["data"]["Annotations"][processing_level].values() ]
+    files_bytes = []
+    for filepath in filepaths:
+        with open(filepath, "rb") as json_file:
+            files_bytes.append(json_file.read())
+    total_mb = sum(len(file_bytes) for file_bytes in files_bytes) / 1e6
+
+    default_backend = ceap_loader.ceap_io.get_json_backend()
+    backends = [ backend for backend in ceap_loader.ceap_io.LIST_JSON_BACKENDS 
+                    if backend != "orjson" or ceap_loader.ceap_io.orjson is not None ]
+    results = { "backend":[], "parse_MBps":[], "serialize_MBps":[], "identical_files":[] }
+    for backend in backends:
+        ceap_loader.ceap_io.set_json_backend(backend)
+
+        t_start = time.perf_counter()
+        for _ in range(repetitions):
+            files_data = [ ceap_loader.ceap_io.loads(file_bytes) for file_bytes in files_bytes ]
+        time_parse = (time.perf_counter() - t_start) / repetitions
+
+        t_start = time.perf_counter()
+        for _ in range(repetitions):
+            files_str = [ ceap_loader.ceap_io.dumps(file_data, indent=4) for file_data in files_data ]
+        time_serialize = (time.perf_counter() - t_start) / repetitions
+
+        results["backend"].append(backend)
+        results["parse_MBps"].append(total_mb / time_parse)
+        results["serialize_MBps"].append(total_mb / time_serialize)
+        # The files were written by the scripts with `json.dumps(indent=4)`
+        results["identical_files"].append(sum(file_str.encode() == file_bytes for file_str, file_bytes in zip(files_str, files_bytes)))
+    ceap_loader.ceap_io.set_json_backend(default_backend)
+
+    results = pd.DataFrame(results)
+    print(f"{len(filepaths)} files, {total_mb:.1f} MB")
+    print(results.to_string(index=False, float_format="{:.1f}".format))
+    return results
+
+############################
+#### ENTRY POINT
+############################
+
+BENCHMARKS = {
+    "extraction": benchmark_extraction,
+    "alignment": benchmark_alignment,
+    "json_backend": benchmark_json_backend,
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-p","--datasetroot", type=str, required=True, help=f"Path to the dataset")
+    parser.add_argument("benchmark", type=str, choices=list(BENCHMARKS.keys()), help=f"Name of the benchmark to run")
+
+    args = parser.parse_args()
+    BENCHMARKS[args.benchmark](ceap_loader.DatasetCEAP(args.datasetroot, use_cache=False))
@@ -15,16 +15,23 @@ Download the dataset: https://github.com/cwi-dis/CEAP-360VR-Dataset
 # Imports
 # =============================================================================
 
-import os, json
+import os, re, sys, hashlib, shutil
 
 # Import data manipulation libraries
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 from copy import deepcopy
 from enum import Enum
+from operator import itemgetter
 
 # Import scientific
 import numpy as np
 import pandas as pd
 
+# Import the I/O functions shared with the processing scripts
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "2_Data Processed"))
+import ceap_io
+
 # =============================================================================
 # Enums
 # =============================================================================
@@ -73,17 +80,13 @@ def create_json(dictionary, json_path = "folder_tree.json", pretty=False):
 
     :param json_path: Destination path of JSON file with the dictionary
     :type json_path: str
-    :return: Loaded JSON file 
-    :rtype: JSON
+    :return: Path of the JSON file
+    :rtype: str
     """
     check_or_create_folder(json_path)
-    with open(json_path, "w") as json_file:
-        if (pretty):
-            json.dump(dictionary, json_file, indent=4)
-        else:
-            json.dump(dictionary, json_file)
-        print("JSON file was created in", json_path)
-        return json_file
+    ceap_io.dump_json(dictionary, json_path, indent=(4 if pretty else None))
+    print("JSON file was created in", json_path)
+    return json_path
 
 
 def load_json(json_path = "folder_tree.json"):
@@ -95,9 +98,85 @@ def load_json(json_path = "folder_tree.json"):
     :return: Loaded JSON file 
     :rtype: dict
     """
-    with open(json_path, "r") as json_file:
-        json_data = json.load(json_file)
-        return json_data
+    return ceap_io.load_json(json_path)
+
+def get_file_signature(filepath, compute_hash=True):
+    """
+    Returns a dictionary that identifies the current content of a file.
+    Used to detect when a cached version of a file is outdated.
+
+    :param filepath: Path of the file to analyze
+    :type filepath: str
+    :param compute_hash: Whether the SHA1 of the content should be calculated
+    :type compute_hash: bool
+    :return: Dictionary with keys `mtime`, `size` and `sha1`
+    :rtype: dict
+    """
+    file_stats = os.stat(filepath)
+    signature = {
+        "mtime": file_stats.st_mtime,
+        "size": file_stats.st_size,
+        "sha1": None,
+    }
+    if (compute_hash):
+        file_hash = hashlib.sha1()
+        with open(filepath, "rb") as f:
+            for chunk in iter(lambda: f.read(1<<20), b""):
+                file_hash.update(chunk)
+        signature["sha1"] = file_hash.hexdigest()
+    return signature
+
+# Tokens that change the nesting level of a JSON document. Strings are matched
+# as a whole so that brackets inside them are ignored.
+_JSON_STRUCTURE_TOKENS = re.compile(rb'"(?:[^"\\]|\\.)*"|[\[\]{}]')
+_JSON_VIDEO_ID = re.compile(rb'"VideoID"\s*:\s*"([^"]*)"')
+_JSON_PARTICIPANT_ID = re.compile(rb'"ParticipantID"\s*:\s*"([^"]*)"')
+
+def _find_json_block_end(json_bytes, start):
+    """
+    Returns the position after the bracket that closes the object or 
+    array opened at `json_bytes[start]`.
+    """
+    depth = 0
+    for token in _JSON_STRUCTURE_TOKENS.finditer(json_bytes, start):
+        char = token.group()[:1]
+        if (char in b"[{"):
+            depth += 1
+        elif (char in b"]}"):
+            depth -= 1
+            if (depth == 0):
+                return token.end()
+    raise ValueError("The JSON block is not closed")
+
+def find_json_video_offsets(json_path):
+    """
+    Finds the byte range of each video block in a JSON file of the dataset. 
+    All the files are structured as `{key: [{ParticipantID, key: [video, video, ...]}]}`,
+    where each video is an object with the key `VideoID`. 
+
+    The range of a video can be read with `f.seek(start); f.read(end-start)`
+    and parsed as an independent JSON object, see `DatasetCEAP.load_video()`.
+
+    :param json_path: Path of the JSON file
+    :type json_path: str
+    :return: Dictionary {VideoID: [start, end]}, e.g., {"V1": [120, 5000], ...}
+    :rtype: dict
+    """
+    with open(json_path, "rb") as json_file:
+        json_bytes = json_file.read()
+
+    video_offsets = {}
+    matches = list(_JSON_VIDEO_ID.finditer(json_bytes))
+    for i, match in enumerate(matches):
+        start = json_bytes.rfind(b"{", 0, match.start())
+        if (i+1 < len(matches)):
+            # Consecutive videos are only separated by a comma
+            next_start = json_bytes.rfind(b"{", 0, matches[i+1].start())
+            end = json_bytes.rfind(b"}", start, next_start) + 1
+        else:
+            end = _find_json_block_end(json_bytes, start)
+        video_offsets[match.group(1).decode()] = [start, end]
+    return video_offsets
 
 """
 Generate paths for intermediate files
@@ -131,6 +210,433 @@ def generate_complete_path(filename:str, main_folder="./temp/", subfolders='', f
     else:
         return None
 
+# =============================================================================
+# Streams
+# =============================================================================    
+
+class StreamCEAP():
+    """
+    Samples of a single feature group (e.g., `BVP_RawData`) at its native sampling
+    rate for all the videos of a participant. The samples are stored contiguously:
+
+        - object.timestamps     > float64 array (num_samples,)
+        - object.values         > float32 array (num_samples, num_channels)
+        - object.channels       > column names of `values`, the same as in the "frame" layout
+        - object.video_ids      > array (num_videos,) with the ID of each video
+        - object.video_offsets  > array (num_videos+1,). The samples of `video_ids[i]` are 
+                                    in the range [video_offsets[i], video_offsets[i+1])
+    """
+
+    def __init__(self, name, channels, timestamps, values, video_ids, video_offsets):
+        self.name = name
+        self.channels = channels
+        self.timestamps = timestamps
+        self.values = values
+        self.video_ids = video_ids
+        self.video_offsets = video_offsets
+        return
+
+    def __len__(self):
+        return self.timestamps.size
+
+    def __repr__(self):
+        return f"StreamCEAP({self.name}, channels={self.channels}, samples={len(self)}, videos={len(self.video_ids)})"
+
+    def get_video(self, video_id):
+        """
+        Returns the samples of a single video without copying them.
+
+        :param video_id: ID of the video (from 1 to 8)
+        :return: Tuple (timestamps, values)
+        :rtype: tuple
+        """
+        i = np.flatnonzero(self.video_ids == int(video_id))
+        if (i.size == 0):
+            return self.timestamps[:0], self.values[:0]
+        i = i[0]
+        return self.timestamps[self.video_offsets[i]:self.video_offsets[i+1]], self.values[self.video_offsets[i]:self.video_offsets[i+1]]
+
+    def to_dataframe(self):
+        """
+        Returns the stream as a DataFrame with the columns `VideoID`, `TimeStamp` and the channels.
+        """
+        df_stream = pd.DataFrame(self.values, columns=self.channels)
+        df_stream.insert(0, column=DatasetCEAP.K_TIMESTAMP, value=self.timestamps)
+        df_stream.insert(0, column=DatasetCEAP.K_VIDEO, value=np.repeat(self.video_ids, np.diff(self.video_offsets)))
+        return df_stream
+
+
+class StreamsCEAP(dict):
+    """
+    Dictionary {feature group name: StreamCEAP} with the data of a participant, as
+    returned by `DatasetCEAP.load_data_from_participant(..., layout="streams")`.
+    The streams are only resampled to a common time grid when `align()` is called.
+    """
+
+    def __init__(self, participant_id, data_type = None, processing_level = None):
+        super().__init__()
+        self.participant_id = participant_id
+        self.data_type = data_type
+        self.processing_level = processing_level
+        return
+
+    def align(self, rate, streams = None):
+        """
+        Resamples the streams to a common time grid with linear interpolation.
+        The grid of each video starts at the first timestamp of any stream and
+        has a sample every `1/rate` seconds until the last timestamp of any stream.
+        The grid times before the first or after the last sample of a stream are NaN.
+        Videos without samples in any of the streams are skipped.
+
+        :param rate: Sampling frequency of the common grid in Hz (e.g., 30)
+        :param streams: List of feature group names to align. By default, all of them.
+        :return: DataFrame with the columns `ParticipantID`, `VideoID`, `TimeStamp` and the channels of the streams
+        :rtype: pd.DataFrame
+        """
+        streams = list(self.keys()) if (streams is None) else streams
+        video_ids = np.unique(np.concatenate([ self[ft_group_name].video_ids for ft_group_name in streams ]))
+
+        df_data = []
+        for video_id in video_ids:
+            videos_data = [ self[ft_group_name].get_video(video_id) for ft_group_name in streams ]
+            if (all(timestamps.size == 0 for timestamps, _ in videos_data)):
+                continue
+            t_start = min(timestamps.min() for timestamps, _ in videos_data if timestamps.size > 0)
+            t_end = max(timestamps.max() for timestamps, _ in videos_data if timestamps.size > 0)
+            timestamps_grid = t_start + np.arange(int(np.floor((t_end - t_start) * rate)) + 1) / rate
+
+            df_video = { DatasetCEAP.K_VIDEO: np.full(timestamps_grid.size, video_id), DatasetCEAP.K_TIMESTAMP: timestamps_grid }
+            for ft_group_name, (timestamps, values) in zip(streams, videos_data):
+                # Interpolation requires increasing timestamps
+                if (np.any(np.diff(timestamps) < 0)):
+                    order = np.argsort(timestamps, kind="stable")
+                    timestamps, values = timestamps[order], values[order]
+                for c, colname in enumerate(self[ft_group_name].channels):
+                    if (timestamps.size == 0):
+                        df_video[colname] = np.full(timestamps_grid.size, np.nan, dtype=np.float32)
+                    else:
+                        df_video[colname] = np.interp(timestamps_grid, timestamps, values[:,c], left=np.nan, right=np.nan).astype(np.float32)
+            df_data.append(pd.DataFrame(df_video))
+
+        if (len(df_data) == 0):
+            df_data.append(pd.DataFrame(columns=[ DatasetCEAP.K_VIDEO, DatasetCEAP.K_TIMESTAMP ] +
+                                                [ colname for ft_group_name in streams for colname in self[ft_group_name].channels ]))
+        df_data = pd.concat(df_data, axis=0, ignore_index=True)
+        df_data.insert(0, column=DatasetCEAP.K_PARTICIPANT, value=self.participant_id)
+        return df_data
+
+# =============================================================================
+# Tensor store
+# =============================================================================    
+
+class TensorStoreCEAP():
+    """
+    Reader of the Frame-level data exported with `DatasetCEAP.export_tensor_store()`.
+    The data is indexed as a tensor (participant x video x frame x channel):
+
+        - store[3, 2, 0:250, ["EDA_EDA","HR_HR"]]  > array (250, 2) of P3, V2
+        - store[[1,2], :, :, "Valence"]           > array (2, 8, max_frames)
+
+    Participants and videos are selected by their ID (e.g., 3 or "P3", 2 or "V2),
+    a list of IDs, or a slice over all IDs. Frames are positional and channels are
+    selected by name. Frames after the end of a video are NaN. Only the chunks
+    of the selected videos are read, and uncompressed chunks are memory-mapped.
+
+    The folder of the store contains:
+        - meta.json                 > Channels, IDs, number of frames and chunk format
+        - chunks/P{pid}_V{vid}.npy  > float array (n_frames, num_channels) per video
+        - chunks/P{pid}_V{vid}_TimeStamp.npy > float64 array (n_frames,) with the timestamps of the frames
+    Compressed stores have a single `chunks/P{pid}_V{vid}.npz` with both arrays.
+    """
+
+    META_FILENAME = "meta.json"
+    CHUNKS_FOLDERNAME = "chunks"
+    VERSION = 1
+
+    def __init__(self, store_path):
+        self.store_path = store_path
+        self.meta = load_json(os.path.join(store_path, self.META_FILENAME))
+        self.participants = self.meta["participants"]
+        self.videos = self.meta["videos"]
+        self.channels = self.meta["channels"]
+        self.compressed = self.meta["compressed"]
+        # Frames per video, -1 if the video is not available
+        self.n_frames = np.array(self.meta["n_frames"], dtype=np.int64)
+        self.shape = (len(self.participants), len(self.videos), int(self.n_frames.max(initial=0)), len(self.channels))
+        self._chunks = {}
+        return
+
+    def __repr__(self):
+        return f"TensorStoreCEAP({self.store_path}, shape={self.shape})"
+
+    @staticmethod
+    def get_chunk_name(participant_id, video_id):
+        return f"P{participant_id}_V{video_id}"
+
+    def _read_chunk(self, participant_id, video_id):
+        """
+        Returns the tuple (values, timestamps) of a video, None if it is not available
+        """
+        chunk_name = self.get_chunk_name(participant_id, video_id)
+        if (chunk_name not in self._chunks):
+            chunk_path = os.path.join(self.store_path, self.CHUNKS_FOLDERNAME, chunk_name)
+            if (self.n_frames[self.participants.index(participant_id), self.videos.index(video_id)] < 0):
+                self._chunks[chunk_name] = None
+            elif (self.compressed):
+                with np.load(chunk_path + ".npz") as chunk_file:
+                    self._chunks[chunk_name] = (chunk_file["values"], chunk_file["timestamps"])
+            else:
+                self._chunks[chunk_name] = (np.load(chunk_path + ".npy", mmap_mode="r"),
+                                            np.load(chunk_path + "_" + DatasetCEAP.K_TIMESTAMP + ".npy", mmap_mode="r"))
+        return self._chunks[chunk_name]
+
+    @staticmethod
+    def _select_ids(key, ids, prefix):
+        """
+        Returns the list of IDs selected by `key` and whether the axis is kept
+        """
+        if (isinstance(key, slice)):
+            return ids[key], True
+        if (isinstance(key, (list, tuple, np.ndarray))):
+            return [ TensorStoreCEAP._select_ids(k, ids, prefix)[0][0] for k in key ], True
+        key = int(key[1:]) if (isinstance(key, str) and key.startswith(prefix)) else int(key)
+        if (key not in ids):
+            raise ValueError(f"The ID {prefix}{key} is not in the store")
+        return [key], False
+
+    def _select_channels(self, key):
+        """
+        Returns the channel indices selected by `key` (slice if contiguous) and whether the axis is kept
+        """
+        if (isinstance(key, slice)):
+            return key, True
+        if (isinstance(key, str)):
+            return slice(self.channels.index(key), self.channels.index(key)+1), False
+        channel_idx = [ self.channels.index(channel) for channel in key ]
+        # Contiguous channels are read as a slice of the memory-mapped chunk
+        if (len(channel_idx) > 0 and channel_idx == list(range(channel_idx[0], channel_idx[-1]+1))):
+            return slice(channel_idx[0], channel_idx[-1]+1), True
+        return channel_idx, True
+
+    def __getitem__(self, key):
+        key = key if isinstance(key, tuple) else (key,)
+        if (len(key) > 4):
+            raise ValueError("The store has 4 dimensions: participant, video, frame, channel")
+        key = key + (slice(None),) * (4 - len(key))
+
+        participant_ids, keep_participants = self._select_ids(key[0], self.participants, "P")
+        video_ids, keep_videos = self._select_ids(key[1], self.videos, "V")
+        if (isinstance(key[2], slice)):
+            frames, keep_frames = range(self.shape[2])[key[2]], True
+        else:
+            frames, keep_frames = range(self.shape[2])[int(key[2]):][:1], False
+        channel_idx, keep_channels = self._select_channels(key[3])
+        num_channels = len(range(len(self.channels))[channel_idx]) if isinstance(channel_idx, slice) else len(channel_idx)
+
+        data = np.full((len(participant_ids), len(video_ids), len(frames), num_channels), np.nan, dtype=self.meta["dtype"])
+        frames_arr = np.asarray(frames, dtype=np.int64)
+        for i, participant_id in enumerate(participant_ids):
+            for j, video_id in enumerate(video_ids):
+                chunk = self._read_chunk(participant_id, video_id)
+                if (chunk is None):
+                    continue
+                values = chunk[0]
+                if (frames.step == 1):
+                    # Only the rows of the slice are read from the chunk
+                    n_valid = max(0, min(frames.stop, values.shape[0]) - frames.start)
+                    data[i, j, :n_valid] = values[frames.start:frames.start+n_valid, channel_idx]
+                else:
+                    is_valid = frames_arr < values.shape[0]
+                    data[i, j, is_valid] = values[frames_arr[is_valid]][:, channel_idx]
+
+        # Axes selected with a single value are removed, as in numpy
+        axes_to_drop = tuple( axis for axis, keep in enumerate([keep_participants, keep_videos, keep_frames, keep_channels]) if not keep )
+        return data.squeeze(axis=axes_to_drop) if (len(axes_to_drop) > 0) else data
+
+    def get_timestamps(self, participant_id, video_id):
+        """
+        Returns the timestamps of the frames of a video
+
+        :param participant_id: ID of the participant (e.g., 3)
+        :param video_id: ID of the video (from 1 to 8)
+        :return: float64 array (n_frames,)
+        :rtype: np.array
+        """
+        chunk = self._read_chunk(int(participant_id), int(video_id))
+        return np.zeros(0) if (chunk is None) else chunk[1]
+
+# =============================================================================
+# Shared memory
+# =============================================================================    
+
+class SharedDatasetCEAP():
+    """
+    Dataframe of the dataset stored in shared memory, with one block per column.
+    The process that loads the data creates it with `DatasetCEAP.load_shared()`,
+    and the worker processes attach to it with the picklable `handle`:
+
+        def process_participant(handle, participant_id):
+            with SharedDatasetCEAP.attach(handle) as shared:
+                df_data = shared.get_rows(participant_id, "Physio", "Frame")
+                ...
+                del df_data   # Views must be released before closing
+
+        with dataset.load_shared(processing_levels=["Frame"]) as shared:
+            with ProcessPoolExecutor() as executor:
+                executor.map(process_participant, [shared.handle]*32, range(1,33))
+
+    The workers get read-only views of the blocks, so the data is not parsed
+    or copied again per worker. String columns are stored as categoricals.
+    With Python < 3.13, the workers must be started by the process that
+    created the blocks, otherwise the blocks are removed when a worker exits.
+    """
+
+    def __init__(self, blocks, handle, owner):
+        self._blocks = blocks   # Dictionary {column name: SharedMemory}
+        self.handle = handle
+        self.owner = owner      # Only the owner removes the blocks
+        self._columns = {}
+        for spec in handle["columns"]:
+            values = np.ndarray(spec["shape"], dtype=spec["dtype"], buffer=self._blocks[spec["name"]].buf)
+            values.flags.writeable = False
+            self._columns[spec["name"]] = values
+        return
+
+    def __len__(self):
+        return self.handle["num_rows"]
+
+    def __repr__(self):
+        return f"SharedDatasetCEAP(rows={len(self)}, columns={len(self.handle['columns'])}, owner={self.owner})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        if (self.owner):
+            self.unlink()
+        return False
+
+    @classmethod
+    def from_dataframe(cls, df_data, row_groups = None):
+        """
+        Copies the columns of a dataframe to new shared memory blocks.
+
+        :param df_data: Dataframe with numeric, categorical or string columns
+        :param row_groups: List of columns whose contiguous values are indexed, see `get_rows()`
+        :rtype: SharedDatasetCEAP
+        """
+        handle = { "num_rows": len(df_data), "columns": [], "row_groups": {} }
+        blocks = {}
+        try:
+            for colname in df_data.columns:
+                column = df_data[colname]
+                spec = { "name": colname }
+                if (not isinstance(column.dtype, pd.CategoricalDtype) and not pd.api.types.is_numeric_dtype(column.dtype)):
+                    column = column.astype("category")
+                if (isinstance(column.dtype, pd.CategoricalDtype)):
+                    spec["categories"] = column.cat.categories.tolist()
+                    values = column.cat.codes.to_numpy()
+                else:
+                    values = column.to_numpy()
+
+                block = shared_memory.SharedMemory(create=True, size=max(1, values.nbytes))
+                blocks[colname] = block
+                np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+                spec.update({ "block": block.name, "dtype": values.dtype.str, "shape": list(values.shape) })
+                handle["columns"].append(spec)
+
+            if (row_groups is not None and len(df_data) > 0):
+                # Range of rows of each combination of values, e.g., a file per participant
+                is_block_start = np.zeros(len(df_data), dtype=bool)
+                is_block_start[0] = True
+                for colname in row_groups:
+                    values = df_data[colname].to_numpy()
+                    is_block_start[1:] |= (values[1:] != values[:-1])
+                block_starts = np.flatnonzero(is_block_start)
+                block_ends = np.r_[block_starts[1:], len(df_data)]
+                for start, end in zip(block_starts.tolist(), block_ends.tolist()):
+                    key = "/".join( str(df_data[colname].iat[start]) for colname in row_groups )
+                    handle["row_groups"].setdefault(key, []).append([start, end])
+                handle["row_groups_columns"] = list(row_groups)
+        except:
+            for block in blocks.values():
+                block.close()
+                block.unlink()
+            raise
+        return cls(blocks, handle, owner=True)
+
+    @classmethod
+    def attach(cls, handle):
+        """
+        Attaches to the shared memory blocks described by `handle`, without copying them.
+
+        :param handle: Attribute `handle` of the SharedDatasetCEAP created by the main process
+        :rtype: SharedDatasetCEAP
+        """
+        blocks = {}
+        for spec in handle["columns"]:
+            try:
+                # The blocks are not removed when this process exits (Python >= 3.13)
+                blocks[spec["name"]] = shared_memory.SharedMemory(name=spec["block"], track=False)
+            except TypeError:
+                blocks[spec["name"]] = shared_memory.SharedMemory(name=spec["block"])
+        return cls(blocks, handle, owner=False)
+
+    def get_column(self, colname):
+        """
+        Returns a read-only view of a column. Categorical columns are returned as codes.
+        """
+        return self._columns[colname]
+
+    def to_dataframe(self, rows = slice(None)):
+        """
+        Returns a dataframe whose numeric columns are read-only views of the shared blocks.
+
+        :param rows: Slice of rows to include. By default, all the rows.
+        :rtype: pd.DataFrame
+        """
+        df_data = {}
+        for spec in self.handle["columns"]:
+            values = self._columns[spec["name"]][rows]
+            if ("categories" in spec):
+                values = pd.Categorical.from_codes(values, categories=spec["categories"])
+            df_data[spec["name"]] = values
+        return pd.DataFrame(df_data, copy=False)
+
+    def get_rows(self, *values):
+        """
+        Returns the rows with the given values of the columns in `row_groups`,
+        e.g., `get_rows(3, "Physio", "Frame")` for `row_groups=["ParticipantID", "data_type", "processing_level"]`.
+
+        :rtype: pd.DataFrame
+        """
+        key = "/".join(str(value) for value in values)
+        if (key not in self.handle["row_groups"]):
+            raise ValueError(f"There are no rows with {dict(zip(self.handle.get('row_groups_columns', []), values))}")
+        list_df_data = [ self.to_dataframe(slice(start, end)) for start, end in self.handle["row_groups"][key] ]
+        return list_df_data[0] if (len(list_df_data) == 1) else pd.concat(list_df_data, axis=0, ignore_index=True)
+
+    def close(self):
+        """
+        Closes the access of this process to the blocks. The dataframes and
+        views obtained from this object must be deleted before.
+        """
+        self._columns = {}
+        for block in self._blocks.values():
+            block.close()
+        return
+
+    def unlink(self):
+        """
+        Removes the blocks from the system. Only called by the owner, 
+        after all the workers finished.
+        """
+        for block in self._blocks.values():
+            block.unlink()
+        self._blocks = {}
+        return
+
 # =============================================================================
 # Main
 # =============================================================================    
@@ -171,6 +677,7 @@ class DatasetCEAP():
 
     ### CONSTANTS
     INPUT_FILE_EXTENSION = ".json"
+    DATA_FILE_EXTENSIONS = ceap_io.DATA_FILE_EXTENSIONS  # Formats of the data files written by the processing scripts
     DATA_FILE_EXTENSION = ".csv"
 
     # Shortcut for keys
@@ -182,29 +689,50 @@ class DatasetCEAP():
     VIDEO_INFO_FILENAME = "video_info_summary.csv"
     DEMOGRAPHICS_FILENAME = "demographics_info_summary.csv"
     INDEX_TREE_FILENAME = "data_tree_index.json"
+    K_SIGNATURES = "signatures"   # Modification times of the indexed folders and files
+
+    # CACHE OF PARSED FILES
+    CACHE_FOLDERNAME = "cache"
+    CACHE_METADATA_FILENAME = "metadata.json"
+    CACHE_COLUMN_EXTENSION = ".npy"
+    CACHE_VERSION = 2
 
     # MAIN VARIABLES TO ACCESS DATA
     # Filenames
     folder_data_path = ""    # Root folder of the original dataset
     index_file_path = ""     # Filepath for the json file containing the index
+    cache_dir = None         # Folder with the binary version of the parsed files
 
     # Data Variables
     stimuli = None            # DataFrame to store information about each videofile
     demographics = None         # DataFrame to store participants' demographics
     data = None             # Dictionary of Pandas DataFrame with different types of data
 
-    def __init__(self, folder_path):
+    def __init__(self, folder_path, cache_dir = None, use_cache = True, streaming = False, compact = False):
         """
         Initializes object that analyzes dataset
 
         :param folder_path: Input folder with data
         :type folder_path: str
-        :param dictionary_path: Output path with directory from 
-        :type dictionary_path: str
+        :param cache_dir: Folder where the parsed files are stored in binary format.
+                        By default it is the folder `cache` at the root of the dataset.
+        :type cache_dir: str
+        :param use_cache: Store and reuse the parsed files from `cache_dir`
+        :type use_cache: bool
+        :param streaming: Decode the JSON files by blocks with `ceap_io.load_json_streaming()`.
+                        Slower, but the peak memory is a fraction of `json.load()` for the Raw files.
+        :type streaming: bool
+        :param compact: Returns memory-lean dataframes, see `_compact_dataframe()`.
+        :type compact: bool
         """
         self.folder_data_path = folder_path
         self.index_file_path = os.path.join(self.folder_data_path, self.INDEX_TREE_FILENAME)
 
+        self.use_cache = use_cache
+        self.streaming = streaming
+        self.compact = compact
+        self.cache_dir = cache_dir if (cache_dir is not None) else os.path.join(self.folder_data_path, self.CACHE_FOLDERNAME)
+
         self.load_or_create_index()
 
         if(self.index != None):
@@ -224,31 +752,76 @@ class DatasetCEAP():
             # File hasn't been created yet
             return None
 
-    def load_or_create_index(self):
+    def load_or_create_index(self, rebuild = False):
         """
         Analyzes the folder to see which files are available.
         Enables access to the variable `self.index`, which contains a 
         dictionary with path to key event and data files.
         It also creates the json file at the root of the dataset.
 
+        The index stores the modification times of the folders and files 
+        of the dataset. When the index already exists, only the subfolders 
+        and questionnaires that changed since it was saved are scanned again.
+
+        :param rebuild: Ignores the existing index and scans the whole dataset
         :return: Nothing
         :rtype: None
         """
 
         # Entry condition
-        if(self.__load_index_file() is not None):
+        files_index = None
+        if(not rebuild and self.__load_index_file() is not None):
             print("Index already exists: Loading from ", self.index_file_path)
-            return
-        
-        ##### Create index from the dataset folder
-        print("There is no index yet! Creating it in ", self.index_file_path)
-    
-        # Dictionary to store files
-        files_index = {}
+            # Indexes without modification times are created again
+            files_index = self.index if (self.K_SIGNATURES in self.index) else None
+
+        if (files_index is None):
+            ##### Create index from the dataset folder
+            print("There is no index yet! Creating it in ", self.index_file_path)
+            files_index = {
+                self.K_SIGNATURES: { "stimuli": None, "questionnaires": {}, "folders": {} },
+                "questionnaires": {},   # Parsed row of each questionnaire file
+                "data": deepcopy(self.DATA_TYPES_DICT),  # Data is stored per experiment session (>50MB/each file)
+                "video_offsets": deepcopy(self.DATA_TYPES_DICT),  # Byte range of each video in the files of `data`
+            }
+
+        index_changed = self._update_index_stimuli(files_index)
+        index_changed = self._update_index_demographics(files_index) or index_changed
+
+        iterate_data_types_dict = {
+            self.LIST_DATA_TYPES[0]: DataFoldersCEAP.Annotations,
+            self.LIST_DATA_TYPES[1]: DataFoldersCEAP.Behavior,
+            self.LIST_DATA_TYPES[2]: DataFoldersCEAP.Physio,
+        }
+
+        # Iterate per data types
+        for datatype_name, datatype_foldername in iterate_data_types_dict.items():
+            # Iterate per level of processing according to original paper
+            for processing_level_name in self.LIST_PROCESSING_LEVELS:
+                index_changed = self._update_index_data_folder(files_index, datatype_name, datatype_foldername, processing_level_name) or index_changed
+
+        if (index_changed):
+            # Store the files in a JSON
+            create_json(files_index, self.index_file_path, pretty=True)
+            print(f"Json file with index of the dataset was saved in {self.index_file_path}")
+
+        # Global variable for the index
+        self.index = files_index
+        return
+
+    def _update_index_stimuli(self, files_index):
+        """
+        Summarizes the file `VideoInfo.json` in a CSV file, if it changed since the index was saved.
+        Returns True if the index was modified.
+        """
+        video_info_path = os.path.join(self.folder_data_path, str(DataFoldersCEAP.Stimuli), "VideoInfo"+self.INPUT_FILE_EXTENSION)
+        filepath_temp = os.path.join(self.folder_data_path, self.VIDEO_INFO_FILENAME)
+        video_info_mtime = os.stat(video_info_path).st_mtime_ns
+        if (files_index[self.K_SIGNATURES]["stimuli"] == video_info_mtime and os.path.isfile(filepath_temp)):
+            return False
 
         ########################################
         ### Load Video info
-        video_info_path = os.path.join(self.folder_data_path, str(DataFoldersCEAP.Stimuli), "VideoInfo"+self.INPUT_FILE_EXTENSION)
         video_info_dict = load_json(video_info_path)
         video_info_dict = video_info_dict["VideoInfo"] # Unpack dict
 
@@ -260,15 +833,45 @@ class DatasetCEAP():
         video_info_df = pd.DataFrame(video_info_df)
 
         # Save to CSV file
-        filepath_temp = os.path.join(self.folder_data_path, self.VIDEO_INFO_FILENAME)
         video_info_df.to_csv(filepath_temp, index=False)
 
         files_index["stimuli_path"] = filepath_temp
+        files_index[self.K_SIGNATURES]["stimuli"] = video_info_mtime
+        return True
 
-        ########################################
-        ### Load Demographics info
+    def _parse_questionnaire(self, participant_data_filename):
+        """
+        Returns the questionnaire of a participant as a single row, with
+        the SAM ratings of each video as columns prefixed with the video ID.
+        """
+        data_participant_dict = load_json(participant_data_filename)["QuestionnaireData"][0] # Unpack dict
+        # Replace P0 with only the number
+        data_participant_dict[self.K_PARTICIPANT] = data_participant_dict[self.K_PARTICIPANT][1:]
+
+        # Extract specific SAM ratings per video from embedded dictionary
+        data_participant_dict_SAM = data_participant_dict.pop("Video_SAMRating_VideoTime_Data")
+        for video_rat_SAM in data_participant_dict_SAM:
+            # Each video rating is moved as a prefix of the column name
+            # to generate one row per participant
+            video_id = video_rat_SAM.pop(self.K_VIDEO)
+            video_start_time = video_rat_SAM.pop("Start_End_TimeStamp")[0]["UnixTimeStamp"]
+            
+            data_participant_dict[video_id+"_start_UnixTimestamp"] = video_start_time
+            for k,v in video_rat_SAM.items():
+                data_participant_dict[video_id+"_"+k] = v
+        return data_participant_dict
+
+    def _update_index_demographics(self, files_index):
+        """
+        Parses the questionnaires added or modified since the index was saved, 
+        and summarizes all of them in a CSV file. Returns True if the index was modified.
+        """
         demographics_path = os.path.join(self.folder_data_path, str(DataFoldersCEAP.Demographics))
-        demographics_dict = None  # Where the compilation of info will be stored
+        filepath_temp = os.path.join(self.folder_data_path, self.DEMOGRAPHICS_FILENAME)
+        questionnaires_mtimes = files_index[self.K_SIGNATURES]["questionnaires"]
+        questionnaires_rows = files_index["questionnaires"]
+
+        current_mtimes = {}
         with os.scandir(demographics_path) as iterator:
             for entry in iterator:
                 # A file is equivalent to a participant
@@ -276,88 +879,283 @@ class DatasetCEAP():
                         entry.is_file() and 
                         entry.name.endswith(self.INPUT_FILE_EXTENSION) and
                         entry.name.startswith("P")):
+                    current_mtimes[entry.name] = entry.stat().st_mtime_ns
+
+        changed_files = [ filename for filename, mtime in current_mtimes.items() if questionnaires_mtimes.get(filename) != mtime ]
+        removed_files = [ filename for filename in questionnaires_mtimes.keys() if filename not in current_mtimes ]
+        if (len(changed_files) == 0 and len(removed_files) == 0 and os.path.isfile(filepath_temp)):
+            return False
+
+        for filename in removed_files:
+            questionnaires_mtimes.pop(filename)
+            questionnaires_rows.pop(filename, None)
+        for filename in changed_files:
+            questionnaires_rows[filename] = self._parse_questionnaire(os.path.join(demographics_path, filename))
+            questionnaires_mtimes[filename] = current_mtimes[filename]
+        print(f"Parsed {len(changed_files)} questionnaires from {demographics_path}")
+
+        demographics_df = pd.DataFrame(list(questionnaires_rows.values()))
+        # Save to CSV file
+        demographics_df.to_csv(filepath_temp, index=False)
 
-                    participant_data_filename = os.path.join(demographics_path, entry.name)
-                    data_participant_dict = load_json(participant_data_filename)["QuestionnaireData"][0] # Unpack dict
-                    # Replace P0 with only the number
-                    data_participant_dict[self.K_PARTICIPANT] = data_participant_dict[self.K_PARTICIPANT][1:]
-
-                    # Extract specific SAM ratings per video from embedded dictionary
-                    data_participant_dict_SAM = data_participant_dict.pop("Video_SAMRating_VideoTime_Data")
-                    for video_rat_SAM in data_participant_dict_SAM:
-                        # Each video rating is moved as a prefix of the column name
-                        # to generate one row per participant
-                        video_id = video_rat_SAM.pop(self.K_VIDEO)
-                        video_start_time = video_rat_SAM.pop("Start_End_TimeStamp")[0]["UnixTimeStamp"]
-                        
-                        data_participant_dict[video_id+"_start_UnixTimestamp"] = video_start_time
-                        for k,v in video_rat_SAM.items():
-                            data_participant_dict[video_id+"_"+k] = v
+        files_index["demographics_path"] = filepath_temp
+        return True
 
-            
-                    # Populate final keys (columns) from the first file
-                    if(demographics_dict is None):
-                        demographics_dict = { k:[] for k in data_participant_dict.keys() }
+    def _update_index_data_folder(self, files_index, datatype_name, datatype_foldername, processing_level_name):
+        """
+        Updates the data files of a data type and level of processing in the index.
+        The folder is only scanned if a file was added, removed or modified since 
+        the index was saved, and the byte ranges of the videos are only calculated
+        for the modified JSON files. Missing folders are indexed as empty.
+        Returns True if the index was modified.
+        """
+        root_path = os.path.join(self.folder_data_path, str(datatype_foldername), str(processing_level_name))
+        folder_key = f"{datatype_name}/{processing_level_name}"
+        folders_signatures = files_index[self.K_SIGNATURES]["folders"]
+        previous_signature = folders_signatures.get(folder_key, {"mtime":None, "files":{}})
+        previous_data_files = files_index["data"][datatype_name][str(processing_level_name)]
+        previous_offsets = files_index["video_offsets"][datatype_name][str(processing_level_name)]
+
+        if (not os.path.isdir(root_path)):
+            if (folder_key not in folders_signatures and len(previous_data_files) == 0):
+                return False
+            print(f"WARNING!! The folder {root_path} does not exist")
+            folders_signatures.pop(folder_key, None)
+            files_index["data"][datatype_name][str(processing_level_name)] = {}
+            files_index["video_offsets"][datatype_name][str(processing_level_name)] = {}
+            return True
+
+        folder_mtime = os.stat(root_path).st_mtime_ns
+        if (previous_signature["mtime"] == folder_mtime):
+            # No file was added or removed, but they might have been overwritten
+            try:
+                files_mtimes = { filename: os.stat(os.path.join(root_path, filename)).st_mtime_ns for filename in previous_signature["files"].keys() }
+            except OSError:
+                files_mtimes = None
+            if (files_mtimes == previous_signature["files"]):
+                return False
+
+        ### Scan the folder
+        files_mtimes = {}
+        root_data_dict = {}  # Where the compilation of info will be stored
+        with os.scandir(root_path) as iterator:
+            for entry in iterator:
+                # A file is equivalent to a participant
+                if( not entry.name.startswith(".") and 
+                        entry.is_file() and 
+                        os.path.splitext(entry.name)[1] in self.DATA_FILE_EXTENSIONS and
+                        entry.name.startswith("P")):
                     
-                    # Add values to array of columns
-                    for k,v in data_participant_dict.items():
-                        demographics_dict[k].append(v)
+                    participant_id = entry.name.split("_")[0][1:]
+                    root_data_dict.setdefault(participant_id, []).append(os.path.join(root_path, entry.name))
+                    files_mtimes[entry.name] = entry.stat().st_mtime_ns
+
+        # The same file might be available in JSON and binary formats
+        data_files = {}
+        video_offsets = {}
+        for participant_id, participant_paths in root_data_dict.items():
+            path_to_file = ceap_io.select_data_file(participant_paths)
+            data_files[participant_id] = path_to_file
+            if (path_to_file.endswith(self.INPUT_FILE_EXTENSION)):
+                filename = os.path.basename(path_to_file)
+                if (previous_data_files.get(participant_id) == path_to_file and 
+                        previous_signature["files"].get(filename) == files_mtimes[filename] and
+                        participant_id in previous_offsets):
+                    video_offsets[participant_id] = previous_offsets[participant_id]
+                else:
+                    video_offsets[participant_id] = find_json_video_offsets(path_to_file)
+
+        files_index["data"][datatype_name][str(processing_level_name)] = data_files
+        files_index["video_offsets"][datatype_name][str(processing_level_name)] = video_offsets
+        folders_signatures[folder_key] = { "mtime": folder_mtime, "files": files_mtimes }
+        print(f"Indexed {len(data_files)} files from {root_path}")
+        return True
+
+    def _feature_group_to_columns_per_sample(self, ft_group_name, data_feature_group, prefix_columns):
+        """
+        Reference implementation of `_feature_group_to_columns()` that walks 
+        every sample of the feature group. Kept to benchmark and validate the 
+        vectorized version, see `ceap_benchmark.py`.
+        """
+        df_this_feature = {}
+        for single_timestamp in range(len(data_feature_group)):
+            data_single_sample = data_feature_group[single_timestamp]
+
+            # Populate keys if empty. Otherwise it will just add rows to the existing data
+            for ft_colname, single_datapoint in data_single_sample.items():
+                # Create column names combining the feature_group+key in sample
+                key_combination = ft_group_name.split("_")[0]+"_"+ft_colname if (ft_colname != self.K_TIMESTAMP and prefix_columns) else ft_colname
+                if(key_combination not in df_this_feature.keys()):
+                    df_this_feature[key_combination] = []
+                # Append data
+                df_this_feature[key_combination].append(single_datapoint)
+            ## End of a single sample
+        ## End of all samples for a feature
+        return df_this_feature
+
+    def _feature_group_to_columns(self, ft_group_name, data_feature_group, prefix_columns):
+        """
+        Converts the list of samples of a feature group (e.g., `EDA_RawData`) into a
+        dictionary of numpy arrays, one per key in the samples.
+        All the samples of a feature group contain the same keys, so the keys are 
+        taken from the first sample and the values are transposed in a single pass.
+
+        :param ft_group_name: Name of the feature group, used as prefix of the columns
+        :param data_feature_group: List of dictionaries, one per sample, or dictionary of columns from `ceap_io.load_json_streaming()`
+        :param prefix_columns: Whether the column names are combined with the feature group
+        :return: Dictionary {column name: array of values}
+        :rtype: dict
+        """
+        if (len(data_feature_group) == 0):
+            return {}
 
-        demographics_df = pd.DataFrame(demographics_dict)
-        # Save to CSV file
-        filepath_temp = os.path.join(self.folder_data_path, self.DEMOGRAPHICS_FILENAME)
-        demographics_df.to_csv(filepath_temp, index=False)
+        prefix = ft_group_name.split("_")[0]+"_"
+        if (isinstance(data_feature_group, dict)):
+            # Already decoded as columns. Typed arrays are used without copy
+            return { (prefix+ft_colname if (ft_colname != self.K_TIMESTAMP and prefix_columns) else ft_colname): 
+                        (values if isinstance(values, list) else np.asarray(values))
+                        for ft_colname, values in data_feature_group.items() }
 
-        files_index["demographics_path"] = filepath_temp
+        ft_colnames = list(data_feature_group[0].keys())
+        key_combinations = [ (prefix+ft_colname if (ft_colname != self.K_TIMESTAMP and prefix_columns) else ft_colname) for ft_colname in ft_colnames ]
 
-        ########################################
-        # Store the paths that contain the long datasets
-        files_index["data"] = deepcopy(self.DATA_TYPES_DICT)  # Data is stored per experiment session (>50MB/each file)
+        if (len(ft_colnames) == 1):
+            values_per_column = [ list(map(itemgetter(ft_colnames[0]), data_feature_group)) ]
+        else:
+            values_per_column = zip(*map(itemgetter(*ft_colnames), data_feature_group))
 
-        iterate_data_types_dict = {
-            self.LIST_DATA_TYPES[0]: DataFoldersCEAP.Annotations,
-            self.LIST_DATA_TYPES[1]: DataFoldersCEAP.Behavior,
-            self.LIST_DATA_TYPES[2]: DataFoldersCEAP.Physio,
-        }
+        df_this_feature = {}
+        for key_combination, values in zip(key_combinations, values_per_column):
+            values_array = np.array(values)
+            # Non-numeric or missing values are left to pandas to keep the same dtypes
+            df_this_feature[key_combination] = values_array if (values_array.dtype.kind in "biuf") else list(values)
+        return df_this_feature
 
-        # Iterate per data types
-        for datatype_name, datatype_foldername in iterate_data_types_dict.items():
-            # datatype_name = "Annotations" ### DEBUG
-            # datatype_foldername = DataFoldersCEAP.Annotations  ### DEBUG
-            # Iterate per level of processing according to original paper
-            for processing_level_name in self.LIST_PROCESSING_LEVELS:
-                # processing_level_name = self.LIST_PROCESSING_LEVELS[0]   ### DEBUG: Raw
-                ### Load Annotations
-                root_path = os.path.join(self.folder_data_path, str(datatype_foldername), str(processing_level_name))
-                root_data_dict = None  # Where the compilation of info will be stored
-                with os.scandir(root_path) as iterator:
-                    for entry in iterator:
-                        # A file is equivalent to a participant
-                        if( not entry.name.startswith(".") and 
-                                entry.is_file() and 
-                                entry.name.endswith(self.INPUT_FILE_EXTENSION) and
-                                entry.name.startswith("P")):
-                            
-                            participant_id = entry.name.split("_")[0][1:]
-                            # print(f"\t {datatype_name} \t{str(processing_level_name)} \t{participant_id}")
-                            files_index["data"][datatype_name][str(processing_level_name)][participant_id] = os.path.join(root_path, entry.name)
-                            # print(files_index)
-
-        # Store the files in a JSON
-        create_json(files_index, self.index_file_path, pretty=True)
-
-        print(f"Json file with index of the dataset was saved in {self.index_file_path}")
+    def _video_to_feature_groups(self, data_video, vectorized = True):
+        """
+        Converts the dictionary with the data of a single video into 
+        numpy columns per feature group.
 
-        # Global variable for the index
-        self.index = files_index.copy()
-        return
+        :param data_video: Dictionary with the key `VideoID` and one list of samples per feature group
+        :param vectorized: Use `_feature_group_to_columns()` instead of the per-sample loop
+        :return: Tuple (video_id, {feature group name: {column name: values}})
+        :rtype: tuple
+        """
+        # Accessing data per video. It has the videoId, then another 
+        # (key,value) pair  with the actual measurements
+        video_id = int(data_video[self.K_VIDEO][1:])
+        ft_groups = [ (ft_group_name, data_feature_group) for ft_group_name, data_feature_group in data_video.items() if ft_group_name != self.K_VIDEO ]
+
+        # Column names are combined with the feature group when a video has many groups
+        prefix_columns = len(ft_groups)>1
+
+        # A single video contains multiple feature types (e.g., "Physio" contains "HR", "EDA", etc.)
+        features_video = {}
+        for ft_group_name, data_feature_group in ft_groups:
+            if (vectorized or isinstance(data_feature_group, dict)):
+                features_video[ft_group_name] = self._feature_group_to_columns(ft_group_name, data_feature_group, prefix_columns)
+            else:
+                features_video[ft_group_name] = self._feature_group_to_columns_per_sample(ft_group_name, data_feature_group, prefix_columns)
+        return video_id, features_video
+
+    def _align_feature_groups_with_merge(self, features_video):
+        """
+        Reference implementation of `_align_feature_groups()` that outer-merges
+        the feature groups one by one. Each merge sorts and copies the growing
+        dataframe. Also used when the engine cannot reproduce the merge (e.g., 
+        repeated timestamps within a feature group).
+        """
+        df_this_video_group = None
+        for df_this_feature in features_video.values():
+            df_this_feature = pd.DataFrame(df_this_feature)
+            # Process if the resulting feature has the column "TimeStamp". E.g, IBI data is not present in some participants and should not be included
+            if(self.K_TIMESTAMP in df_this_feature.columns):
+                # Add to main video data
+                df_this_video_group = df_this_feature if (df_this_video_group is None) else df_this_video_group.merge(df_this_feature, how="outer", on=self.K_TIMESTAMP, sort=True)
+                """ EXAMPLE of merge function
+                # The desired behavior is that it will add columns to existing timestamps,
+                # while adding TimeStamps if they do not exist. This is mostly useful for 
+                # `Raw` data because they contain variables with different sampling frequency
+                df1 = pd.DataFrame({'TimeStamp': [1.5, 1.8], 'b': [1, 2]})
+                df2 = pd.DataFrame({'TimeStamp': [1.5, 1.65], 'c': [3, 4]})
+                df1.merge(df2, how='outer', on='TimeStamp', sort=True)
+                """
+        return df_this_video_group
+
+    def _align_feature_groups(self, features_video):
+        """
+        Aligns all the feature groups of a video in a single dataframe. 
+        The sorted union of the timestamps of all groups is computed once,
+        and the values of each group are scattered into preallocated columns
+        with `np.searchsorted`. Timestamps missing in a group are NaN.
 
-    def _load_json_data_from_filepath(self, path_to_requested_file):
-        # Variable to store the dataframe
-        df_data = None
+        The result is the same as chaining `merge(how="outer", on="TimeStamp", sort=True)`
+        over the feature groups, see `_align_feature_groups_with_merge()`.
 
+        :param features_video: Dictionary {feature group name: {column name: values}}
+        :return: Dataframe with the aligned feature groups
+        :rtype: pd.DataFrame
+        """
+        # E.g, IBI data is not present in some participants and should not be included
+        ft_groups = [ df_this_feature for df_this_feature in features_video.values() if self.K_TIMESTAMP in df_this_feature ]
+        if (len(ft_groups) == 0):
+            return None
+        if (len(ft_groups) == 1):
+            # A single group is not sorted by the merge
+            return pd.DataFrame(ft_groups[0])
+
+        timestamps_groups = [ np.asarray(df_this_feature[self.K_TIMESTAMP]) for df_this_feature in ft_groups ]
+        colnames = [ col for df_this_feature in ft_groups for col in df_this_feature.keys() if col != self.K_TIMESTAMP ]
+        if (len(set(colnames)) != len(colnames) or 
+                any(np.unique(timestamps).size != timestamps.size for timestamps in timestamps_groups)):
+            # Repeated timestamps in a group multiply the rows in a merge
+            return self._align_feature_groups_with_merge(features_video)
+
+        timestamps_union = np.unique(np.concatenate(timestamps_groups))
+
+        df_this_video_group = {}
+        for g, df_this_feature in enumerate(ft_groups):
+            rows_in_union = np.searchsorted(timestamps_union, timestamps_groups[g])
+            has_all_timestamps = (rows_in_union.size == timestamps_union.size)
+
+            for colname, values in df_this_feature.items():
+                if (colname == self.K_TIMESTAMP):
+                    # The timestamp column keeps the position of the first group
+                    if (g == 0):
+                        df_this_video_group[colname] = timestamps_union
+                    continue
+
+                values = np.asarray(values)
+                if (values.dtype.kind not in "biufc"):
+                    values = values.astype(object)
+                if (has_all_timestamps):
+                    aligned_values = np.empty_like(values)
+                else:
+                    # Integers are converted to float to store NaN, as in pandas
+                    aligned_dtype = values.dtype if (values.dtype.kind in "fc") else (np.float64 if (values.dtype.kind in "iu") else object)
+                    aligned_values = np.full(timestamps_union.size, np.nan, dtype=aligned_dtype)
+                aligned_values[rows_in_union] = values
+                df_this_video_group[colname] = aligned_values
+
+        return pd.DataFrame(df_this_video_group)
+
+    def _load_json_feature_groups(self, path_to_requested_file, vectorized = True):
+        """
+        Loads a JSON file of the dataset as numpy columns per feature group and video.
+
+        :param path_to_requested_file: Path to the JSON file
+        :param vectorized: Use the vectorized extraction of columns
+        :return: Tuple (participant_id, [(video_id, {feature group name: {column name: values}}), ...])
+        :rtype: tuple
+        """
         # Load the file from disk
-        data_participant_dict = load_json(path_to_requested_file)
+        if (not path_to_requested_file.endswith(self.INPUT_FILE_EXTENSION)):
+            # Binary formats written by the processing scripts
+            data_participant_dict = ceap_io.load_data_file(path_to_requested_file)
+        elif (self.streaming):
+            data_participant_dict = ceap_io.load_json_streaming(path_to_requested_file)
+        else:
+            data_participant_dict = load_json(path_to_requested_file)
         # Extract the first value regardless the key. It's always an array
         data_participant_dict = next(iter(data_participant_dict.values()))[0]
         # All Json files have the `participantID` and then the corresponding data
@@ -366,65 +1164,238 @@ class DatasetCEAP():
         # Access the array with feature names
         data_all_videos = next(iter(data_participant_dict.values()))
         # Iterate all videos per feature
-        for i in range(len(data_all_videos)):
-            # Accessing data per video. It has the videoId, then another 
-            # (key,value) pair  with the actual measurements
-            video_id = int(data_all_videos[i].pop(self.K_VIDEO)[1:])
+        features_all_videos = [ self._video_to_feature_groups(data_video, vectorized) for data_video in data_all_videos ]
+        return participant_id, features_all_videos
+
+    def _load_json_data_from_filepath(self, path_to_requested_file, vectorized = True, use_merge = False):
+        """
+        Loads a JSON file of the dataset as a single dataframe.
+
+        :param path_to_requested_file: Path to the JSON file
+        :param vectorized: Use the vectorized extraction of columns
+        :param use_merge: Use the outer-merge alignment of feature groups instead of the timestamp union
+        :return: Dataframe with one row per timestamp and video
+        :rtype: pd.DataFrame
+        """
+        # Dataframes of each video, concatenated at the end
+        list_df_videos = []
 
+        participant_id, features_all_videos = self._load_json_feature_groups(path_to_requested_file, vectorized)
+        for video_id, features_video in features_all_videos:
             # Temporary dataframe to store results of a video.
-            df_this_video_group = None
-
-            # After removing the video Id, it's needed to get the feature names
-            for ft_group_name, data_feature_group in data_all_videos[i].items():
-
-                # print(f"\t\tAnalyzing video {video_id} - Feature Group {ft_group_name}")
-
-                # A single video contains multiple feature types (e.g., "Physio" contains "HR", "EDA", etc.)
-                # ITERATE FEATURE GROUP
-                df_this_feature = {}
-                for single_timestamp in range(len(data_feature_group)):
-                    data_single_sample = data_feature_group[single_timestamp]
-
-                    # Populate keys if empty. Otherwise it will just add rows to the existing data
-                    for ft_colname, single_datapoint in data_single_sample.items():
-                        # Create column names combining the feature_group+key in sample
-                        key_combination = ft_group_name.split("_")[0]+"_"+ft_colname if (ft_colname != self.K_TIMESTAMP and len(data_all_videos[i].keys())>1) else ft_colname
-                        if(key_combination not in df_this_feature.keys()):
-                            df_this_feature[key_combination] = []
-                        # Append data
-                        df_this_feature[key_combination].append(single_datapoint)
-                    ## End of a single sample
-                ## End of all samples for a feature
-                df_this_feature = pd.DataFrame(df_this_feature)
-                # Process if the resulting feature has the column "TimeStamp". E.g, IBI data is not present in some participants and should not be included
-                if(self.K_TIMESTAMP in df_this_feature.columns):
-                    # df_this_feature.set_index(self.K_TIMESTAMP, inplace=True) # Not needed anymore, merging without being the index
-                    # Add to main video data
-                    df_this_video_group = df_this_feature if (df_this_video_group is None) else df_this_video_group.merge(df_this_feature, how="outer", on=self.K_TIMESTAMP, sort=True)
-                    """ EXAMPLE of merge function
-                    # The desired behavior is that it will add columns to existing timestamps,
-                    # while adding TimeStamps if they do not exist. This is mostly useful for 
-                    # `Raw` data because they contain variables with different sampling frequency
-                    df1 = pd.DataFrame({'TimeStamp': [1.5, 1.8], 'b': [1, 2]})
-                    df2 = pd.DataFrame({'TimeStamp': [1.5, 1.65], 'c': [3, 4]})
-                    df1.merge(df2, how='outer', on='TimeStamp', sort=True)
-                    """
-                # print(f"{ft_group_name} - Size: {df_this_feature.shape}")
-                # print(df_this_feature)
-                # if ft_group_name=="BVP_RawData":
-                #     break
-                
+            if (use_merge):
+                df_this_video_group = self._align_feature_groups_with_merge(features_video)
+            else:
+                df_this_video_group = self._align_feature_groups(features_video)
+
             ## End of all features in a video
             df_this_video_group.insert(0, column=self.K_VIDEO, value=video_id)
-            # df_this_video_group.reset_index(inplace=True)
 
-            df_data = df_this_video_group if (df_data is None) else pd.concat([df_data, df_this_video_group.copy(deep=True)], axis=0, ignore_index=True)
+            list_df_videos.append(df_this_video_group)
 
         ## End of reading the file and going through all videos, feature groups, and individual samples.
+        df_data = pd.concat(list_df_videos, axis=0, ignore_index=True)
         df_data.insert(0, column=self.K_PARTICIPANT, value=participant_id)
         
         return df_data
 
+    def _load_json_streams_from_filepath(self, path_to_requested_file):
+        """
+        Loads a JSON file of the dataset keeping each feature group at its
+        native sampling rate, see `StreamsCEAP`.
+
+        :param path_to_requested_file: Path to the JSON file
+        :return: Dictionary-like object {feature group name: StreamCEAP}
+        :rtype: StreamsCEAP
+        """
+        participant_id, features_all_videos = self._load_json_feature_groups(path_to_requested_file)
+
+        # Collect the samples of each feature group across videos
+        streams_data = {}
+        for video_id, features_video in features_all_videos:
+            for ft_group_name, df_this_feature in features_video.items():
+                # E.g, IBI data is not present in some participants and should not be included
+                if (self.K_TIMESTAMP not in df_this_feature):
+                    continue
+                if (ft_group_name not in streams_data):
+                    streams_data[ft_group_name] = []
+                streams_data[ft_group_name].append((video_id, df_this_feature))
+
+        streams = StreamsCEAP(participant_id)
+        for ft_group_name, videos_data in streams_data.items():
+            channels = [ col for col in videos_data[0][1].keys() if col != self.K_TIMESTAMP ]
+            num_samples = [ len(df_this_feature[self.K_TIMESTAMP]) for _, df_this_feature in videos_data ]
+
+            video_offsets = np.zeros(len(videos_data)+1, dtype=np.int64)
+            video_offsets[1:] = np.cumsum(num_samples)
+            timestamps = np.empty(video_offsets[-1], dtype=np.float64)
+            values = np.empty((video_offsets[-1], len(channels)), dtype=np.float32)
+
+            for i, (_, df_this_feature) in enumerate(videos_data):
+                timestamps[video_offsets[i]:video_offsets[i+1]] = df_this_feature[self.K_TIMESTAMP]
+                for c, colname in enumerate(channels):
+                    values[video_offsets[i]:video_offsets[i+1], c] = df_this_feature[colname]
+
+            streams[ft_group_name] = StreamCEAP(ft_group_name, channels, timestamps, values,
+                                                video_ids=np.array([ video_id for video_id, _ in videos_data ]),
+                                                video_offsets=video_offsets)
+        return streams
+
+    def _get_cache_path(self, participant_idx, data_type, processing_level):
+        """
+        Returns the folder where the parsed version of a file is cached
+        """
+        return os.path.join(self.cache_dir, f"P{participant_idx}_{data_type}_{processing_level}")
+
+    def _read_cache(self, cache_path, path_to_requested_file):
+        """
+        Loads the dataframe stored with `_write_cache()`. 
+        Returns None if the cache does not exist or is outdated.
+        """
+        cache_columns = self._read_cache_columns(cache_path, path_to_requested_file)
+        if (cache_columns is None):
+            return None
+        return pd.DataFrame(cache_columns[1])
+
+    def _read_cache_columns(self, cache_path, path_to_requested_file, mmap_mode = None):
+        """
+        Loads the metadata and the columns stored with `_write_cache()`. 
+        The cache is keyed by the modification time, size and SHA1 hash of 
+        the source file. Returns None if the cache does not exist or is outdated.
+
+        :param mmap_mode: Passed to `np.load()`, use "r" to memory-map the columns
+        :return: Tuple (metadata, {column name: array})
+        """
+        metadata_path = os.path.join(cache_path, self.CACHE_METADATA_FILENAME)
+        try:
+            metadata = load_json(metadata_path)
+        except (OSError, ValueError):
+            # File hasn't been cached yet
+            return None
+
+        if (metadata.get("version") != self.CACHE_VERSION):
+            return None
+
+        # Cheap check first. The hash is only calculated when the file was touched
+        cached_signature = metadata["source"]
+        current_signature = get_file_signature(path_to_requested_file, compute_hash=False)
+        if (current_signature["mtime"] != cached_signature["mtime"] or current_signature["size"] != cached_signature["size"]):
+            if (current_signature["size"] != cached_signature["size"]):
+                return None
+            current_signature = get_file_signature(path_to_requested_file)
+            if (current_signature["sha1"] != cached_signature["sha1"]):
+                return None
+            # Same content, update the signature to avoid hashing it again
+            metadata["source"] = current_signature
+            ceap_io.dump_json(metadata, metadata_path)
+
+        df_data = {}
+        for i, colname in enumerate(metadata["columns"]):
+            df_data[colname] = np.load(os.path.join(cache_path, f"c{i}{self.CACHE_COLUMN_EXTENSION}"), mmap_mode=mmap_mode)
+        return metadata, df_data
+
+    def _write_cache(self, cache_path, path_to_requested_file, df_data):
+        """
+        Stores each column of the dataframe `df_data` as a binary numpy file,
+        together with the signature of the file from which it was parsed.
+
+        :return: Whether the file is in the cache. Files with non-numeric columns are not cached.
+        :rtype: bool
+        """
+        # Only numeric columns can be stored without pickling
+        if (any(not pd.api.types.is_numeric_dtype(df_data[col].dtype) for col in df_data.columns)):
+            return False
+
+        metadata = {
+            "version": self.CACHE_VERSION,
+            "source": get_file_signature(path_to_requested_file),
+            "columns": list(df_data.columns),
+            "video_rows": self._find_video_rows(df_data[self.K_VIDEO].values, df_data[self.K_TIMESTAMP].values),
+        }
+
+        # Write in a temporary folder and rename at the end, so that 
+        # other processes never read an incomplete cache.
+        temp_path = f"{cache_path}.tmp{os.getpid()}"
+        check_or_create_folder(os.path.join(temp_path, self.CACHE_METADATA_FILENAME))
+        for i, colname in enumerate(metadata["columns"]):
+            np.save(os.path.join(temp_path, f"c{i}{self.CACHE_COLUMN_EXTENSION}"), df_data[colname].values)
+        ceap_io.dump_json(metadata, os.path.join(temp_path, self.CACHE_METADATA_FILENAME))
+
+        if (os.path.isdir(cache_path)):
+            shutil.rmtree(cache_path, ignore_errors=True)
+        try:
+            os.rename(temp_path, cache_path)
+        except OSError:
+            # Another process created the cache in the meantime
+            shutil.rmtree(temp_path, ignore_errors=True)
+        return True
+
+    def _find_video_rows(self, video_ids, timestamps):
+        """
+        Returns the range of rows of each video in the columns of a file, 
+        and whether the timestamps of the video are sorted.
+
+        :return: Dictionary {video ID: [start row, end row, sorted]}
+        """
+        video_ids = np.asarray(video_ids)
+        block_starts = np.flatnonzero(np.r_[True, video_ids[1:] != video_ids[:-1]])
+        block_ends = np.r_[block_starts[1:], video_ids.size]
+        video_rows = {}
+        for start, end in zip(block_starts.tolist(), block_ends.tolist()):
+            video_rows[str(video_ids[start])] = [start, end, bool(np.all(np.diff(timestamps[start:end]) >= 0))]
+        return video_rows
+
+    def _load_data_with_cache(self, participant_idx, data_type, processing_level):
+        """
+        Returns the dataframe of a single file, parsing the JSON file
+        only when there is not a valid version of it in the cache.
+        """
+        path_to_requested_file = self.index["data"][data_type][processing_level][str(participant_idx)]
+
+        if (not self.use_cache):
+            print("Loading from: ", path_to_requested_file)
+            return self._load_json_data_from_filepath(path_to_requested_file)
+
+        cache_path = self._get_cache_path(participant_idx, data_type, processing_level)
+        df_data = self._read_cache(cache_path, path_to_requested_file)
+        if (df_data is not None):
+            print("Loading from cache: ", cache_path)
+            return df_data
+
+        print("Loading from: ", path_to_requested_file)
+        df_data = self._load_json_data_from_filepath(path_to_requested_file)
+        self._write_cache(cache_path, path_to_requested_file, df_data)
+        return df_data
+
+    def warm_cache(self, data_types = None, processing_levels = None):
+        """
+        Parses all the files available in the index and stores them in 
+        the cache, so that later calls to `load_data_from_participant()`
+        do not need to parse the JSON files.
+
+        :param data_types: List of data types to cache. By default, all of them.
+        :param processing_levels: List of processing levels to cache. By default, all of them.
+        :return: Number of files available in the cache
+        :rtype: int
+        """
+        data_types = self.LIST_DATA_TYPES if (data_types is None) else data_types
+        processing_levels = self.LIST_PROCESSING_LEVELS if (processing_levels is None) else processing_levels
+
+        num_files = 0
+        for data_type in data_types:
+            for processing_level in processing_levels:
+                for participant_id, path_to_requested_file in self.index["data"][data_type][processing_level].items():
+                    # Only the metadata is checked for the files already in the cache
+                    cache_path = self._get_cache_path(participant_id, data_type, processing_level)
+                    if (self._read_cache_columns(cache_path, path_to_requested_file, mmap_mode="r") is not None):
+                        num_files += 1
+                        continue
+
+                    print("Loading from: ", path_to_requested_file)
+                    df_data = self._load_json_data_from_filepath(path_to_requested_file)
+                    if (self._write_cache(cache_path, path_to_requested_file, df_data)):
+                        num_files += 1
+        return num_files
 
     def _process_clean_physio(self,
                             df:pd.DataFrame):
@@ -557,6 +1528,7 @@ class DatasetCEAP():
                                 processing_level:str = "Raw",
                                 clean_physio = False,
                                 clean_pd_with_luminance = False,
+                                layout = "frame",
                                 ):
         """
         Loads the recorded data from a specific participant and a given 
@@ -566,12 +1538,26 @@ class DatasetCEAP():
         :param data_type: String denoting the type of data to load:  ["Annotations", "Behavior", "Physio"]
         :param processing_level: String denoting the level of processing to be retrieved: ["Raw", "Transformed", "Frame"]
         :param clean_physio: Removes IBI feature from Physio to avoid inducing missing values
-        :rtype: A single pandas DataFrame with the loaded data
+        :param layout: "frame" returns a single DataFrame where the feature groups are aligned by timestamp.
+                        "streams" returns a `StreamsCEAP` with one array per feature group at its native 
+                        sampling rate, which avoids the missing values of the Raw data. The cleaning options
+                        only apply to the "frame" layout.
+        :rtype: A single pandas DataFrame with the loaded data, or a `StreamsCEAP` object
         """
         path_to_requested_file = self.index["data"][data_type][processing_level][str(participant_idx)]
-        print("Loading from: ", path_to_requested_file)
 
-        df_data = self._load_json_data_from_filepath(path_to_requested_file)
+        if (layout == "streams"):
+            print("Loading from: ", path_to_requested_file)
+            streams = self._load_json_streams_from_filepath(path_to_requested_file)
+            if(streams.participant_id != int(participant_idx)):
+                raise ValueError(f"The participant ID is different between the name of the file and the content for file {path_to_requested_file}")
+            streams.data_type = data_type
+            streams.processing_level = processing_level
+            return streams
+        elif (layout != "frame"):
+            raise ValueError(f"Unknown layout={layout}. The options are: ['frame', 'streams']")
+
+        df_data = self._load_data_with_cache(participant_idx, data_type, processing_level)
 
         # Remove IBI and missing rows in case the flag is True
         if (clean_physio and (processing_level=="Frame") and (data_type=="Physio")):
@@ -580,15 +1566,422 @@ class DatasetCEAP():
         if (clean_pd_with_luminance and (processing_level=="Frame") and (data_type=="Behavior")):
             df_data = self._process_clean_pupil_diameter(df_data)
 
-        # Add metadata
-        df_data.insert(0, column="processing_level", value=processing_level)
-        df_data.insert(0, column="data_type", value=data_type)
-
         if(df_data[self.K_PARTICIPANT].iloc[0] != participant_idx):
             raise ValueError(f"The participant ID is different between the name of the file and the content for file {path_to_requested_file}")
 
+        # Add metadata
+        df_data = self._insert_metadata(df_data, data_type, processing_level)
+        if (self.compact):
+            # The dataframe is not shared with the cache or other calls, so it is not copied
+            return self._compact_dataframe(df_data)
         return df_data.copy(deep=True)
 
+    def _get_video_offsets(self, participant_idx, data_type, processing_level, recompute = False):
+        """
+        Returns the byte ranges of the videos in a file from the index. 
+        They are calculated if the index was created without them.
+        """
+        if ("video_offsets" not in self.index):
+            self.index["video_offsets"] = deepcopy(self.DATA_TYPES_DICT)
+        offsets_files = self.index["video_offsets"][data_type][processing_level]
+        if (recompute or str(participant_idx) not in offsets_files):
+            path_to_requested_file = self.index["data"][data_type][processing_level][str(participant_idx)]
+            offsets_files[str(participant_idx)] = find_json_video_offsets(path_to_requested_file)
+        return offsets_files[str(participant_idx)]
+
+    def _read_json_video(self, participant_idx, video_id, data_type, processing_level):
+        """
+        Parses only the block of a single video from a JSON file of the dataset.
+        The binary formats are read per video without byte ranges.
+
+        :return: Tuple (participant ID in the file, e.g., "P3", data of the video)
+        :rtype: tuple
+        """
+        path_to_requested_file = self.index["data"][data_type][processing_level][str(participant_idx)]
+        if (not path_to_requested_file.endswith(self.INPUT_FILE_EXTENSION)):
+            data_participant_dict = next(iter(ceap_io.load_data_file(path_to_requested_file, videos=[video_id]).values()))[0]
+            data_all_videos = next( values for key, values in data_participant_dict.items() if key != self.K_PARTICIPANT )
+            if (len(data_all_videos) == 0):
+                raise ValueError(f"The video {video_id} is not in the file {path_to_requested_file}")
+            return data_participant_dict[self.K_PARTICIPANT], data_all_videos[0]
+
+        for recompute in [False, True]:
+            video_offsets = self._get_video_offsets(participant_idx, data_type, processing_level, recompute)
+            if (video_id not in video_offsets):
+                continue
+            start, end = video_offsets[video_id]
+            with open(path_to_requested_file, "rb") as json_file:
+                # The participant ID is before the first video
+                header_bytes = json_file.read(min( video_start for video_start, _ in video_offsets.values() ))
+                json_file.seek(start)
+                video_bytes = json_file.read(end - start)
+            participant_match = _JSON_PARTICIPANT_ID.search(header_bytes)
+            try:
+                data_video = ceap_io.loads(video_bytes)
+            except ValueError:
+                # The file changed after the index was created
+                continue
+            if (participant_match is not None and isinstance(data_video, dict) and data_video.get(self.K_VIDEO) == video_id):
+                return participant_match.group(1).decode(), data_video
+
+        raise ValueError(f"The video {video_id} is not in the file {path_to_requested_file}")
+
+    def load_video(self, 
+                participant_idx:int,
+                video_idx,
+                data_type:str = "Annotations", 
+                processing_level:str = "Raw",
+                ):
+        """
+        Loads the data of a single video from a specific participant. Only the
+        bytes of the requested video are read and parsed, using the byte ranges
+        stored in the index.
+
+        :param participant_idx: Index of the participant (generally from 1 to 32)
+        :param video_idx: Index of the video (from 1 to 8), or its ID (e.g., "V3")
+        :param data_type: String denoting the type of data to load:  ["Annotations", "Behavior", "Physio"]
+        :param processing_level: String denoting the level of processing to be retrieved: ["Raw", "Transformed", "Frame"]
+        :rtype: A single pandas DataFrame with the same columns as `load_data_from_participant()`
+        """
+        video_id = video_idx if (isinstance(video_idx, str) and video_idx.startswith("V")) else f"V{int(video_idx)}"
+        participant_id, data_video = self._read_json_video(participant_idx, video_id, data_type, processing_level)
+        path_to_requested_file = self.index["data"][data_type][processing_level][str(participant_idx)]
+        participant_id = int(participant_id[1:]) if participant_id.startswith("P") else int(participant_id)
+        if (participant_id != int(participant_idx)):
+            raise ValueError(f"The participant ID is different between the name of the file and the content for file {path_to_requested_file}")
+
+        video_id, features_video = self._video_to_feature_groups(data_video)
+        df_data = self._align_feature_groups(features_video)
+        if (df_data is None):
+            raise ValueError(f"The video V{video_id} has no feature group with {self.K_TIMESTAMP} in the file {path_to_requested_file}")
+
+        df_data.insert(0, column=self.K_VIDEO, value=video_id)
+        df_data.insert(0, column=self.K_PARTICIPANT, value=int(participant_idx))
+        # Add metadata
+        df_data = self._insert_metadata(df_data, data_type, processing_level)
+        return self._compact_dataframe(df_data) if (self.compact) else df_data
+
+    def _insert_metadata(self, df_data, data_type, processing_level):
+        """
+        Inserts the columns `data_type` and `processing_level` at the beginning 
+        of the dataframe. In compact mode they are categoricals from the start, 
+        so that the repeated strings are never created.
+        """
+        if (self.compact):
+            num_rows = len(df_data)
+            df_data.insert(0, column="processing_level", value=pd.Categorical.from_codes(np.full(num_rows, self.LIST_PROCESSING_LEVELS.index(processing_level), dtype=np.int8), categories=self.LIST_PROCESSING_LEVELS))
+            df_data.insert(0, column="data_type", value=pd.Categorical.from_codes(np.full(num_rows, self.LIST_DATA_TYPES.index(data_type), dtype=np.int8), categories=self.LIST_DATA_TYPES))
+        else:
+            df_data.insert(0, column="processing_level", value=processing_level)
+            df_data.insert(0, column="data_type", value=data_type)
+        return df_data
+
+    def _compact_dataframe(self, df_data):
+        """
+        Reduces the memory of a dataframe returned by the loader:
+            - `data_type` and `processing_level` are categoricals
+            - `ParticipantID` and `VideoID` are int8
+            - The signals are float32. The `TimeStamp` stays float64 to align the data types by timestamp.
+        """
+        self._set_categorical_metadata(df_data)
+        compact_dtypes = { colname: np.int8 for colname in [self.K_PARTICIPANT, self.K_VIDEO] if colname in df_data.columns }
+        compact_dtypes.update({ colname: np.float32 for colname in df_data.columns if colname != self.K_TIMESTAMP and df_data[colname].dtype == np.float64 })
+        return df_data.astype(compact_dtypes)
+
+    def _load_columns(self, participant_idx, data_type, processing_level):
+        """
+        Returns the metadata and columns of a file, memory-mapped from the cache.
+        The file is parsed and cached if needed. Without cache, the columns are
+        the ones of the parsed dataframe.
+
+        :return: Tuple (metadata, {column name: array})
+        """
+        path_to_requested_file = self.index["data"][data_type][processing_level][str(participant_idx)]
+        cache_path = self._get_cache_path(participant_idx, data_type, processing_level)
+        if (self.use_cache):
+            cache_columns = self._read_cache_columns(cache_path, path_to_requested_file, mmap_mode="r")
+            if (cache_columns is not None):
+                return cache_columns
+
+        df_data = self._load_data_with_cache(participant_idx, data_type, processing_level)
+        if (self.use_cache):
+            cache_columns = self._read_cache_columns(cache_path, path_to_requested_file, mmap_mode="r")
+            if (cache_columns is not None):
+                return cache_columns
+
+        # Not cached, e.g., the dataframe has non-numeric columns
+        metadata = {
+            "columns": list(df_data.columns),
+            "video_rows": self._find_video_rows(df_data[self.K_VIDEO].values, df_data[self.K_TIMESTAMP].values),
+        }
+        return metadata, { colname: df_data[colname].values for colname in df_data.columns }
+
+    def get_window(self,
+                participant_idx:int,
+                video_idx,
+                t0:float,
+                t1:float,
+                channels = None,
+                processing_level:str = "Frame",
+                data_types = None,
+                ):
+        """
+        Returns the samples of a video with timestamps between `t0` and `t1`
+        (both included). The rows are found with a binary search on the sorted
+        timestamps of the video, instead of masking the data of the participant. 
+        When the file is cached, the columns are memory-mapped and the returned
+        columns are read-only views of the cache.
+
+        :param participant_idx: Index of the participant (generally from 1 to 32)
+        :param video_idx: Index of the video (from 1 to 8), or its ID (e.g., "V3")
+        :param t0: First timestamp of the window, in seconds
+        :param t1: Last timestamp of the window, in seconds
+        :param channels: List of column names (e.g., "EDA_EDA") or feature groups (e.g., "EM" 
+                        for "EM_Pitch" and "EM_Yaw"). By default, all the columns.
+        :param processing_level: String denoting the level of processing to be retrieved: ["Raw", "Transformed", "Frame"]
+        :param data_types: List of data types to search for the channels. By default, all of them.
+        :return: Dictionary {data type: DataFrame with the `TimeStamp` and the requested channels}.
+                Only the data types that contain some of the channels are returned.
+        :rtype: dict
+        """
+        video_id = str(int(video_idx[1:])) if (isinstance(video_idx, str) and video_idx.startswith("V")) else str(int(video_idx))
+        data_types = self.LIST_DATA_TYPES if (data_types is None) else data_types
+        channels = None if (channels is None) else ([channels] if isinstance(channels, str) else list(channels))
+        metadata_columns = [self.K_PARTICIPANT, self.K_VIDEO, self.K_TIMESTAMP]
+
+        windows = {}
+        found_channels = set()
+        for data_type in data_types:
+            if (str(participant_idx) not in self.index["data"][data_type][processing_level]):
+                continue
+            metadata, columns = self._load_columns(participant_idx, data_type, processing_level)
+            data_columns = [ colname for colname in metadata["columns"] if colname not in metadata_columns ]
+            if (channels is None):
+                selected_columns = data_columns
+            else:
+                selected_columns = []
+                for colname in data_columns:
+                    # Overlapping channels (e.g., "EM" and "EM_Pitch") are all found, the column is selected once
+                    matching_channels = [ channel for channel in channels if (colname == channel or colname.startswith(channel + "_")) ]
+                    if (len(matching_channels) > 0):
+                        selected_columns.append(colname)
+                        found_channels.update(matching_channels)
+            if (len(selected_columns) == 0 or video_id not in metadata["video_rows"]):
+                continue
+
+            start, end, is_sorted = metadata["video_rows"][video_id]
+            timestamps = columns[self.K_TIMESTAMP][start:end]
+            if (is_sorted):
+                row_start = start + int(np.searchsorted(timestamps, t0, side="left"))
+                row_end = start + int(np.searchsorted(timestamps, t1, side="right"))
+                rows = slice(row_start, max(row_start, row_end))
+            else:
+                rows = start + np.flatnonzero((timestamps >= t0) & (timestamps <= t1))
+
+            df_window = { self.K_TIMESTAMP: columns[self.K_TIMESTAMP][rows] }
+            for colname in selected_columns:
+                df_window[colname] = columns[colname][rows]
+            windows[data_type] = pd.DataFrame(df_window, copy=False)
+
+        missing_channels = [] if (channels is None) else [ channel for channel in channels if channel not in found_channels ]
+        if (len(missing_channels) > 0):
+            raise ValueError(f"The channels {missing_channels} are not in the {processing_level} data of participant {participant_idx}")
+        return windows
+
+    def _get_loader_options(self):
+        """
+        Returns the attributes needed to load a file in another process, see `_load_file_in_worker()`
+        """
+        return { "folder_data_path": self.folder_data_path, "index_file_path": self.index_file_path, "cache_dir": self.cache_dir,
+                 "use_cache": self.use_cache, "streaming": self.streaming, "compact": self.compact }
+
+    def _set_categorical_metadata(self, df_data):
+        """
+        Converts the metadata columns `data_type` and `processing_level` to 
+        categoricals with all the possible values as categories, so that they 
+        stay categorical when dataframes from different files are concatenated.
+        """
+        df_data["data_type"] = pd.Categorical(df_data["data_type"], categories=self.LIST_DATA_TYPES)
+        df_data["processing_level"] = pd.Categorical(df_data["processing_level"], categories=self.LIST_PROCESSING_LEVELS)
+        return df_data
+
+    def load_many(self,
+                participants = None,
+                data_types = None,
+                processing_levels = None,
+                workers = None,
+                **kwargs):
+        """
+        Loads the data of many participants, data types and levels of processing 
+        into a single DataFrame. Each file is loaded with `load_data_from_participant()`
+        in a pool of processes, and all the results are concatenated once at the end.
+
+        :param participants: List of participant IDs. By default, all the participants in the index.
+        :param data_types: List of data types: ["Annotations", "Behavior", "Physio"]. By default, all of them.
+        :param processing_levels: List of processing levels: ["Raw", "Transformed", "Frame"]. By default, all of them.
+        :param workers: Number of processes. By default, the number of CPUs. Use 1 to load in the current process.
+        :param kwargs: Other parameters of `load_data_from_participant()`, e.g., `clean_physio=True`.
+                        Only the "frame" layout can be concatenated.
+        :return: Dataframe with the data of all files, the columns `data_type` and `processing_level` are categorical
+        :rtype: pd.DataFrame
+        """
+        if (kwargs.get("layout", "frame") != "frame"):
+            raise ValueError(f"load_many() concatenates dataframes and only supports layout='frame', not layout={kwargs['layout']!r}. Use load_data_from_participant() per file for other layouts")
+        data_types = self.LIST_DATA_TYPES if (data_types is None) else data_types
+        processing_levels = self.LIST_PROCESSING_LEVELS if (processing_levels is None) else processing_levels
+
+        # Files to load, in the same order as the nested loop per participant, data type and level.
+        requests = []
+        if (participants is None):
+            participants = sorted({ int(pid) for data_type in data_types for processing_level in processing_levels for pid in self.index["data"][data_type][processing_level].keys() })
+        for participant_idx in participants:
+            for data_type in data_types:
+                for processing_level in processing_levels:
+                    if (str(participant_idx) in self.index["data"][data_type][processing_level]):
+                        requests.append((int(participant_idx), data_type, processing_level))
+
+        workers = os.cpu_count() if (workers is None) else workers
+        if (workers <= 1 or len(requests) <= 1):
+            list_df_data = [ self.load_data_from_participant(*request, **kwargs) for request in requests ]
+        else:
+            # The workers receive the path of each file and the options of the loader, not the whole index
+            loader_options = self._get_loader_options()
+            with ProcessPoolExecutor(max_workers=min(workers, len(requests))) as executor:
+                futures = [ executor.submit(_load_file_in_worker, loader_options, self.index["data"][request[1]][request[2]][str(request[0])], *request, **kwargs)
+                            for request in requests ]
+                list_df_data = [ future.result() for future in futures ]
+
+        if (len(list_df_data) == 0):
+            return None
+
+        for df_data in list_df_data:
+            self._set_categorical_metadata(df_data)
+        return pd.concat(list_df_data, axis=0, ignore_index=True)
+
+    def load_shared(self,
+                participants = None,
+                data_types = None,
+                processing_levels = None,
+                workers = None,
+                **kwargs):
+        """
+        Loads the data with `load_many()` and moves it to shared memory, so that 
+        worker processes can attach to it instead of loading the files again.
+        Use it as a context manager to remove the shared memory at the end.
+
+        :param participants: List of participant IDs. By default, all the participants in the index.
+        :param data_types: List of data types: ["Annotations", "Behavior", "Physio"]. By default, all of them.
+        :param processing_levels: List of processing levels: ["Raw", "Transformed", "Frame"]. By default, all of them.
+        :param workers: Number of processes to load the files, see `load_many()`
+        :param kwargs: Other parameters of `load_data_from_participant()`, e.g., `clean_physio=True`
+        :return: Shared dataset. The rows of a file are returned by `get_rows(participant_id, data_type, processing_level)`
+        :rtype: SharedDatasetCEAP
+        """
+        df_data = self.load_many(participants, data_types, processing_levels, workers, **kwargs)
+        if (df_data is None):
+            raise ValueError("There are no files to load in the index")
+        return SharedDatasetCEAP.from_dataframe(df_data, row_groups=[self.K_PARTICIPANT, "data_type", "processing_level"])
+
+    def export_tensor_store(self,
+                store_path:str,
+                participants = None,
+                data_types = None,
+                dtype = np.float32,
+                compressed = False,
+                **kwargs):
+        """
+        Exports the Frame-level data to a single tensor store, that can be read
+        with `TensorStoreCEAP`. The data types of each video are aligned by
+        timestamp, as `_align_feature_groups()` does for the feature groups,
+        and saved as one chunk per participant and video.
+
+        :param store_path: Folder of the store. It is overwritten if it exists.
+        :param participants: List of participant IDs. By default, all the participants in the index.
+        :param data_types: List of data types: ["Annotations", "Behavior", "Physio"]. By default, all of them.
+        :param dtype: Numpy type of the channels. The timestamps are always float64.
+        :param compressed: Saves each chunk as a compressed `.npz`, which cannot be memory-mapped.
+        :param kwargs: Other parameters of `load_data_from_participant()`, e.g., `clean_physio=True`
+        :return: Store with the exported data
+        :rtype: TensorStoreCEAP
+        """
+        processing_level = "Frame"
+        data_types = self.LIST_DATA_TYPES if (data_types is None) else data_types
+        if (participants is None):
+            participants = sorted({ int(pid) for data_type in data_types for pid in self.index["data"][data_type][processing_level].keys() })
+        metadata_columns = ["data_type", "processing_level", self.K_PARTICIPANT, self.K_VIDEO, self.K_TIMESTAMP]
+
+        # Aligned videos are kept in memory until the channels of all participants are known
+        channels_data_types = {}
+        chunks = {}
+        for participant_idx in participants:
+            df_data_types = {}
+            for data_type in data_types:
+                if (str(participant_idx) in self.index["data"][data_type][processing_level]):
+                    df_data_types[data_type] = self.load_data_from_participant(participant_idx, data_type, processing_level, **kwargs)
+            for data_type, df_data in df_data_types.items():
+                for channel in df_data.columns.drop(metadata_columns, errors="ignore"):
+                    if (channels_data_types.setdefault(channel, data_type) != data_type):
+                        raise ValueError(f"The channel {channel} is in {channels_data_types[channel]} and {data_type}")
+
+            video_ids = sorted({ video_id for df_data in df_data_types.values() for video_id in df_data[self.K_VIDEO].unique() })
+            for video_id in video_ids:
+                features_video = {}
+                for data_type, df_data in df_data_types.items():
+                    df_video = df_data[df_data[self.K_VIDEO] == video_id].drop(columns=metadata_columns[:4])
+                    features_video[data_type] = { colname: df_video[colname].to_numpy() for colname in df_video.columns }
+                df_video = self._align_feature_groups(features_video)
+                if (df_video is not None):
+                    chunks[(int(participant_idx), int(video_id))] = df_video
+            print(f"Aligned participant {participant_idx} for the tensor store")
+
+        channels = list(channels_data_types.keys())
+        participant_ids = sorted({ key[0] for key in chunks.keys() })
+        video_ids = sorted({ key[1] for key in chunks.keys() })
+        n_frames = np.full((len(participant_ids), len(video_ids)), -1, dtype=np.int64)
+
+        if (os.path.isdir(store_path)):
+            shutil.rmtree(store_path)
+        chunks_folder = os.path.join(store_path, TensorStoreCEAP.CHUNKS_FOLDERNAME)
+        os.makedirs(chunks_folder)
+        for (participant_id, video_id), df_video in chunks.items():
+            values = df_video.reindex(columns=channels).to_numpy(dtype=dtype)
+            timestamps = df_video[self.K_TIMESTAMP].to_numpy(dtype=np.float64)
+            chunk_path = os.path.join(chunks_folder, TensorStoreCEAP.get_chunk_name(participant_id, video_id))
+            if (compressed):
+                np.savez_compressed(chunk_path + ".npz", values=values, timestamps=timestamps)
+            else:
+                np.save(chunk_path + ".npy", values)
+                np.save(chunk_path + "_" + self.K_TIMESTAMP + ".npy", timestamps)
+            n_frames[participant_ids.index(participant_id), video_ids.index(video_id)] = values.shape[0]
+
+        meta = {
+            "version": TensorStoreCEAP.VERSION,
+            "dims": ["participant", "video", "frame", "channel"],
+            "processing_level": processing_level,
+            "participants": participant_ids,
+            "videos": video_ids,
+            "channels": channels,
+            "channels_data_types": [ channels_data_types[channel] for channel in channels ],
+            "n_frames": n_frames.tolist(),
+            "dtype": np.dtype(dtype).name,
+            "compressed": compressed,
+        }
+        create_json(meta, os.path.join(store_path, TensorStoreCEAP.META_FILENAME), pretty=True)
+        print(f"Tensor store with {len(chunks)} videos and {len(channels)} channels was saved in {store_path}")
+        return TensorStoreCEAP(store_path)
+
+
+def _load_file_in_worker(loader_options, path_to_requested_file, participant_idx, data_type, processing_level, **kwargs):
+    """
+    Loads a single file in a worker process of `DatasetCEAP.load_many()`.
+    The loader is created with the options of the parent and an index with
+    only the requested file, so the index of the dataset is not sent to
+    every task and is not scanned again.
+    """
+    dataset = DatasetCEAP.__new__(DatasetCEAP)
+    dataset.__dict__.update(loader_options)
+    dataset.index = { "data": { data_type: { processing_level: { str(participant_idx): path_to_requested_file } } } }
+    return dataset.load_data_from_participant(participant_idx, data_type, processing_level, **kwargs)
 
 
 # =============================================================================